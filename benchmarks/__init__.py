@@ -0,0 +1 @@
+"""Бенчмарки игры (запускаются вручную, не входят в тесты)"""
@@ -0,0 +1,71 @@
+"""
+Бенчмарк игрового контроллера без вывода: ходов в секунду.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_controller [--turns N] [--rooms N]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Приоритет действий бота: сражаться, идти вперёд, выходить
+_PREFERRED_ACTIONS = ("attack", "forward", "exit")
+
+
+def choose_action(actions: dict) -> str:
+    """Выбрать действие простого бота"""
+    names = [name for name, _ in actions.values()]
+    for preferred in _PREFERRED_ACTIONS:
+        if preferred in names:
+            return preferred
+    return names[0]
+
+
+def bench_navigation(controller: GameController, turns: int) -> float:
+    """Только накладные расходы контроллера: ходьба вперёд-назад по пустым комнатам"""
+    for room in controller.dungeon:
+        room.enemy = None
+    start = time.perf_counter()
+    for _ in range(turns):
+        actions = controller.get_available_actions()
+        action = "forward" if controller.current_position == 0 else "back"
+        if any(name == action for name, _ in actions.values()):
+            controller.execute_action(action)
+    return turns / (time.perf_counter() - start)
+
+
+def bench_full_games(controller: GameController, turns: int, num_rooms: int) -> float:
+    """Полные партии: бои, переходы, выход и новая партия"""
+    start = time.perf_counter()
+    for _ in range(turns):
+        if not controller.running:
+            controller.initialize_game(num_rooms, wait_for_start=False)
+        actions = controller.get_available_actions()
+        if not controller.execute_action(choose_action(actions)):
+            controller.running = False
+    return turns / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200_000)
+    parser.add_argument("--rooms", type=int, default=5)
+    args = parser.parse_args()
+
+    generator = DungeonGenerator(data_dir=str(DATA_DIR))
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(args.rooms, wait_for_start=False)
+
+    print(f"navigation: {bench_navigation(controller, args.turns):,.0f} turns/s")
+    print(f"full games: {bench_full_games(controller, args.turns, args.rooms):,.0f} turns/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Бенчмарк таблицы рекордов: задержка запросов на миллионе партий.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_leaderboard [--runs N] [--players N]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.leaderboard import Leaderboard
+from src.store import GameStore
+
+ENEMIES = ("Крыса", "Скелет", "Зомби", "Гоблин", "Паук", "Призрак")
+
+
+def _latency_us(query, repeat: int = 2_000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        query()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        with GameStore(os.path.join(directory, "bench.db")) as store:
+            leaderboard = Leaderboard(store)
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                won = rng.random() < 0.4
+                store.record_run(
+                    f"player{rng.randrange(args.players)}",
+                    "exit" if won else "defeat",
+                    rooms_cleared=5 if won else rng.randrange(5),
+                    health=rng.randint(1, 100) if won else 0,
+                    fights=rng.randrange(5),
+                    turns=rng.randrange(5, 30),
+                    killed_by=None if won else rng.choice(ENEMIES),
+                )
+            store.flush()
+            print(f"recorded {args.runs:,} runs in {time.perf_counter() - start:.1f} s")
+
+            print(f"top(10):          {_latency_us(lambda: leaderboard.top(10)):8.1f} us")
+            print(f"deaths_by_enemy:  {_latency_us(leaderboard.deaths_by_enemy):8.1f} us")
+            print(f"history(20):      {_latency_us(lambda: leaderboard.history('player7')):8.1f} us")
+            print(f"player_totals:    {_latency_us(lambda: leaderboard.player_totals('player7')):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
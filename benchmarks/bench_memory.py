@@ -0,0 +1,61 @@
+"""
+Бенчмарк памяти: сколько байт занимает одна сессия игры.
+
+Весь неизменяемый контент общий (один DungeonGenerator на процесс), поэтому
+сессия должна стоить не больше target байт.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_memory [--rooms N] [--sessions N] [--target BYTES]
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.bench_controller import DATA_DIR
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+
+
+def session_memory(generator: DungeonGenerator, num_rooms: int, sessions: int) -> float:
+    """Средний прирост памяти на одну инициализированную сессию, байт"""
+
+    def new_session(seed: int) -> GameController:
+        controller = GameController(generator, screen=NullRenderBuffer())
+        controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+        return controller
+
+    # Прогрев: загрузка enemies.json, кэши генератора, ГСЧ потока
+    warm = [new_session(seed) for seed in range(10)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        alive = [new_session(seed) for seed in range(sessions)]
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del warm, alive
+    return (after - before) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--target", type=int, default=2048, help="допустимый размер сессии, байт")
+    args = parser.parse_args()
+
+    generator = DungeonGenerator.shared(str(DATA_DIR))
+    per_session = session_memory(generator, args.rooms, args.sessions)
+    verdict = "OK" if per_session <= args.target else "OVER TARGET"
+    print(f"{per_session:,.0f} bytes per {args.rooms}-room session (target {args.target:,}): {verdict}")
+    if per_session > args.target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Бенчмарк бинарных сохранений: размер и время save/load.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_savegame [--rooms N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_controller import DATA_DIR
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+from src.savegame import load_game, save_game
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    generator = DungeonGenerator(data_dir=str(DATA_DIR))
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(args.rooms, wait_for_start=False)
+    data = save_game(controller)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        save_game(controller)
+    save_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        load_game(generator, data)
+    load_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    print(f"size: {len(data)} bytes for {args.rooms} rooms")
+    print(f"save: {save_us:.1f} us, load: {load_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Бенчмарк памяти пре-форк сервера: резидентная память работников.
+
+Запускает сервер, открывает сессии и читает /proc/<pid>/smaps_rollup каждого
+работника (только Linux): RSS, PSS (общие страницы делятся между процессами)
+и USS (собственные страницы работника).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_server_memory [--workers N] [--sessions N] [--no-freeze]
+"""
+
+import argparse
+import socket
+import time
+from typing import Dict
+
+from benchmarks.bench_controller import DATA_DIR
+from src.server import PROMPT, PreforkServer
+
+
+def read_memory(pid: int) -> Dict[str, int]:
+    """RSS, PSS и USS процесса в КиБ"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def open_sessions(address, count: int):
+    """Открыть count сессий и дождаться первого экрана каждой"""
+    clients = []
+    for _ in range(count):
+        client = socket.create_connection(address, timeout=10)
+        data = b""
+        while not data.endswith(PROMPT.encode("utf-8")):
+            data += client.recv(65536)
+        clients.append(client)
+    return clients
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=1000, help="всего сессий на всех работников")
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--no-freeze", action="store_true", help="не вызывать gc.freeze() перед fork()")
+    args = parser.parse_args()
+
+    server = PreforkServer(str(DATA_DIR), workers=args.workers, num_rooms=args.rooms, freeze=not args.no_freeze)
+    server.start()
+    clients = []
+    try:
+        idle = {pid: read_memory(pid) for pid in server.pids}
+        clients = open_sessions(server.address, args.sessions)
+        time.sleep(0.2)
+        loaded = {pid: read_memory(pid) for pid in server.pids}
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+
+    print(f"workers: {args.workers}, sessions: {args.sessions}, gc.freeze: {not args.no_freeze}")
+    print(f"{'pid':>8} {'RSS':>10} {'PSS':>10} {'USS':>10} {'USS idle':>10}  (KiB)")
+    for pid, memory in loaded.items():
+        print(f"{pid:>8} {memory['rss']:>10,} {memory['pss']:>10,} {memory['uss']:>10,} {idle[pid]['uss']:>10,}")
+    count = len(loaded)
+    for name in ("rss", "pss", "uss"):
+        print(f"mean {name.upper()}: {sum(memory[name] for memory in loaded.values()) / count:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Бенчмарк хранилища SQLite: контрольные точки сессий в секунду.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_store [--sessions N] [--checkpoints N]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_controller import DATA_DIR
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+from src.savegame import save_game
+from src.store import GameStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1_000, help="число разных сессий")
+    parser.add_argument("--checkpoints", type=int, default=100_000, help="всего контрольных точек")
+    args = parser.parse_args()
+
+    generator = DungeonGenerator(data_dir=str(DATA_DIR))
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(5, wait_for_start=False, seed=0)
+    data = save_game(controller)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with GameStore(os.path.join(directory, "bench.db")) as store:
+            start = time.perf_counter()
+            for i in range(args.checkpoints):
+                store.checkpoint(f"session-{i % args.sessions}", data)
+            enqueued = time.perf_counter() - start
+            store.flush()
+            durable = time.perf_counter() - start
+            stats = store.stats()
+
+    print(f"checkpoint call: {enqueued / args.checkpoints * 1e6:.2f} us (caller side)")
+    print(f"durable: {args.checkpoints / durable:,.0f} checkpoints/s")
+    print(f"batches: {stats['batches']}, max batch: {stats['batch_max']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Набор бенчмарков горячих путей игры: оп/с, среднее и разброс, пик памяти.
+
+Запуск из корня проекта:
+    python -m benchmarks.run [--filter TEXT] [--quick] [--json results.json]
+    python -m benchmarks.run --compare baseline.json [--threshold 0.1]
+
+В режиме сравнения бенчмарки, ставшие медленнее базовой линии больше чем на
+threshold, помечаются как регрессии, и процесс завершается с кодом 1.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.bench_controller import DATA_DIR, choose_action
+from src.combat import CombatSystem
+from src.controller import GameController
+from src.difficulty import DifficultyTuner, survival_probability
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+
+
+class Case(NamedTuple):
+    """Бенчмарк: setup() возвращает операцию, которую замеряем; samples — число замеров"""
+
+    name: str
+    setup: Callable[[DungeonGenerator], Callable[[], object]]
+    samples: int = 20
+    large: bool = False  # пропускается в режиме --quick
+
+
+def _generator_setup(full_load: bool):
+    def setup(generator: DungeonGenerator):
+        if not full_load:
+            return lambda: DungeonGenerator(data_dir=str(DATA_DIR))
+
+        def load():
+            # enemies.json читается лениво: обращение к enemies_data дочитывает его,
+            # чтобы замер был сравним с базовыми линиями до ленивой загрузки
+            loaded = DungeonGenerator(data_dir=str(DATA_DIR))
+            loaded.enemies_data
+            return loaded
+
+        return load
+
+    return setup
+
+
+def _create_enemy_setup(generator: DungeonGenerator):
+    rng = random.Random(0)
+    return lambda: generator.create_enemy(rng)
+
+
+def _generate_setup(num_rooms: int):
+    def setup(generator: DungeonGenerator):
+        rng = random.Random(0)
+        return lambda: generator.generate_dungeon(num_rooms, rng=rng)
+
+    return setup
+
+
+def _battle_setup(log_enabled: bool):
+    def setup(generator: DungeonGenerator):
+        rng = random.Random(0)
+        combat = CombatSystem(generator, rng)
+        combat.log_enabled = log_enabled
+        player = generator.create_player(rng)
+        enemy = generator.build_enemy(0)
+
+        def battle():
+            player.current_health = player.max_health
+            enemy.current_health = enemy.max_health
+            enemy.defeated = False
+            return combat.auto_battle(player, enemy)
+
+        return battle
+
+    return setup
+
+
+def _pack_battle_setup(pack_size: int):
+    def setup(generator: DungeonGenerator):
+        rng = random.Random(0)
+        combat = CombatSystem(generator, rng)
+        combat.log_enabled = False
+        player = generator.create_player(rng)
+        pack = [generator.build_enemy(i % 3) for i in range(pack_size)]
+
+        def battle():
+            player.current_health = player.max_health = 10_000
+            for enemy in pack:
+                enemy.current_health = enemy.max_health
+                enemy.defeated = False
+            return combat.pack_battle(player, pack)
+
+        return battle
+
+    return setup
+
+
+def _survival_setup(num_rooms: int):
+    def setup(generator: DungeonGenerator):
+        rng = random.Random(0)
+        dungeon = generator.generate_dungeon(num_rooms, enemy_probability=1.0, rng=rng)
+        player = generator.create_player(rng)
+        return lambda: survival_probability(dungeon, player)
+
+    return setup
+
+
+def _tuner_setup(num_rooms: int):
+    def setup(generator: DungeonGenerator):
+        rng = random.Random(1)
+        tuner = DifficultyTuner(generator, generator.create_player(rng))
+        return lambda: tuner.generate(0.4, num_rooms=num_rooms, rng=rng)
+
+    return setup
+
+
+def _actions_setup(generator: DungeonGenerator):
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(5, wait_for_start=False, seed=0)
+    return controller.get_available_actions
+
+
+def _game_turn_setup(generator: DungeonGenerator):
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.combat_system.log_enabled = False
+    seeds = iter(range(1 << 62))
+
+    def turn():
+        if not controller.running:
+            controller.initialize_game(5, wait_for_start=False, seed=next(seeds))
+        if not controller.execute_action(choose_action(controller.get_available_actions())):
+            controller.running = False
+
+    return turn
+
+
+CASES: List[Case] = [
+    Case("generator_init", _generator_setup(full_load=True)),
+    Case("generator_init_lazy", _generator_setup(full_load=False)),
+    Case("create_enemy", _create_enemy_setup),
+    Case("generate_dungeon_5", _generate_setup(5)),
+    Case("generate_dungeon_1k", _generate_setup(1_000)),
+    Case("generate_dungeon_1m", _generate_setup(1_000_000), samples=3, large=True),
+    Case("auto_battle_log", _battle_setup(True)),
+    Case("auto_battle_nolog", _battle_setup(False)),
+    Case("pack_battle_10", _pack_battle_setup(10)),
+    Case("pack_battle_1k", _pack_battle_setup(1_000), samples=5),
+    Case("survival_probability_5", _survival_setup(5)),
+    Case("difficulty_tuner_2k", _tuner_setup(2_000), samples=5),
+    Case("get_available_actions", _actions_setup),
+    Case("game_turn_headless", _game_turn_setup),
+]
+
+
+def _calibrate(operation: Callable[[], object], min_time: float) -> int:
+    """Сколько вызовов нужно в одном замере, чтобы он длился не меньше min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= min_time or number >= 1 << 24:
+            return number
+        number *= 2
+
+
+def run_case(case: Case, generator: DungeonGenerator, min_time: float = 0.05) -> Dict[str, float]:
+    """Замерить один бенчмарк: время одной операции (среднее, разброс) и пик памяти"""
+    operation = case.setup(generator)
+    number = _calibrate(operation, min_time)
+
+    timings = []
+    for _ in range(case.samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append((time.perf_counter() - start) / number)
+
+    # Память — отдельным прогоном: tracemalloc сильно замедляет выполнение
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        operation()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.fmean(timings)
+    return {
+        "ops_per_sec": 1 / mean if mean else float("inf"),
+        "mean": mean,
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "peak_memory": peak,
+        "samples": len(timings),
+        "number": number,
+    }
+
+
+def run_suite(
+    name_filter: Optional[str] = None, quick: bool = False, min_time: float = 0.05
+) -> Dict[str, Dict[str, float]]:
+    """Прогнать выбранные бенчмарки"""
+    generator = DungeonGenerator(data_dir=str(DATA_DIR))
+    results = {}
+    for case in CASES:
+        if name_filter and name_filter not in case.name:
+            continue
+        if quick and case.large:
+            continue
+        results[case.name] = run_case(case, generator, min_time)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Имена бенчмарков, у которых среднее время выросло больше чем на threshold"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and result["mean"] > reference["mean"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default=None, help="запускать только бенчмарки с этой подстрокой")
+    parser.add_argument("--quick", action="store_true", help="пропустить самые долгие бенчмарки")
+    parser.add_argument("--min-time", type=float, default=0.05, help="минимальная длительность замера, с")
+    parser.add_argument("--json", default=None, help="записать результаты в JSON-файл")
+    parser.add_argument("--compare", default=None, help="сравнить с сохранёнными результатами")
+    parser.add_argument("--threshold", type=float, default=0.1, help="допустимое замедление (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    results = run_suite(args.filter, args.quick, args.min_time)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    for name, result in results.items():
+        line = (
+            f"{name:24} {result['ops_per_sec']:>14,.1f} ops/s  "
+            f"{_format_time(result['mean']):>10} ± {_format_time(result['stddev']):>10}  "
+            f"peak {result['peak_memory'] / 1024:>10,.1f} KiB"
+        )
+        if name in baseline:
+            change = result["mean"] / baseline[name]["mean"] - 1
+            line += f"  {change:+.1%}" + ("  REGRESSION" if name in regressions else "")
+        print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"python": platform.python_version(), "platform": platform.platform(), "results": results},
+                f,
+                indent=2,
+            )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
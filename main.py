@@ -1,15 +1,79 @@
 """Точка входа в текстовую RPG-игру"""
 
-from src.dungeon import DungeonGenerator
-from src.controller import GameController
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+
+
+class StartupProfile:
+    """Время фаз запуска: от старта интерпретатора main.py до отметки"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.last = started
+        self.phases = []
+
+    def mark(self, phase: str):
+        """Закончить фазу phase"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, load_times: dict) -> str:
+        """Текстовый отчёт по фазам и по загрузке каждого JSON-файла"""
+        lines = ["Профиль запуска:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<22} {seconds * 1000:8.2f} мс")
+        for filename, seconds in load_times.items():
+            lines.append(f"    {filename:<20} {seconds * 1000:8.2f} мс")
+        lines.append(f"  {'всего':<22} {(self.last - self.started) * 1000:8.2f} мс")
+        return "\n".join(lines)
 
 
 def main():
     """Главная функция запуска игры"""
+    parser = argparse.ArgumentParser(description="Текстовое подземелье")
+    parser.add_argument("--trace", metavar="FILE", help="записать трассу в формате Chrome trace-event")
+    parser.add_argument("--events", metavar="FILE", help="записать итоги боёв в JSON Lines (для src.analytics)")
+    parser.add_argument("--broadcast", metavar="PORT", type=int, help="транслировать игру зрителям по TCP")
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="показать время импорта и загрузки данных"
+    )
+    args = parser.parse_args()
+    profile = StartupProfile(_STARTED)
+
+    # Модули игры импортируются только здесь: --help и разбор аргументов их не ждут
+    if args.trace:
+        from src import tracing
+
+        tracing.enable()
+    if args.events:
+        from src import events
+
+        events.enable(args.events)
+    from src.dungeon import DungeonGenerator
+    from src.controller import GameController
+
+    profile.mark("импорт модулей")
+    spectators = None
     try:
         generator = DungeonGenerator(data_dir="data")
-        controller = GameController(generator)
-        controller.initialize_game(num_rooms=5)
+        profile.mark("загрузка данных")
+        screen = None
+        if args.broadcast is not None:
+            from src.spectate import BroadcastRenderBuffer, Channel, SpectatorServer
+
+            channel = Channel()
+            screen = BroadcastRenderBuffer(channel)
+            spectators = SpectatorServer(channel, port=args.broadcast).start()
+        controller = GameController(generator, screen=screen)
+        controller.initialize_game(num_rooms=5, wait_for_start=False)
+        profile.mark("первый экран")
+        if args.profile_startup:
+            print(profile.report(generator.load_times))
+        controller.wait_for_start()
         controller.run()
 
     except FileNotFoundError as e:
@@ -18,7 +82,14 @@ def main():
         print("\n\nИгра прервана. До свидания!")
     except Exception as e:
         print(f"Произошла ошибка: {e}")
+    finally:
+        if args.trace:
+            tracing.disable().export(args.trace)
+        if args.events:
+            events.disable()
+        if spectators is not None:
+            spectators.stop()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
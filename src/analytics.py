@@ -0,0 +1,163 @@
+"""
+Потоковая аналитика журнала боёв: доля побед, урон и распределение раундов по врагам.
+
+Файл читается цепочкой генераторов (строки -> события -> фильтр -> агрегаты),
+поэтому память не зависит от размера файла. В параллельном режиме файл
+делится на диапазоны байтов, каждый процесс считает свои агрегаты, затем они
+складываются.
+
+Запуск из корня проекта:
+    python -m src.analytics fights.jsonl [--processes 4] [--enemy NAME] [--json]
+"""
+
+import argparse
+import json
+import multiprocessing
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.combat import CombatSystem
+from src.events import FightEvent, NameTable, read_events, split_ranges
+
+
+class EnemyStats:
+    """Агрегаты боёв с одним врагом; раунды — счётчики по числу раундов, так что память постоянна"""
+
+    __slots__ = ("fights", "wins", "damage_dealt", "damage_taken", "rounds")
+
+    def __init__(self):
+        self.fights = 0
+        self.wins = 0
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.rounds = [0] * (CombatSystem.MAX_ROUNDS + 1)
+
+    def add(self, event: FightEvent):
+        self.fights += 1
+        self.wins += event.won
+        self.damage_dealt += event.damage_dealt
+        self.damage_taken += event.damage_taken
+        self.rounds[min(event.rounds, CombatSystem.MAX_ROUNDS)] += 1
+
+    def merge(self, other: "EnemyStats"):
+        self.fights += other.fights
+        self.wins += other.wins
+        self.damage_dealt += other.damage_dealt
+        self.damage_taken += other.damage_taken
+        self.rounds = [a + b for a, b in zip(self.rounds, other.rounds)]
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.fights if self.fights else 0.0
+
+    def rounds_quantile(self, q: float) -> int:
+        """Число раундов, не превышенное в доле q боёв"""
+        target = q * self.fights
+        seen = 0
+        for rounds, count in enumerate(self.rounds):
+            seen += count
+            if count and seen >= target:
+                return rounds
+        return 0
+
+    def to_dict(self) -> dict:
+        fights = self.fights or 1
+        return {
+            "fights": self.fights,
+            "win_rate": self.win_rate,
+            "damage_dealt_mean": self.damage_dealt / fights,
+            "damage_taken_mean": self.damage_taken / fights,
+            "rounds_p50": self.rounds_quantile(0.5),
+            "rounds_p90": self.rounds_quantile(0.9),
+            "rounds_max": max((r for r, count in enumerate(self.rounds) if count), default=0),
+        }
+
+
+def only_enemy(events: Iterable[FightEvent], enemy: Optional[str]) -> Iterator[FightEvent]:
+    """Звено конвейера: оставить бои с врагом enemy (None — все бои)"""
+    if enemy is None:
+        yield from events
+        return
+    for event in events:
+        if event.enemy == enemy or isinstance(event.enemy, int):
+            yield event
+
+
+def aggregate(events: Iterable[FightEvent]) -> Dict[Union[str, int], EnemyStats]:
+    """Свернуть поток событий в агрегаты по врагам"""
+    stats: Dict[Union[str, int], EnemyStats] = {}
+    for event in events:
+        enemy_stats = stats.get(event.enemy)
+        if enemy_stats is None:
+            enemy_stats = stats[event.enemy] = EnemyStats()
+        enemy_stats.add(event)
+    return stats
+
+
+def _aggregate_range(task: Tuple[str, int, int, Optional[str]]) -> Tuple[Dict, NameTable]:
+    path, start, end, enemy = task
+    names = NameTable()
+    return aggregate(only_enemy(read_events(path, start, end, names), enemy)), names
+
+
+def analyze(path: str, processes: int = 1, enemy: Optional[str] = None) -> Dict[str, EnemyStats]:
+    """
+    Агрегаты по врагам для файла событий.
+
+    :param processes: больше 1 — делить файл на диапазоны байтов между процессами
+    :param enemy: считать только бои с этим врагом
+    """
+    tasks = [(path, start, end, enemy) for start, end in split_ranges(path, max(processes, 1))]
+    if processes > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(processes) as pool:
+            parts = pool.map(_aggregate_range, tasks)
+    else:
+        parts = [_aggregate_range(task) for task in tasks]
+
+    names = NameTable()
+    for _, part_names in parts:
+        names.merge(part_names)
+    result: Dict[str, EnemyStats] = {}
+    for part_stats, _ in parts:
+        for key, enemy_stats in part_stats.items():
+            name = names.resolve(key)
+            if enemy is not None and name != enemy:
+                continue
+            if name in result:
+                result[name].merge(enemy_stats)
+            else:
+                result[name] = enemy_stats
+    return result
+
+
+def format_report(stats: Dict[str, EnemyStats]) -> str:
+    """Таблица агрегатов, от самых частых врагов"""
+    lines: List[str] = [
+        f"{'враг':<24} {'боёв':>9} {'побед':>7} {'урон':>7} {'получ.':>7} {'p50':>4} {'p90':>4} {'max':>4}"
+    ]
+    for name, enemy_stats in sorted(stats.items(), key=lambda item: -item[1].fights):
+        row = enemy_stats.to_dict()
+        lines.append(
+            f"{name:<24} {row['fights']:>9} {row['win_rate']:>7.1%} {row['damage_dealt_mean']:>7.1f} "
+            f"{row['damage_taken_mean']:>7.1f} {row['rounds_p50']:>4} {row['rounds_p90']:>4} {row['rounds_max']:>4}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    """Отчёт по журналу боёв: python -m src.analytics fights.jsonl --processes 4"""
+    parser = argparse.ArgumentParser(description="Аналитика журнала боёв")
+    parser.add_argument("path", help="файл событий (JSON Lines или двоичный)")
+    parser.add_argument("--processes", type=int, default=1, help="число процессов")
+    parser.add_argument("--enemy", default=None, help="только бои с этим врагом")
+    parser.add_argument("--json", action="store_true", help="вывести агрегаты в JSON")
+    args = parser.parse_args()
+
+    stats = analyze(args.path, args.processes, args.enemy)
+    if args.json:
+        print(json.dumps({name: s.to_dict() for name, s in stats.items()}, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(stats))
+
+
+if __name__ == "__main__":
+    main()
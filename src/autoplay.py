@@ -0,0 +1,250 @@
+"""Массовая автоигра: прохождение подземелий ботами без ввода и вывода"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Type
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+from src.solver import DungeonSolver, fight_outcome_for
+
+DEFAULT_MAX_TURNS = 10_000
+
+
+class CountingRandom(random.Random):
+    """
+    ГСЧ, считающий обращения к источнику случайных битов.
+
+    randint/choice/randrange в CPython берут биты через getrandbits, поэтому
+    последовательность чисел совпадает с обычным random.Random с тем же зерном.
+    """
+
+    def __init__(self, seed=None):
+        self.draws = 0
+        super().__init__(seed)
+
+    def getrandbits(self, k: int) -> int:
+        self.draws += 1
+        return super().getrandbits(k)
+
+    def random(self) -> float:
+        self.draws += 1
+        return super().random()
+
+
+class AttackPolicy:
+    """Всегда атаковать, иначе идти вперёд и выходить"""
+
+    name = "attack"
+
+    def __init__(self, controller: GameController):
+        pass
+
+    def __call__(self, controller: GameController) -> str:
+        room = controller.get_current_room()
+        if room.has_alive_enemy():
+            return "attack"
+        return "exit" if room.room_type == "Ex" else "forward"
+
+
+class GreedyPolicy(AttackPolicy):
+    """
+    Атаковать, только если этот бой выигрывается с вероятностью не ниже порога; иначе уйти.
+
+    Точного расчёта боя со стаей нет — на стаю политика нападает, как AttackPolicy.
+    """
+
+    name = "greedy"
+    threshold = 0.5
+
+    def __call__(self, controller: GameController) -> str:
+        room = controller.get_current_room()
+        if room.has_alive_enemy() and not room.pack:
+            outcome = fight_outcome_for(controller.player, room.enemy)
+            return "attack" if outcome.win_probability >= self.threshold else "quit"
+        return super().__call__(controller)
+
+
+class SolverPolicy:
+    """Оптимальная политика DungeonSolver; безнадёжный бой — выход из игры живым"""
+
+    name = "solver"
+
+    def __init__(self, controller: GameController):
+        self.solver = DungeonSolver(controller.dungeon, controller.player)
+
+    def __call__(self, controller: GameController) -> str:
+        action = self.solver.best_action(controller.current_position, controller.player.current_health)
+        # Отступление не приближает к выходу: бот просто заканчивает партию
+        return "quit" if action == "back" else action
+
+
+POLICIES: Dict[str, Type] = {policy.name: policy for policy in (AttackPolicy, GreedyPolicy, SolverPolicy)}
+
+
+class RunSummary:
+    """
+    Краткий итог одной партии.
+
+    outcome — "exit" (вышел), "defeat" (погиб или проиграл по времени),
+    "quit" (бот ушёл сам) или "timeout" (превышен лимит ходов);
+    hp_trace — здоровье игрока в начале и после каждого боя.
+    """
+
+    __slots__ = ("seed", "policy", "outcome", "rooms_cleared", "turns", "fights", "hp_trace", "rng_draws")
+
+    def __init__(
+        self,
+        seed: int,
+        policy: str,
+        outcome: str,
+        rooms_cleared: int,
+        turns: int,
+        fights: int,
+        hp_trace: Tuple[int, ...],
+        rng_draws: int,
+    ):
+        self.seed = seed
+        self.policy = policy
+        self.outcome = outcome
+        self.rooms_cleared = rooms_cleared
+        self.turns = turns
+        self.fights = fights
+        self.hp_trace = hp_trace
+        self.rng_draws = rng_draws
+
+    def to_dict(self) -> dict:
+        """Итог в виде словаря (для JSON)"""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, RunSummary) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (
+            f"RunSummary(seed={self.seed}, policy={self.policy!r}, outcome={self.outcome!r}, "
+            f"rooms={self.rooms_cleared}, fights={self.fights})"
+        )
+
+
+def play_run(
+    generator: DungeonGenerator,
+    seed: int,
+    num_rooms: int = 5,
+    policy: str = "attack",
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> RunSummary:
+    """
+    Сыграть одну партию ботом с политикой policy.
+
+    Контроллер работает без вывода и без лога боя; исход партии тот же, что и у
+    игрока, выбравшего те же действия в игре с этим зерном.
+    """
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.rng = controller.combat_system.rng = CountingRandom()
+    controller.combat_system.log_enabled = False
+    controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+    choose = POLICIES[policy](controller)
+    player = controller.player
+
+    hp_trace = [player.current_health]
+    rooms_cleared = 0
+    outcome = "timeout"
+    while controller.running and controller.turn < max_turns:
+        action = choose(controller)
+        fighting = action == "attack" and controller.get_current_room().has_alive_enemy()
+        if not controller.execute_action(action):
+            controller.running = False
+            outcome = "exit" if action == "exit" else "quit" if action == "quit" else "defeat"
+        if fighting:
+            hp_trace.append(player.current_health)
+        if action == "exit":
+            rooms_cleared = len(controller.dungeon)
+        else:
+            rooms_cleared = max(rooms_cleared, controller.current_position)
+
+    return RunSummary(
+        seed,
+        policy,
+        outcome,
+        rooms_cleared,
+        controller.turn,
+        len(hp_trace) - 1,
+        tuple(hp_trace),
+        controller.rng.draws,
+    )
+
+
+# Генератор контента в процессе-работнике: загружается один раз на процесс
+_worker_generator: Optional[DungeonGenerator] = None
+
+
+def _init_worker(data_dir: str):
+    global _worker_generator
+    _worker_generator = DungeonGenerator.shared(data_dir)
+
+
+def _play_in_worker(args: Tuple[int, int, str, int]) -> RunSummary:
+    seed, num_rooms, policy, max_turns = args
+    return play_run(_worker_generator, seed, num_rooms, policy, max_turns)
+
+
+def play_many(
+    generator: DungeonGenerator,
+    seeds: Iterable[int],
+    num_rooms: int = 5,
+    policy: str = "attack",
+    processes: Optional[int] = None,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    chunksize: int = 256,
+) -> Iterator[RunSummary]:
+    """
+    Сыграть партию для каждого зерна; итоги отдаются в порядке зёрен.
+
+    :param processes: число процессов-работников (по умолчанию — по числу ядер);
+                      1 — играть в текущем процессе без пула
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+    if processes == 1:
+        for seed in seeds:
+            yield play_run(generator, seed, num_rooms, policy, max_turns)
+        return
+
+    tasks = ((seed, num_rooms, policy, max_turns) for seed in seeds)
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(str(generator.data_dir),)) as pool:
+        yield from pool.imap(_play_in_worker, tasks, chunksize=chunksize)
+
+
+def main():
+    """Прогнать много партий: python -m src.autoplay --runs 100000 --policy solver"""
+    parser = argparse.ArgumentParser(description="Массовая автоигра")
+    parser.add_argument("--runs", type=int, default=10_000, help="число партий")
+    parser.add_argument("--rooms", type=int, default=5, help="комнат в подземелье")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="attack")
+    parser.add_argument("--processes", type=int, default=None, help="число процессов")
+    parser.add_argument("--first-seed", type=int, default=0, help="зерно первой партии")
+    parser.add_argument("--data-dir", default="data", help="каталог с JSON-данными игры")
+    args = parser.parse_args()
+
+    generator = DungeonGenerator(data_dir=args.data_dir)
+    seeds = range(args.first_seed, args.first_seed + args.runs)
+    outcomes: Dict[str, int] = {}
+    fights = 0
+    start = time.perf_counter()
+    for summary in play_many(generator, seeds, args.rooms, args.policy, args.processes):
+        outcomes[summary.outcome] = outcomes.get(summary.outcome, 0) + 1
+        fights += summary.fights
+    elapsed = time.perf_counter() - start
+
+    print(f"runs: {args.runs}, policy: {args.policy}, {args.runs / elapsed * 3600:,.0f} runs/hour")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome}: {count} ({count / args.runs:.1%})")
+    print(f"  fights per run: {fights / max(args.runs, 1):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Колоночное хранение событий боя и действий для офлайн-анализа.
+
+Файл делится на блоки строк; в блоке каждое поле лежит отдельным массивом
+(array с фиксированным типом), строковые поля (имя врага, действие) заменены
+номерами из словаря. В оглавлении в конце файла для каждого блока записаны
+смещения колонок и их min/max (для словарных колонок — ещё и набор значений),
+поэтому запрос вида «бои с врагом X дольше 20 раундов» пропускает блоки,
+где таких строк быть не может, а нужные колонки читает из mmap без копирования.
+
+Запуск из корня проекта:
+    python -m src.columnar convert fights.jsonl fights.col
+    python -m src.columnar query fights.col --enemy Крыса --min-rounds 21
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.events import FightEvent, read_events
+
+COLUMNAR_MAGIC = b"RPGCOLS1"
+_TRAILER = struct.Struct("<Q8s")  # смещение оглавления, магия
+_ALIGN = 8
+_MAX_CHUNK_VALUES = 64  # сколько разных значений словарной колонки перечислять в оглавлении блока
+
+
+class Column(NamedTuple):
+    """Колонка: имя, код типа array и признак словарного кодирования строк"""
+
+    name: str
+    typecode: str
+    dictionary: bool = False
+
+
+FIGHT_SCHEMA = (
+    Column("enemy", "H", dictionary=True),
+    Column("won", "B"),
+    Column("rounds", "H"),
+    Column("damage_dealt", "I"),
+    Column("damage_taken", "I"),
+    Column("health", "I"),
+)
+
+ACTION_SCHEMA = (
+    Column("turn", "I"),
+    Column("action", "B", dictionary=True),
+    Column("position", "I"),
+    Column("health", "I"),
+)
+
+
+class ColumnarWriter:
+    """Запись строк в колоночный файл блоками по chunk_rows строк"""
+
+    def __init__(self, path: str, schema: Sequence[Column] = FIGHT_SCHEMA, chunk_rows: int = 65_536):
+        self.path = path
+        self.schema = tuple(schema)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(COLUMNAR_MAGIC)
+        self._dictionaries: List[Optional[Dict[str, int]]] = [
+            {} if column.dictionary else None for column in self.schema
+        ]
+        self._buffers = [array(column.typecode) for column in self.schema]
+        self._chunks: List[dict] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, row: Sequence):
+        """Добавить строку (значения в порядке колонок схемы)"""
+        for value, buffer, dictionary in zip(row, self._buffers, self._dictionaries):
+            if dictionary is not None:
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                value = code
+            buffer.append(value)
+        self.rows += 1
+        if len(self._buffers[0]) >= self.chunk_rows:
+            self._flush_chunk()
+
+    def extend(self, rows: Iterable[Sequence]):
+        for row in rows:
+            self.append(row)
+
+    def emit(self, event: FightEvent):
+        """Добавить событие боя (тот же интерфейс, что у писателей src.events)"""
+        self.append(event)
+
+    def record_action(self, controller, action: str):
+        """Добавить действие игрока (подписчик GameController.action_listeners, схема ACTION_SCHEMA)"""
+        self.append((controller.turn, action, controller.current_position, controller.player.current_health))
+
+    def _flush_chunk(self):
+        rows = len(self._buffers[0])
+        if not rows:
+            return
+        columns = []
+        for column, buffer in zip(self.schema, self._buffers):
+            padding = -self._file.tell() % _ALIGN
+            self._file.write(b"\0" * padding)
+            stats = {"offset": self._file.tell(), "min": min(buffer), "max": max(buffer)}
+            if column.dictionary:
+                values = set(buffer)
+                if len(values) <= _MAX_CHUNK_VALUES:
+                    stats["values"] = sorted(values)
+            buffer.tofile(self._file)
+            columns.append(stats)
+        self._chunks.append({"rows": rows, "columns": columns})
+        self._buffers = [array(column.typecode) for column in self.schema]
+
+    def close(self):
+        """Дописать последний блок и оглавление"""
+        if self._file.closed:
+            return
+        self._flush_chunk()
+        footer = {
+            "byteorder": sys.byteorder,
+            "schema": [list(column) for column in self.schema],
+            "dictionaries": {
+                column.name: list(dictionary)
+                for column, dictionary in zip(self.schema, self._dictionaries)
+                if dictionary is not None
+            },
+            "chunks": self._chunks,
+        }
+        offset = self._file.tell()
+        self._file.write(json.dumps(footer, ensure_ascii=False).encode("utf-8"))
+        self._file.write(_TRAILER.pack(offset, COLUMNAR_MAGIC))
+        self._file.close()
+
+
+class ColumnarReader:
+    """
+    Чтение колоночного файла через mmap с пропуском блоков по условиям.
+
+    Условия — именованные аргументы scan()/count(): значение (равенство) или
+    пара (нижняя, верхняя) границ включительно, где None — граница не задана.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset, magic = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        if magic != COLUMNAR_MAGIC or self._mmap[: len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            raise ValueError("Not a columnar event file")
+        footer = json.loads(self._mmap[offset: len(self._mmap) - _TRAILER.size])
+        if footer["byteorder"] != sys.byteorder:
+            raise ValueError(f"File was written on a {footer['byteorder']}-endian machine")
+        self.schema = tuple(Column(*column) for column in footer["schema"])
+        self.dictionaries: Dict[str, List[str]] = footer["dictionaries"]
+        self._codes = {name: {value: code for code, value in enumerate(values)} for name, values in self.dictionaries.items()}
+        self._chunks = footer["chunks"]
+        self._index = {column.name: i for i, column in enumerate(self.schema)}
+        # Метрики последних запросов
+        self.chunks_read = 0
+        self.chunks_skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(chunk["rows"] for chunk in self._chunks)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def _predicates(self, where: Dict[str, object]) -> Optional[List[Tuple[int, int, int]]]:
+        """Условия как (номер колонки, нижняя, верхняя граница) в кодах; None — условиям ничего не отвечает"""
+        predicates = []
+        for name, condition in where.items():
+            if name not in self._index:
+                raise ValueError(f"Unknown column: {name}")
+            column = self.schema[self._index[name]]
+            if column.dictionary:
+                if isinstance(condition, tuple):
+                    raise ValueError(f"Dictionary column {name} supports only equality")
+                code = self._codes[name].get(condition)
+                if code is None:
+                    return None
+                low = high = code
+            elif isinstance(condition, tuple):
+                low, high = condition
+                low = 0 if low is None else int(low)
+                high = sys.maxsize if high is None else int(high)
+            else:
+                low = high = int(condition)
+            predicates.append((self._index[name], low, high))
+        return predicates
+
+    @staticmethod
+    def _may_match(chunk: dict, predicates: List[Tuple[int, int, int]]) -> bool:
+        """Может ли в блоке быть строка, отвечающая условиям (по min/max и набору значений)"""
+        for index, low, high in predicates:
+            stats = chunk["columns"][index]
+            if stats["max"] < low or stats["min"] > high:
+                return False
+            values = stats.get("values")
+            if values is not None and low == high and low not in values:
+                return False
+        return True
+
+    def _view(self, chunk: dict, index: int) -> memoryview:
+        """Колонка блока без копирования: срез mmap, приведённый к типу колонки"""
+        column = self.schema[index]
+        offset = chunk["columns"][index]["offset"]
+        size = chunk["rows"] * array(column.typecode).itemsize
+        return memoryview(self._mmap)[offset: offset + size].cast(column.typecode)
+
+    def scan(self, columns: Optional[Sequence[str]] = None, **where) -> Iterator[tuple]:
+        """Строки (значения колонок columns, по умолчанию всех), отвечающие условиям"""
+        names = list(columns or [column.name for column in self.schema])
+        indexes = [self._index[name] for name in names]
+        predicates = self._predicates(where)
+        self.chunks_read = self.chunks_skipped = 0
+        if predicates is None:
+            self.chunks_skipped = len(self._chunks)
+            return
+        decoders = [self.dictionaries.get(name) for name in names]
+        for chunk in self._chunks:
+            if not self._may_match(chunk, predicates):
+                self.chunks_skipped += 1
+                continue
+            self.chunks_read += 1
+            selected: Iterable[int] = range(chunk["rows"])
+            for index, low, high in predicates:
+                values = self._view(chunk, index)
+                selected = [row for row in selected if low <= values[row] <= high]
+                values.release()
+            views = [self._view(chunk, index) for index in indexes]
+            try:
+                for row in selected:
+                    yield tuple(
+                        view[row] if decoder is None else decoder[view[row]]
+                        for view, decoder in zip(views, decoders)
+                    )
+            finally:
+                for view in views:
+                    view.release()
+
+    def count(self, **where) -> int:
+        """Число строк, отвечающих условиям"""
+        first = next(iter(where), self.schema[0].name)
+        return sum(1 for _ in self.scan([first], **where))
+
+
+def convert(events_path: str, columnar_path: str, chunk_rows: int = 65_536) -> int:
+    """Переписать журнал боёв (src.events) в колоночный файл; вернуть число событий"""
+    with ColumnarWriter(columnar_path, FIGHT_SCHEMA, chunk_rows) as writer:
+        writer.extend(read_events(events_path))
+        return writer.rows
+
+
+def main():
+    """Конвертация и запросы: python -m src.columnar query fights.col --enemy Крыса --min-rounds 21"""
+    parser = argparse.ArgumentParser(description="Колоночный журнал боёв")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="переписать журнал событий в колоночный файл")
+    convert_parser.add_argument("events")
+    convert_parser.add_argument("output")
+    query_parser = commands.add_parser("query", help="посчитать бои по условиям")
+    query_parser.add_argument("path")
+    query_parser.add_argument("--enemy", default=None)
+    query_parser.add_argument("--min-rounds", type=int, default=None)
+    query_parser.add_argument("--max-rounds", type=int, default=None)
+    query_parser.add_argument("--won", type=int, choices=(0, 1), default=None)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        print(f"events: {convert(args.events, args.output)}")
+        return
+    where = {}
+    if args.enemy is not None:
+        where["enemy"] = args.enemy
+    if args.min_rounds is not None or args.max_rounds is not None:
+        where["rounds"] = (args.min_rounds, args.max_rounds)
+    if args.won is not None:
+        where["won"] = args.won
+    with ColumnarReader(args.path) as reader:
+        print(f"fights: {reader.count(**where)}")
+        print(f"chunks read: {reader.chunks_read}, skipped: {reader.chunks_skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,44 @@
 """Боевая система с режимом автобоя"""
 
+import heapq
 import random
-from typing import Tuple, List
+import time
+from typing import List, Optional, Sequence, Tuple
 
 from src.entities import Player, Enemy
 from src.dungeon import DungeonGenerator
+from src import tracing
 
 
 class CombatSystem:
     """Отвечает за проведение боя между игроком и противником"""
 
-    def __init__(self, dungeon_generator: DungeonGenerator):
+    MAX_ROUNDS = 100  # после стольких раундов бой заканчивается ничьей по времени
+    TICKS_PER_ROUND = 100  # в бою со стаей оружие со скоростью 100 бьёт раз в раунд
+
+    __slots__ = ("generator", "rng", "combat_log", "log_enabled", "last_rounds", "last_attacker", "last_damage_taken")
+
+    def __init__(self, dungeon_generator: DungeonGenerator, rng: Optional[random.Random] = None):
+        """
+        :param rng: источник случайности сессии; по умолчанию — модуль random
+        """
         self.generator = dungeon_generator
+        self.rng = rng or random
         self.combat_log: List[str] = []
+        self.log_enabled = True  # False — бой без текстового лога (боты, повторы)
+        self.last_rounds = 0  # число раундов последнего боя
+        self.last_attacker: Optional[Enemy] = None  # враг, последним ударивший игрока в последнем бою
+        # Урон по игроку от каждого врага последнего боя со стаей (в порядке alive_enemies)
+        self.last_damage_taken: List[int] = []
 
     @staticmethod
-    def _check_hit(hit_chance: int) -> bool:
+    def alive_enemies(enemies: Sequence[Enemy]) -> List[Enemy]:
+        """Враги стаи, которые вступят в бой"""
+        return [enemy for enemy in enemies if not enemy.defeated and enemy.is_alive()]
+
+    def _check_hit(self, hit_chance: int) -> bool:
         """Проверка, попала ли атака, исходя из шанса попадания"""
-        roll = random.randint(1, 100)
+        roll = self.rng.randint(1, 100)
         return hit_chance >= roll
 
     def _attack(self, attacker, defender, is_player_attacking: bool) -> Tuple[bool, int]:
@@ -29,6 +50,20 @@ class CombatSystem:
         else:
             return False, 0
 
+    def _attack_message(self, message_type: str, **kwargs):
+        """
+        Добавить в лог сообщение об атаке.
+
+        При выключенном логе шаблон всё равно выбирается, чтобы расход ГСЧ
+        (и значит исход боя) не зависел от того, ведётся ли лог.
+        """
+        if self.log_enabled:
+            self.combat_log.append(
+                self.generator.get_attack_message(message_type, rng=self.rng, **kwargs)
+            )
+        else:
+            self.rng.choice(self.generator.enemies_data["attack_messages"][message_type])
+
     def auto_battle(self, player: Player, enemy: Enemy) -> bool:
         """
         Запустить автоматический бой между игроком и противником.
@@ -38,89 +73,204 @@ class CombatSystem:
             False – если победил противник (или ничья, где игрок отступает).
         """
         self.combat_log = []
-        max_rounds = 100
+        self.last_attacker = enemy
+        log = self.log_enabled
+        max_rounds = self.MAX_ROUNDS
         round_count = 0
+        tracer = tracing.active  # трассировка раундов; None — без накладных расходов
+        round_start = 0
 
-        self.combat_log.append("=" * 50)
-        self.combat_log.append("Состояние здоровья у вас:")
-        self.combat_log.append(f"{player.name}. Здоровье: {player.current_health}/{player.max_health}")
-        self.combat_log.append(f"\033[92m{player.get_health_bar()}\033[0m")
-        self.combat_log.append("")
-        self.combat_log.append("Состояние здоровья у противника:")
-        self.combat_log.append(f"{enemy.name}. Здоровье: {enemy.current_health}/{enemy.max_health}")
-        self.combat_log.append(f"\033[91m{enemy.get_health_bar()}\033[0m")
-        self.combat_log.append("")
-        self.combat_log.append("Вы решительно бросаетесь на противника. Завязался бой!")
-        self.combat_log.append("=" * 50)
+        if log:
+            self.combat_log.append("=" * 50)
+            self.combat_log.append("Состояние здоровья у вас:")
+            self.combat_log.append(f"{player.name}. Здоровье: {player.current_health}/{player.max_health}")
+            self.combat_log.append(f"\033[92m{player.get_health_bar()}\033[0m")
+            self.combat_log.append("")
+            self.combat_log.append("Состояние здоровья у противника:")
+            self.combat_log.append(f"{enemy.name}. Здоровье: {enemy.current_health}/{enemy.max_health}")
+            self.combat_log.append(f"\033[91m{enemy.get_health_bar()}\033[0m")
+            self.combat_log.append("")
+            self.combat_log.append("Вы решительно бросаетесь на противника. Завязался бой!")
+            self.combat_log.append("=" * 50)
 
         while player.is_alive() and enemy.is_alive() and round_count < max_rounds:
             round_count += 1
+            if tracer is not None:
+                round_start = time.perf_counter_ns()
 
-            self.combat_log.append("\nВы наносите удар!")
+            if log:
+                self.combat_log.append("\nВы наносите удар!")
             player_hit, player_damage = self._attack(player, enemy, True)
             if player_hit:
-                msg = self.generator.get_attack_message(
-                    "player_hit",
-                    damage=player_damage,
-                    target=enemy.name,
-                )
-                self.combat_log.append(msg)
+                self._attack_message("player_hit", damage=player_damage, target=enemy.name)
             else:
-                msg = self.generator.get_attack_message(
-                    "player_miss",
-                    target=enemy.name,
-                )
-                self.combat_log.append(msg)
+                self._attack_message("player_miss", target=enemy.name)
 
-            self.combat_log.append("\nСостояние здоровья у противника:")
-            self.combat_log.append(f"{enemy.name}. Здоровье: {enemy.current_health}/{enemy.max_health}")
-            self.combat_log.append(f"\033[91m{enemy.get_health_bar()}\033[0m")
+            if log:
+                self.combat_log.append("\nСостояние здоровья у противника:")
+                self.combat_log.append(f"{enemy.name}. Здоровье: {enemy.current_health}/{enemy.max_health}")
+                self.combat_log.append(f"\033[91m{enemy.get_health_bar()}\033[0m")
 
             if not enemy.is_alive():
+                if tracer is not None:
+                    tracer.complete("round", "combat", round_start, round=round_count)
                 break
 
-            self.combat_log.append(f"\n{enemy.name} наносит ответный удар. Берегитесь!")
+            if log:
+                self.combat_log.append(f"\n{enemy.name} наносит ответный удар. Берегитесь!")
             enemy_hit, enemy_damage = self._attack(enemy, player, False)
             if enemy_hit:
-                msg = self.generator.get_attack_message(
-                    "enemy_hit",
-                    damage=enemy_damage,
-                    attacker=enemy.name,
-                )
-                self.combat_log.append(msg)
+                self._attack_message("enemy_hit", damage=enemy_damage, attacker=enemy.name)
             else:
-                msg = self.generator.get_attack_message(
-                    "enemy_miss",
-                    attacker=enemy.name,
-                )
-                self.combat_log.append(msg)
+                self._attack_message("enemy_miss", attacker=enemy.name)
 
-            self.combat_log.append("\nСостояние здоровья у вас:")
-            self.combat_log.append(f"{player.name}. Здоровье: {player.current_health}/{player.max_health}")
-            self.combat_log.append(f"\033[92m{player.get_health_bar()}\033[0m")
+            if log:
+                self.combat_log.append("\nСостояние здоровья у вас:")
+                self.combat_log.append(f"{player.name}. Здоровье: {player.current_health}/{player.max_health}")
+                self.combat_log.append(f"\033[92m{player.get_health_bar()}\033[0m")
+            if tracer is not None:
+                tracer.complete("round", "combat", round_start, round=round_count)
+        self.last_rounds = round_count
 
         if round_count >= max_rounds:
-            self.combat_log.append("\n" + "=" * 50)
-            self.combat_log.append("Бой затянулся! Ничья по времени.")
+            if log:
+                self.combat_log.append("\n" + "=" * 50)
+                self.combat_log.append("Бой затянулся! Ничья по времени.")
             if player.current_health > enemy.current_health:
-                self.combat_log.append(f"Но {enemy.name} отступает первым!")
+                if log:
+                    self.combat_log.append(f"Но {enemy.name} отступает первым!")
                 enemy.defeat()
                 return True
             else:
-                self.combat_log.append("Вы вынуждены отступить...")
+                if log:
+                    self.combat_log.append("Вы вынуждены отступить...")
                 return False
 
-        self.combat_log.append("\n" + "=" * 50)
+        if log:
+            self.combat_log.append("\n" + "=" * 50)
         if player.is_alive():
-            victory_msg = self.generator.get_victory_message(enemy)
-            self.combat_log.append(victory_msg)
+            victory_msg = self.generator.get_victory_message(enemy, self.rng)
+            if log:
+                self.combat_log.append(victory_msg)
             enemy.defeat()
             return True
         else:
-            death_msg = random.choice(player.death_descriptions)
-            self.combat_log.append(f"Вы погибли... {death_msg}")
+            death_msg = self.rng.choice(player.death_descriptions)
+            if log:
+                self.combat_log.append(f"Вы погибли... {death_msg}")
             return False
 
+    def pack_battle(self, player: Player, enemies: Sequence[Enemy]) -> bool:
+        """
+        Запустить бой игрока со стаей врагов.
+
+        Ходы идут по шкале времени: боец бьёт раз в TICKS_PER_ROUND * 100 / скорость
+        оружия тиков. Очередь ходов — куча по (время, порядок), при равном времени
+        первым ходит игрок, затем враги в порядке стаи; павшие враги удаляются из
+        очереди лениво, когда подходит их ход. Игрок бьёт самого раненого врага:
+        цели — куча по здоровью, а здоровье меняется только у цели в её вершине,
+        так что куча остаётся кучей. Ход стоит O(log N).
+
+        Бой с одним живым врагом — ровно auto_battle. Кто из врагов последним
+        ударил игрока — в last_attacker, урон от каждого — в last_damage_taken.
+
+        Возвращает:
+            True – если победил игрок,
+            False – если игрок погиб или отступил по времени.
+        """
+        alive = self.alive_enemies(enemies)
+        if len(alive) == 1:
+            return self.auto_battle(player, alive[0])
+        self.last_attacker = None
+        self.last_damage_taken = damage_taken = [0] * len(alive)
+        if not alive:
+            self.combat_log = []
+            self.last_rounds = 0
+            return True
+
+        self.combat_log = []
+        log = self.log_enabled
+        ticks = self.TICKS_PER_ROUND
+        time_limit = self.MAX_ROUNDS * ticks
+        fighters = [player, *alive]
+        intervals = [max(1, ticks * 100 // fighter.weapon.speed) for fighter in fighters]
+        # (время хода, порядок бойца): порядок уникален, так что бойцы не сравниваются
+        timeline = [(0, order) for order in range(len(fighters))]
+        targets = [(enemy.current_health, order) for order, enemy in enumerate(alive, 1)]
+        heapq.heapify(targets)
+        now = 0
+
+        if log:
+            self.combat_log.append("=" * 50)
+            self.combat_log.append(f"На вас нападает стая: {', '.join(enemy.name for enemy in alive)}!")
+            self.combat_log.append(f"{player.name}. Здоровье: {player.current_health}/{player.max_health}")
+            self.combat_log.append("=" * 50)
+
+        while targets and player.is_alive():
+            now, order = heapq.heappop(timeline)
+            if now >= time_limit:
+                break
+            fighter = fighters[order]
+            if order == 0:
+                target = fighters[targets[0][1]]
+                if log:
+                    self.combat_log.append(f"\nВы наносите удар по {target.name}!")
+                hit, damage = self._attack(player, target, True)
+                if hit:
+                    self._attack_message("player_hit", damage=damage, target=target.name)
+                else:
+                    self._attack_message("player_miss", target=target.name)
+                if target.is_alive():
+                    # Здоровье цели только уменьшилось — вершина кучи остаётся минимальной
+                    targets[0] = (target.current_health, targets[0][1])
+                else:
+                    heapq.heappop(targets)
+                    victory_msg = self.generator.get_victory_message(target, self.rng)
+                    if log:
+                        self.combat_log.append(victory_msg)
+                    target.defeat()
+            elif fighter.defeated:
+                continue
+            else:
+                if log:
+                    self.combat_log.append(f"\n{fighter.name} наносит удар. Берегитесь!")
+                hit, damage = self._attack(fighter, player, False)
+                self.last_attacker = fighter
+                damage_taken[order - 1] += damage
+                if hit:
+                    self._attack_message("enemy_hit", damage=damage, attacker=fighter.name)
+                else:
+                    self._attack_message("enemy_miss", attacker=fighter.name)
+                if log:
+                    self.combat_log.append(
+                        f"{player.name}. Здоровье: {player.current_health}/{player.max_health}"
+                    )
+            heapq.heappush(timeline, (now + intervals[order], order))
+        self.last_rounds = min(now, time_limit - 1) // ticks + 1
+
+        if log:
+            self.combat_log.append("\n" + "=" * 50)
+        if not targets:
+            return True
+        if not player.is_alive():
+            death_msg = self.rng.choice(player.death_descriptions)
+            if log:
+                self.combat_log.append(f"Вы погибли... {death_msg}")
+            return False
+
+        remaining = [fighters[order] for _, order in targets]
+        if log:
+            self.combat_log.append("Бой затянулся! Ничья по времени.")
+        if player.current_health > sum(enemy.current_health for enemy in remaining):
+            if log:
+                self.combat_log.append("Но стая отступает первой!")
+            for enemy in remaining:
+                enemy.defeat()
+            return True
+        if log:
+            self.combat_log.append("Вы вынуждены отступить...")
+        return False
+
     def get_combat_log(self) -> str:
         """Вернуть форматированный текстовый лог боя одной строкой"""
         return "\n".join(self.combat_log)
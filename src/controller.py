@@ -1,46 +1,251 @@
 """Игровой контроллер — управляет игровым циклом и вводом пользователя"""
 
-from typing import List, Optional
+import random
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Generator, Iterator, List, Optional, Tuple, Union
 
 from src.entities import Player, Room
 from src.dungeon import DungeonGenerator
 from src.combat import CombatSystem
+from src.render import RenderBuffer
+
+if TYPE_CHECKING:
+    from src.pool import DungeonPool
+
+
+# Все действия игрока; номер в кортеже — компактный код действия в журналах и повторах
+ACTION_NAMES = ("forward", "back", "attack", "exit", "quit")
+
+
+def _format_menu(actions: dict) -> str:
+    """Сформировать текст меню действий"""
+    lines = ["\nВы можете:"]
+    for num, (_, description) in actions.items():
+        lines.append(f"  {num}. {description}")
+    return "\n".join(lines)
+
+
+class ActionMenu(dict):
+    """Меню действий комнаты с заранее подготовленным текстом (только для чтения)"""
+
+    __slots__ = ("text",)
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.text = _format_menu(self)
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("ActionMenu is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+def _build_menu(room_type: str, has_alive_enemy: bool) -> ActionMenu:
+    """Собрать меню действий для состояния комнаты (тип комнаты × есть ли живой враг)"""
+    items = []
+    if room_type != "Ex" and not has_alive_enemy:
+        items.append(("forward", "Пойти дальше"))
+    if room_type != "St":
+        items.append(("back", "Вернуться назад"))
+    if has_alive_enemy:
+        items.append(("attack", "Атаковать"))
+    if room_type == "Ex":
+        items.append(("exit", "Выйти из подземелья"))
+    return ActionMenu(enumerate(items, start=1))
+
+
+class _MenuCache(dict):
+    """Кэш меню по состоянию комнаты; незнакомые состояния достраиваются по запросу"""
+
+    def __missing__(self, key: Tuple[str, bool]) -> ActionMenu:
+        menu = self[key] = _build_menu(*key)
+        return menu
+
+
+_ACTION_MENUS = _MenuCache(
+    ((room_type, has_alive_enemy), _build_menu(room_type, has_alive_enemy))
+    for room_type in ("St", "Rm", "Ex")
+    for has_alive_enemy in (False, True)
+)
+
+
+# ГСЧ потока, общий для всех его сессий (см. GameController.rng)
+_thread_state = threading.local()
+
+
+def _thread_rng() -> random.Random:
+    """Вернуть ГСЧ текущего потока"""
+    try:
+        return _thread_state.rng
+    except AttributeError:
+        rng = _thread_state.rng = random.Random()
+        return rng
+
+
+def create_world(
+    generator: DungeonGenerator, seed: int, num_rooms: int, rng: Optional[random.Random] = None
+) -> Tuple[Player, List[Room]]:
+    """
+    Создать игрока и подземелье сессии из зерна.
+
+    Та же последовательность обращений к ГСЧ, что и в initialize_game, поэтому мир
+    из пула заранее сгенерированных игр совпадает с миром, созданным по тому же зерну.
+    """
+    rng = rng or random.Random()
+    rng.seed(seed << 32)
+    player = generator.create_player(rng)
+    return player, generator.generate_dungeon(num_rooms, rng=rng)
 
 
 class GameController:
     """Управляет ходом игры и взаимодействием с игроком"""
 
-    def __init__(self, dungeon_generator: DungeonGenerator):
+    # Сессия хранит только изменяемые числа и ссылки на общий контент генератора
+    __slots__ = (
+        "generator",
+        "pool",
+        "_rng",
+        "seed",
+        "turn",
+        "combat_system",
+        "player",
+        "dungeon",
+        "current_position",
+        "running",
+        "screen",
+        "_screen_depth",
+        "_capturing",
+        "action_listeners",
+    )
+
+    def __init__(
+        self,
+        dungeon_generator: DungeonGenerator,
+        screen: Optional[RenderBuffer] = None,
+        pool: Optional["DungeonPool"] = None,
+    ):
+        """
+        :param screen: буфер вывода экранов; например, RenderBuffer(binary=True)
+                       для вывода заранее закодированными UTF-8 фрагментами
+        :param pool: пул заранее сгенерированных игр (src.pool.DungeonPool);
+                     новые игры без явного зерна берутся из него
+        """
         self.generator = dungeon_generator
-        self.combat_system = CombatSystem(dungeon_generator)
+        self.pool = pool
+        # Случайность сессии выводится из (seed, turn): состояние ГСЧ — это два числа,
+        # поэтому его легко сохранить и воспроизвести, а сам ГСЧ не нужен сессии между ходами
+        self._rng: Optional[random.Random] = None
+        self.seed: int = 0
+        self.turn: int = 0
+        self.combat_system = CombatSystem(dungeon_generator, self.rng)
         self.player: Optional[Player] = None
         self.dungeon: List[Room] = []
         self.current_position: int = 0
         self.running: bool = False
+        self.screen = screen if screen is not None else RenderBuffer()
+        self._screen_depth = 0
+        self._capturing = False  # режим play(): экраны отдаются генератором, а не выводятся
+        # Подписчики на выполненные действия: listener(controller, action)
+        self.action_listeners: List[Callable[["GameController", str], None]] = []
+
+    @property
+    def rng(self) -> random.Random:
+        """
+        ГСЧ сессии.
+
+        По умолчанию — общий ГСЧ потока: каждое действие со случайностью
+        сначала пересевает его из (seed, turn), так что у сессии нет своего
+        состояния Mersenne Twister (~2.5 КБ). Присваивание задаёт собственный ГСЧ.
+        """
+        return self._rng if self._rng is not None else _thread_rng()
+
+    @rng.setter
+    def rng(self, rng: random.Random):
+        self._rng = rng
+
+    def _print(self, text: str = ""):
+        """Добавить строку в текущий экран"""
+        self.screen.line(text)
+
+    @contextmanager
+    def _render(self) -> Iterator[RenderBuffer]:
+        """Собрать весь вывод внутри блока в один экран и вывести его одной записью"""
+        self._screen_depth += 1
+        try:
+            yield self.screen
+        finally:
+            self._screen_depth -= 1
+            if self._screen_depth == 0 and not self._capturing:
+                self.screen.flush()
+
+    def _take_screen(self) -> str:
+        """Забрать накопленный экран из буфера (для режима play())"""
+        output = self.screen.getvalue()
+        self.screen.clear()
+        return output
+
+    def reseed(self):
+        """
+        Пересеять ГСЧ сессии для текущего хода.
+
+        Вызывается только действиями, которые используют случайность (бой):
+        пересев стоит несколько микросекунд, а переходы между комнатами его не требуют.
+        """
+        self.rng.seed((self.seed << 32) | self.turn)
 
-    def initialize_game(self, num_rooms: int = 5):
-        """Инициализировать игру: создать игрока и подземелье"""
-        self.player = self.generator.create_player()
-        self.dungeon = self.generator.generate_dungeon(num_rooms)
+    def initialize_game(
+        self, num_rooms: int = 5, wait_for_start: bool = True, seed: Optional[int] = None
+    ):
+        """
+        Инициализировать игру: создать игрока и подземелье.
+
+        :param wait_for_start: ждать нажатия Enter после приветствия
+                               (False — для неблокирующего режима play())
+        :param seed: зерно сессии (до 64 бит); по умолчанию выбирается случайно
+        """
+        entry = None
+        if self.pool is not None and seed is None and num_rooms == self.pool.num_rooms:
+            entry = self.pool.take()
+        if entry is not None:
+            self.seed, self.player, self.dungeon = entry.seed, entry.player, entry.dungeon
+        else:
+            # То же, что create_world, но подземелье строится уже после приветствия:
+            # первый экран не ждёт генерации и загрузки enemies.json
+            self.seed = seed if seed is not None else random.getrandbits(64)
+            self.rng.seed(self.seed << 32)
+            self.player = self.generator.create_player(self.rng)
+        self.turn = 0
         self.current_position = 0
         self.running = True
 
-        print("\n" + "=" * 70)
-        print("Добро пожаловать в текстовое подземелье!")
-        print("=" * 70)
-        print(f"\nВы - {self.player.name}")
-        print(self.player.description)
-        print(f"\nВаше оружие: {self.player.weapon.name}")
-        print(f"  {self.player.weapon.description}")
-        print(
-            f"  Урон: {self.player.weapon.damage}, "
-            f"Шанс попадания: {self.player.weapon.hit_chance}%"
-        )
-        print(f"\nВаша броня: {self.player.armor.name}")
-        print(f"  {self.player.armor.description}")
-        print(f"  Защита: {self.player.armor.defense}")
-        print(f"\nВаше здоровье: {self.player.current_health}/{self.player.max_health}")
-        print("\n" + "=" * 70)
+        with self._render() as screen:
+            screen.separator(blank_before=True)
+            screen.line("Добро пожаловать в текстовое подземелье!")
+            screen.separator()
+            screen.line(f"\nВы - {self.player.name}")
+            screen.line(self.player.description)
+            screen.line(f"\nВаше оружие: {self.player.weapon.name}")
+            screen.line(f"  {self.player.weapon.description}")
+            screen.line(
+                f"  Урон: {self.player.weapon.damage}, "
+                f"Шанс попадания: {self.player.weapon.hit_chance}%"
+            )
+            screen.line(f"\nВаша броня: {self.player.armor.name}")
+            screen.line(f"  {self.player.armor.description}")
+            screen.line(f"  Защита: {self.player.armor.defense}")
+            screen.line(f"\nВаше здоровье: {self.player.current_health}/{self.player.max_health}")
+            screen.separator(blank_before=True)
+        if entry is None:
+            self.dungeon = self.generator.generate_dungeon(num_rooms, rng=self.rng)
+        self.reseed()
+        if wait_for_start:
+            self.wait_for_start()
+
+    @staticmethod
+    def wait_for_start():
+        """Ждать нажатия Enter после приветствия"""
         input("\nНажмите Enter, чтобы начать приключение...")
 
     def get_current_room(self) -> Room:
@@ -52,50 +257,50 @@ class GameController:
         room = self.get_current_room()
         room.mark_visited()
 
-        print("\n" + "=" * 70)
-        print(f"Комната {self.current_position + 1} из {len(self.dungeon)}")
-        print("=" * 70)
-        print(f"Перед вами: {room.description}")
+        with self._render() as screen:
+            screen.separator(blank_before=True)
+            screen.line(f"Комната {self.current_position + 1} из {len(self.dungeon)}")
+            screen.separator()
+            screen.line(f"Перед вами: {room.description}")
 
-        if room.has_alive_enemy():
-            print(f"\nОпасность! В комнате находится: {room.enemy.name}")
-            print(f"   {room.enemy.description}")
-            print(f"   Здоровье врага: {room.enemy.current_health}/{room.enemy.max_health}")
-        elif room.enemy and room.enemy.defeated:
-            print(f"\nТруп поверженного {room.enemy.name} лежит на полу.")
-        else:
-            print("\nКомната пуста и безопасна.")
+            if room.pack and room.has_alive_enemy():
+                screen.line("\nОпасность! В комнате стая врагов:")
+                for enemy in room.enemies:
+                    if not enemy.defeated and enemy.is_alive():
+                        screen.line(f"   {enemy.name}. Здоровье: {enemy.current_health}/{enemy.max_health}")
+            elif room.has_alive_enemy():
+                screen.line(f"\nОпасность! В комнате находится: {room.enemy.name}")
+                screen.line(f"   {room.enemy.description}")
+                screen.line(f"   Здоровье врага: {room.enemy.current_health}/{room.enemy.max_health}")
+            elif room.pack:
+                names = ", ".join(enemy.name for enemy in room.enemies)
+                screen.line(f"\nТела поверженной стаи лежат на полу: {names}.")
+            elif room.enemy and room.enemy.defeated:
+                screen.line(f"\nТруп поверженного {room.enemy.name} лежит на полу.")
+            else:
+                screen.line("\nКомната пуста и безопасна.")
 
     def get_available_actions(self) -> dict:
-        """Получить список доступных действий в текущей комнате"""
-        actions = {}
-        action_num = 1
-        room = self.get_current_room()
-
-        if room.room_type != "Ex" and not room.has_alive_enemy():
-            actions[action_num] = ("forward", "Пойти дальше")
-            action_num += 1
-
-        if room.room_type != "St":
-            actions[action_num] = ("back", "Вернуться назад")
-            action_num += 1
+        """
+        Получить меню доступных действий в текущей комнате.
 
-        if room.has_alive_enemy():
-            actions[action_num] = ("attack", "Атаковать")
-            action_num += 1
-
-        if room.room_type == "Ex":
-            actions[action_num] = ("exit", "Выйти из подземелья")
-            action_num += 1
+        Меню заранее построены для каждого состояния комнаты и общие для всех
+        сессий, поэтому возвращаемый словарь изменять нельзя.
+        """
+        room = self.get_current_room()
+        return _ACTION_MENUS[room.room_type, room.has_alive_enemy()]
 
-        return actions
+    @staticmethod
+    def format_actions(actions: dict) -> str:
+        """Сформировать текст меню доступных действий"""
+        if isinstance(actions, ActionMenu):
+            return actions.text
+        return _format_menu(actions)
 
     @staticmethod
     def display_actions(actions: dict):
         """Вывести список доступных действий игроку"""
-        print("\nВы можете:")
-        for num, (_, description) in actions.items():
-            print(f"  {num}. {description}")
+        print(GameController.format_actions(actions))
 
     @staticmethod
     def get_user_input(actions: dict) -> Optional[str]:
@@ -114,49 +319,96 @@ class GameController:
                 print("\n\nИгра прервана пользователем.")
                 return "quit"
 
+    def _resolve_choice(self, choice: Union[int, str, None], actions: dict) -> Optional[str]:
+        """Преобразовать выбор игрока (номер пункта или имя действия) в действие"""
+        if isinstance(choice, str):
+            choice = choice.strip()
+            if choice.isdecimal():
+                choice = int(choice)
+            elif choice == "quit" or any(choice == name for name, _ in actions.values()):
+                return choice
+        if isinstance(choice, int) and choice in actions:
+            return actions[choice][0]
+        self._print(f"Неверный выбор. Введите число от 1 до {len(actions)}.")
+        return None
+
     def execute_action(self, action: str) -> bool:
         """Выполнить выбранное игроком действие"""
-        if action == "forward":
-            self.current_position += 1
-            print("\n➡Вы осторожно движетесь в следующую комнату...")
+        handler = self._action_handlers.get(action)
+        if handler is None:
             return True
+        self.turn += 1
+        # То же, что и with self._render(), но без накладных расходов генератора на каждом ходу
+        self._screen_depth += 1
+        try:
+            result = handler(self, self.screen)
+        finally:
+            self._screen_depth -= 1
+            if self._screen_depth == 0 and not self._capturing:
+                self.screen.flush()
+        for listener in self.action_listeners:
+            listener(self, action)
+        return result
 
-        elif action == "back":
-            self.current_position -= 1
-            print("\nВы возвращаетесь в предыдущую комнату...")
-            return True
+    def _action_forward(self, screen: RenderBuffer) -> bool:
+        """Перейти в следующую комнату"""
+        self.current_position += 1
+        screen.line("\n➡Вы осторожно движетесь в следующую комнату...")
+        return True
 
-        elif action == "attack":
-            room = self.get_current_room()
-            if room.has_alive_enemy():
-                print("\nБой начинается!")
+    def _action_back(self, screen: RenderBuffer) -> bool:
+        """Вернуться в предыдущую комнату"""
+        self.current_position -= 1
+        screen.line("\nВы возвращаетесь в предыдущую комнату...")
+        return True
+
+    def _action_attack(self, screen: RenderBuffer) -> bool:
+        """Атаковать врага в текущей комнате"""
+        room = self.get_current_room()
+        if room.has_alive_enemy():
+            self.reseed()
+            self.combat_system.rng = self.rng
+            screen.line("\nБой начинается!")
+            if room.pack:
+                player_won = self.combat_system.pack_battle(self.player, room.enemies)
+            else:
                 player_won = self.combat_system.auto_battle(self.player, room.enemy)
-                print(self.combat_system.get_combat_log())
-                if not player_won:
-                    print("\n" + "=" * 70)
-                    print("Игра окончена")
-                    print("=" * 70)
-                    return False
-                else:
-                    print("\nВраг повержен! Можете двигаться дальше.")
-            return True
+            screen.lines(self.combat_system.combat_log)
+            if not player_won:
+                screen.separator(blank_before=True)
+                screen.line("Игра окончена")
+                screen.separator()
+                self.running = False
+                return False
+            else:
+                screen.line("\nВраг повержен! Можете двигаться дальше.")
+        return True
 
-        elif action == "exit":
-            print("\n" + "=" * 70)
-            print("Поздравляем! Вы успешно прошли подземелье!")
-            print("=" * 70)
-            print(f"\nВы выходите на свет живым и невредимым, {self.player.name}!")
-            print(f"Оставшееся здоровье: {self.player.current_health}/{self.player.max_health}")
-            print("\nСпасибо за игру!")
-            self.running = False
-            return False
-
-        elif action == "quit":
-            print("\nДо свидания!")
-            self.running = False
-            return False
+    def _action_exit(self, screen: RenderBuffer) -> bool:
+        """Выйти из подземелья"""
+        screen.separator(blank_before=True)
+        screen.line("Поздравляем! Вы успешно прошли подземелье!")
+        screen.separator()
+        screen.line(f"\nВы выходите на свет живым и невредимым, {self.player.name}!")
+        screen.line(f"Оставшееся здоровье: {self.player.current_health}/{self.player.max_health}")
+        screen.line("\nСпасибо за игру!")
+        self.running = False
+        return False
 
-        return True
+    def _action_quit(self, screen: RenderBuffer) -> bool:
+        """Прервать игру"""
+        screen.line("\nДо свидания!")
+        self.running = False
+        return False
+
+    # Обработчики действий: общая для всех сессий таблица функций
+    _action_handlers: Dict[str, Callable[["GameController", RenderBuffer], bool]] = {
+        "forward": _action_forward,
+        "back": _action_back,
+        "attack": _action_attack,
+        "exit": _action_exit,
+        "quit": _action_quit,
+    }
 
     def run(self):
         """Основной игровой цикл"""
@@ -165,9 +417,10 @@ class GameController:
             return
 
         while self.running:
-            self.display_room()
-            actions = self.get_available_actions()
-            self.display_actions(actions)
+            with self._render() as screen:
+                self.display_room()
+                actions = self.get_available_actions()
+                screen.line(self.format_actions(actions))
             action = self.get_user_input(actions)
             if action is None:
                 continue
@@ -175,3 +428,44 @@ class GameController:
             if not should_continue:
                 self.running = False
                 break
+
+    def play(
+        self, num_rooms: Optional[int] = None
+    ) -> Generator[Tuple[str, dict], Union[int, str, None], None]:
+        """
+        Игровой цикл в виде генератора — без input() и print().
+
+        На каждом шаге отдаёт пару (текст экрана, доступные действия) и получает
+        через send() выбор игрока: номер пункта меню или имя действия
+        ("forward", "attack", "quit", ...). Последний шаг отдаёт финальный экран
+        с пустым словарём действий. Так один поток может вести сколько угодно
+        сессий под управлением любого планировщика.
+
+        :param num_rooms: если задан, игра инициализируется внутри генератора,
+                          и приветствие попадает в первый экран
+        """
+        self._capturing = True
+        self.screen.clear()
+        try:
+            if num_rooms is not None:
+                self.initialize_game(num_rooms, wait_for_start=False)
+            if not self.running:
+                self._print("Игра не инициализирована. Вызовите initialize_game() сначала")
+
+            while self.running:
+                self.display_room()
+                actions = self.get_available_actions()
+                self._print(self.format_actions(actions))
+
+                action = None
+                while action is None:
+                    choice = yield self._take_screen(), actions
+                    action = self._resolve_choice(choice, actions)
+
+                if not self.execute_action(action):
+                    self.running = False
+
+            yield self._take_screen(), {}
+        finally:
+            self._capturing = False
+            self.screen.clear()
@@ -0,0 +1,278 @@
+"""Оценка сложности сгенерированных подземелий"""
+
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from src.dungeon import DungeonGenerator
+from src.entities import Player, Room
+from src.solver import fight_outcome
+
+
+def exit_health_distribution(dungeon: List[Room], player: Player) -> Dict[int, float]:
+    """
+    Распределение здоровья игрока на выходе из подземелья.
+
+    Распределение оставшегося здоровья последовательно «сворачивается» с
+    распределением исходов каждого боя (по порядку комнат). Исходы боёв берутся
+    из общего кэша fight_outcome, так что одинаковые враги считаются один раз.
+    Время линейно по числу комнат. Сумма вероятностей — шанс дойти до выхода.
+    """
+    weapon = player.weapon
+    defense = player.armor.defense
+    distribution: Dict[int, float] = {player.current_health: 1.0} if player.is_alive() else {}
+
+    for room in dungeon:
+        if room.pack:
+            raise ValueError("Exact difficulty does not support rooms with enemy packs")
+        if room.has_alive_enemy():
+            enemy = room.enemy
+            after: Dict[int, float] = defaultdict(float)
+            for health, probability in distribution.items():
+                outcome = fight_outcome(
+                    health,
+                    weapon.damage,
+                    weapon.hit_chance,
+                    defense,
+                    enemy.current_health,
+                    enemy.weapon.damage,
+                    enemy.weapon.hit_chance,
+                    enemy.armor.defense,
+                )
+                for health_after, win_probability in outcome.win:
+                    after[health_after] += probability * win_probability
+            distribution = after
+        if room.room_type == "Ex" or not distribution:
+            break
+
+    return dict(distribution)
+
+
+def survival_probability(dungeon: List[Room], player: Player) -> float:
+    """Точная вероятность дойти до комнаты выхода живым"""
+    return sum(exit_health_distribution(dungeon, player).values())
+
+
+def is_winnable(dungeon: List[Room], player: Player, min_probability: float = 0.1) -> bool:
+    """Проверить, что шанс пройти подземелье не ниже min_probability"""
+    return survival_probability(dungeon, player) >= min_probability
+
+
+# Разреженная матрица переходов по здоровью: строка h — кортеж пар (здоровье после боя,
+# вероятность). Учитываются только победы, поэтому сумма строки — шанс пережить бой.
+# None означает единичную матрицу (комната без врага).
+_Matrix = Optional[List[Tuple[Tuple[int, float], ...]]]
+
+
+def _multiply(left: _Matrix, right: _Matrix) -> _Matrix:
+    """Произведение матриц переходов: сначала left, потом right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    size = len(left)
+    product = []
+    for row in left:
+        accumulated = [0.0] * size
+        for middle, probability in row:
+            for health, next_probability in right[middle]:
+                accumulated[health] += probability * next_probability
+        product.append(tuple((health, p) for health, p in enumerate(accumulated) if p))
+    return product
+
+
+class _TransitionTree:
+    """Дерево отрезков над комнатами: в узлах — произведения матриц переходов"""
+
+    def __init__(self, leaves: List[_Matrix]):
+        self.count = len(leaves)
+        self.size = 1
+        while self.size < max(1, self.count):
+            self.size *= 2
+        self.nodes: List[_Matrix] = [None] * (2 * self.size)
+        self.nodes[self.size:self.size + self.count] = leaves
+        for index in range(self.size - 1, 0, -1):
+            self.nodes[index] = _multiply(self.nodes[2 * index], self.nodes[2 * index + 1])
+
+    def update(self, position: int, matrix: _Matrix):
+        """Заменить матрицу комнаты и пересчитать путь до корня: O(log n) умножений"""
+        index = self.size + position
+        self.nodes[index] = matrix
+        index //= 2
+        while index:
+            self.nodes[index] = _multiply(self.nodes[2 * index], self.nodes[2 * index + 1])
+            index //= 2
+
+    def _cover(self, low: int, high: int) -> List[_Matrix]:
+        """Узлы, покрывающие комнаты [low, high), в порядке прохождения"""
+        left, right = [], []
+        low += self.size
+        high += self.size
+        while low < high:
+            if low & 1:
+                left.append(self.nodes[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                right.append(self.nodes[high])
+            low //= 2
+            high //= 2
+        return left + right[::-1]
+
+    def forward(self, distribution: List[float], low: int, high: int) -> List[float]:
+        """Распределение здоровья после прохождения комнат [low, high)"""
+        for matrix in self._cover(low, high):
+            if matrix is None:
+                continue
+            after = [0.0] * len(distribution)
+            for health, probability in enumerate(distribution):
+                if probability:
+                    for health_after, p in matrix[health]:
+                        after[health_after] += probability * p
+            distribution = after
+        return distribution
+
+    def backward(self, values: List[float], low: int, high: int) -> List[float]:
+        """Шанс дойти до конца отрезка [low, high) для каждого здоровья на его входе"""
+        for matrix in reversed(self._cover(low, high)):
+            if matrix is None:
+                continue
+            values = [sum(p * values[health_after] for health_after, p in row) for row in matrix]
+        return values
+
+
+class DifficultyTuner:
+    """
+    Генерация подземелий с заданной вероятностью прохождения.
+
+    Для игрока один раз строятся таблицы переходов по здоровью для каждого
+    шаблона врага. Затем подземелье собирается локальными изменениями
+    содержимого комнат: для выбранной комнаты
+    все варианты (пусто / каждый шаблон) оцениваются за O(здоровье²) по
+    распределению здоровья до неё и ценностям после неё, а принятая замена
+    пересчитывает только путь в дереве отрезков — O(log n) вместо полного
+    пересчёта подземелья.
+    """
+
+    def __init__(self, generator: DungeonGenerator, player: Player):
+        self.generator = generator
+        self.player = player
+        self.max_health = player.current_health
+        weapon, defense = player.weapon, player.armor.defense
+        self.tables: List[_Matrix] = []
+        for template in generator.enemies_data["enemies"]:
+            rows = [()]
+            for health in range(1, self.max_health + 1):
+                rows.append(
+                    fight_outcome(
+                        health,
+                        weapon.damage,
+                        weapon.hit_chance,
+                        defense,
+                        template["health"],
+                        template["weapon"]["damage"],
+                        template["weapon"]["hit_chance"],
+                        template["armor"]["defense"],
+                    ).win
+                )
+            self.tables.append(rows)
+
+    def _start_distribution(self) -> List[float]:
+        distribution = [0.0] * (self.max_health + 1)
+        distribution[self.max_health] = 1.0
+        return distribution
+
+    def _score(self, candidate: Optional[int], before: List[float], after: List[float]) -> float:
+        """Шанс пройти подземелье, если в комнату поставить candidate (None — пусто)"""
+        if candidate is None:
+            return sum(p * v for p, v in zip(before, after))
+        table = self.tables[candidate]
+        return sum(
+            p * sum(q * after[health_after] for health_after, q in table[health])
+            for health, p in enumerate(before)
+            if p
+        )
+
+    def generate(
+        self,
+        target: float,
+        tolerance: float = 0.05,
+        num_rooms: int = 5,
+        rng: Optional[random.Random] = None,
+        max_steps: Optional[int] = None,
+    ) -> List[Room]:
+        """
+        Сгенерировать подземелье с шансом прохождения target ± tolerance.
+
+        Сначала в пустое подземелье по одному добавляются враги в случайные
+        комнаты, пока шанс не опустится до цели; затем, если нужно, содержимое
+        случайных комнат заменяется на вариант, ближайший к цели.
+
+        :raises ValueError: если за max_steps замен попасть в цель не удалось
+                            (например, комнат слишком мало для такой сложности)
+        """
+        if num_rooms < 2:
+            raise ValueError("Dungeon must have at least 2 rooms (start and exit)")
+        rng = rng or random
+        max_steps = max_steps if max_steps is not None else 50 + 10 * num_rooms
+        templates = list(range(len(self.tables)))
+
+        # Содержимое комнат: None — пусто, иначе номер шаблона врага
+        contents: List[Optional[int]] = [None] * num_rooms
+        tree = _TransitionTree(list(contents))
+        start = self._start_distribution()
+        alive = [0.0] + [1.0] * self.max_health
+        probability = 1.0 if self.max_health > 0 else 0.0
+
+        def place(position: int, options: List[Optional[int]]) -> float:
+            """Поставить в комнату вариант, ближайший к цели; вернуть новый шанс"""
+            before = tree.forward(start, 0, position)
+            after = tree.backward(alive, position + 1, num_rooms)
+            _, _, score, choice = min(
+                (abs(score - target), rng.random(), score, option)
+                for option in options
+                for score in (self._score(option, before, after),)
+            )
+            if choice != contents[position]:
+                contents[position] = choice
+                tree.update(position, None if choice is None else self.tables[choice])
+            return score
+
+        empty = list(range(1, num_rooms - 1))
+        while probability > target + tolerance and empty:
+            position = empty.pop(rng.randrange(len(empty)))
+            probability = place(position, templates)
+
+        steps = 0
+        while abs(probability - target) > tolerance and num_rooms > 2 and steps < max_steps:
+            probability = place(rng.randrange(1, num_rooms - 1), [None] + templates)
+            steps += 1
+
+        if abs(probability - target) > tolerance:
+            raise ValueError(
+                f"Could not reach win probability {target:.2f} ± {tolerance:.2f} "
+                f"with {num_rooms} rooms (best: {probability:.3f})"
+            )
+        return self._build_rooms(contents, rng)
+
+    def _build_rooms(self, contents: List[Optional[int]], rng) -> List[Room]:
+        """Создать комнаты с выбранными врагами и случайными описаниями"""
+        descriptions = self.generator.rooms_data["descriptions"]
+        rooms = []
+        for position, template in enumerate(contents):
+            room_type = "St" if position == 0 else "Ex" if position == len(contents) - 1 else "Rm"
+            enemy = self.generator.build_enemy(template) if template is not None else None
+            rooms.append(Room(room_type, rng.choice(descriptions), enemy))
+        return rooms
+
+
+def generate_dungeon_for_difficulty(
+    generator: DungeonGenerator,
+    player: Player,
+    target: float,
+    tolerance: float = 0.05,
+    num_rooms: int = 5,
+    rng: Optional[random.Random] = None,
+) -> List[Room]:
+    """Сгенерировать подземелье с шансом прохождения target ± tolerance для игрока"""
+    return DifficultyTuner(generator, player).generate(target, tolerance, num_rooms, rng=rng)
@@ -1,81 +1,152 @@
 """Генератор и менеджер подземелья"""
 
 import json
+import os
 import random
-from pathlib import Path
-from typing import List
+import time
+from typing import Dict, List, Optional, Tuple
 
 from src.entities import Player, Enemy, Room, Weapon, Armor
 
+# Общие генераторы процесса по каталогу данных (см. DungeonGenerator.shared)
+_SHARED: Dict[str, "DungeonGenerator"] = {}
+
 
 class DungeonGenerator:
-    """Генерирует подземелье и игровые сущности на его основе"""
+    """
+    Генерирует подземелье и игровые сущности на его основе.
+
+    Весь неизменяемый контент (тексты, шаблоны, сообщения) хранится в генераторе;
+    сущности сессий ссылаются на его строки и общие экземпляры снаряжения врагов,
+    поэтому один генератор на процесс обслуживает сколько угодно сессий.
+    """
 
     def __init__(self, data_dir: str = "data"):
         """
         :param data_dir: путь к директории с JSON-файлами данных
                          (player.json, enemies.json, rooms.json)
         """
-        self.data_dir = Path(data_dir)
+        self.data_dir = os.fspath(data_dir)  # без pathlib: он заметно удлиняет запуск
+        self.load_times: Dict[str, float] = {}  # время загрузки каждого файла, с
         self.player_data = self._load_json("player.json")
-        self.enemies_data = self._load_json("enemies.json")
         self.rooms_data = self._load_json("rooms.json")
+        # enemies.json нужен только с первым врагом — читается при первом обращении
+        self._enemies_data: Optional[dict] = None
+        self._content_hash: Optional[str] = None
+        self._content_index: Optional[Dict[str, Dict[str, int]]] = None
+        # Снаряжение врагов по шаблонам: одно на всех врагов шаблона (только для чтения)
+        self._enemy_gear: Optional[List[Tuple[Weapon, Armor]]] = None
+
+    @classmethod
+    def shared(cls, data_dir: str = "data") -> "DungeonGenerator":
+        """Общий для процесса генератор для каталога данных (создаётся один раз)"""
+        key = os.path.abspath(data_dir)
+        generator = _SHARED.get(key)
+        if generator is None:
+            generator = _SHARED[key] = cls(data_dir)
+        return generator
 
     def _load_json(self, filename: str) -> dict:
         """Загружает и парсит JSON-файл с данными"""
-        file_path = self.data_dir / filename
+        start = time.perf_counter()
+        file_path = os.path.join(self.data_dir, filename)
         with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    def create_player(self) -> Player:
-        """Создает сущность игрока на основе данных из player.json"""
-        name = random.choice(self.player_data["names"])
-        description = random.choice(self.player_data["descriptions"])
-        health = self.player_data["health"]
-
-        weapon_data = self.player_data["weapon"]
-        weapon = Weapon(
+            data = json.load(f)
+        self.load_times[filename] = time.perf_counter() - start
+        return data
+
+    @property
+    def enemies_data(self) -> dict:
+        """Данные enemies.json (загружаются при первом обращении)"""
+        if self._enemies_data is None:
+            self._enemies_data = self._load_json("enemies.json")
+        return self._enemies_data
+
+    @enemies_data.setter
+    def enemies_data(self, data: dict):
+        self._enemies_data = data
+        self._enemy_gear = None
+
+    def content_hash(self) -> str:
+        """SHA-256 загруженного контента (для проверки сохранений и повторов)"""
+        if self._content_hash is None:
+            import hashlib  # нужен только для сохранений и повторов
+
+            digest = hashlib.sha256()
+            for data in (self.player_data, self.enemies_data, self.rooms_data):
+                digest.update(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    def content_index(self) -> Dict[str, Dict[str, int]]:
+        """Индексы пулов контента «текст -> номер в JSON» (для компактных сохранений)"""
+        if self._content_index is None:
+            self._content_index = {
+                "names": {text: i for i, text in enumerate(self.player_data["names"])},
+                "player_descriptions": {
+                    text: i for i, text in enumerate(self.player_data["descriptions"])
+                },
+                "room_descriptions": {
+                    text: i for i, text in enumerate(self.rooms_data["descriptions"])
+                },
+                "enemies": {
+                    enemy["name"]: i for i, enemy in enumerate(self.enemies_data["enemies"])
+                },
+            }
+        return self._content_index
+
+    @staticmethod
+    def _make_weapon(weapon_data: dict) -> Weapon:
+        """Создает оружие по описанию из JSON"""
+        return Weapon(
             weapon_data["name"],
             weapon_data["description"],
             weapon_data["damage"],
             weapon_data["hit_chance"],
+            weapon_data.get("speed", 100),
         )
 
-        armor_data = self.player_data["armor"]
-        armor = Armor(
+    @staticmethod
+    def _make_armor(armor_data: dict) -> Armor:
+        """Создает броню по описанию из JSON"""
+        return Armor(
             armor_data["name"],
             armor_data["description"],
             armor_data["defense"],
         )
 
+    def build_player(self, name: str, description: str) -> Player:
+        """Создает игрока с заданными именем и описанием на основе player.json"""
         return Player(
             name,
-            health,
-            weapon,
-            armor,
+            self.player_data["health"],
+            self._make_weapon(self.player_data["weapon"]),
+            self._make_armor(self.player_data["armor"]),
             description,
             self.player_data["death_descriptions"],
         )
 
-    def create_enemy(self) -> Enemy:
-        """Создает случайного противника на основе enemies.json"""
-        enemy_data = random.choice(self.enemies_data["enemies"])
-
-        weapon_data = enemy_data["weapon"]
-        weapon = Weapon(
-            weapon_data["name"],
-            weapon_data["description"],
-            weapon_data["damage"],
-            weapon_data["hit_chance"],
-        )
+    def create_player(self, rng: Optional[random.Random] = None) -> Player:
+        """Создает сущность игрока на основе данных из player.json"""
+        rng = rng or random
+        name = rng.choice(self.player_data["names"])
+        description = rng.choice(self.player_data["descriptions"])
+        return self.build_player(name, description)
 
-        armor_data = enemy_data["armor"]
-        armor = Armor(
-            armor_data["name"],
-            armor_data["description"],
-            armor_data["defense"],
-        )
+    def build_enemy(self, template_index: int) -> Enemy:
+        """
+        Создает противника по номеру шаблона в enemies.json.
 
+        Оружие и броня общие для всех врагов шаблона: у врага меняется
+        только здоровье и флаг победы.
+        """
+        enemy_data = self.enemies_data["enemies"][template_index]
+        if self._enemy_gear is None:
+            self._enemy_gear = [
+                (self._make_weapon(data["weapon"]), self._make_armor(data["armor"]))
+                for data in self.enemies_data["enemies"]
+            ]
+        weapon, armor = self._enemy_gear[template_index]
         return Enemy(
             enemy_data["name"],
             enemy_data["health"],
@@ -85,33 +156,76 @@ class DungeonGenerator:
             enemy_data["death_description"],
         )
 
-    def create_room(self, room_type: str, has_enemy: bool = False) -> Room:
-        """Создает сущность комнаты"""
-        description = random.choice(self.rooms_data["descriptions"])
-        enemy = self.create_enemy() if has_enemy else None
-        return Room(room_type, description, enemy)
+    def create_enemy(self, rng: Optional[random.Random] = None) -> Enemy:
+        """Создает случайного противника на основе enemies.json"""
+        rng = rng or random
+        return self.build_enemy(rng.randrange(len(self.enemies_data["enemies"])))
+
+    def create_room(
+        self,
+        room_type: str,
+        has_enemy: bool = False,
+        rng: Optional[random.Random] = None,
+        pack_size: int = 1,
+    ) -> Room:
+        """
+        Создает сущность комнаты.
+
+        :param pack_size: сколько врагов в комнате, если has_enemy
+        """
+        rng = rng or random
+        description = rng.choice(self.rooms_data["descriptions"])
+        if not has_enemy:
+            return Room(room_type, description)
+        enemy = self.create_enemy(rng)
+        pack = [self.create_enemy(rng) for _ in range(pack_size - 1)]
+        return Room(room_type, description, enemy, pack)
+
+    def generate_dungeon(
+        self,
+        num_rooms: int = 5,
+        enemy_probability: float = 0.6,
+        rng: Optional[random.Random] = None,
+        pack_probability: Optional[float] = None,
+        max_pack: Optional[int] = None,
+    ) -> List[Room]:
+        """
+        Генерирует подземелье в виде списка комнат.
 
-    def generate_dungeon(self, num_rooms: int = 5, enemy_probability: float = 0.6) -> List[Room]:
-        """Генерирует подземелье в виде списка комнат"""
+        :param rng: источник случайности сессии; по умолчанию — модуль random
+        :param pack_probability: вероятность, что в комнате с врагом их стая (от 2 до max_pack);
+                                 по умолчанию — из rooms.json ("pack_probability", "max_pack"), иначе 0.
+                                 При 0 случайные числа на стаи не тратятся, подземелье как раньше
+        """
         if num_rooms < 2:
             raise ValueError("Dungeon must have at least 2 rooms (start and exit)")
+        rng = rng or random
+        if pack_probability is None:
+            pack_probability = self.rooms_data.get("pack_probability", 0.0)
+        if max_pack is None:
+            max_pack = self.rooms_data.get("max_pack", 3)
 
-        dungeon = [self.create_room("St", has_enemy=False)]
+        dungeon = [self.create_room("St", has_enemy=False, rng=rng)]
 
         for _ in range(num_rooms - 2):
-            has_enemy = random.random() < enemy_probability
-            dungeon.append(self.create_room("Rm", has_enemy=has_enemy))
+            has_enemy = rng.random() < enemy_probability
+            pack_size = 1
+            if has_enemy and pack_probability and rng.random() < pack_probability:
+                pack_size = rng.randint(2, max_pack)
+            dungeon.append(self.create_room("Rm", has_enemy=has_enemy, rng=rng, pack_size=pack_size))
 
-        dungeon.append(self.create_room("Ex", has_enemy=False))
+        dungeon.append(self.create_room("Ex", has_enemy=False, rng=rng))
 
         return dungeon
 
-    def get_victory_message(self, enemy: Enemy) -> str:
+    def get_victory_message(self, enemy: Enemy, rng: Optional[random.Random] = None) -> str:
         """Получает случайное сообщение о победе над противником"""
-        template = random.choice(self.rooms_data["victory_messages"])
+        template = (rng or random).choice(self.rooms_data["victory_messages"])
         return template.format(enemy=enemy.name, death_desc=enemy.death_description)
 
-    def get_attack_message(self, message_type: str, **kwargs) -> str:
+    def get_attack_message(
+        self, message_type: str, rng: Optional[random.Random] = None, **kwargs
+    ) -> str:
         """Получает случайное сообщение о результате атаки"""
-        template = random.choice(self.enemies_data["attack_messages"][message_type])
+        template = (rng or random).choice(self.enemies_data["attack_messages"][message_type])
         return template.format(**kwargs)
\ No newline at end of file
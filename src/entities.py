@@ -1,15 +1,23 @@
 """Игровые сущности: Игрок, Противник, Оружие, Броня, Комната подземелья"""
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 
 class Weapon:
     """Сущность оружия"""
 
-    def __init__(self, name: str, description: str, damage: int, hit_chance: int):
+    __slots__ = ("name", "description", "damage", "hit_chance", "speed")
+
+    def __init__(self, name: str, description: str, damage: int, hit_chance: int, speed: int = 100):
+        """
+        :param speed: скорость атаки в процентах: 200 — вдвое чаще обычного (важно в бою со стаей)
+        """
+        if speed <= 0:
+            raise ValueError("Weapon speed must be positive")
         self.name = name
         self.description = description
         self.damage = damage
         self.hit_chance = hit_chance
+        self.speed = speed
 
     def __repr__(self):
         return f"Weapon({self.name}, damage={self.damage}, hit_chance={self.hit_chance}%)"
@@ -18,6 +26,8 @@ class Weapon:
 class Armor:
     """Сущность брони"""
 
+    __slots__ = ("name", "description", "defense")
+
     def __init__(self, name: str, description: str, defense: int):
         self.name = name
         self.description = description
@@ -30,6 +40,9 @@ class Armor:
 class Character:
     """Базовый класс персонажа (общий для игрока и противников)"""
 
+    # Тексты — ссылки на строки общего контента генератора, копий на сессию нет
+    __slots__ = ("name", "max_health", "current_health", "weapon", "armor", "description")
+
     def __init__(
         self,
         name: str,
@@ -75,6 +88,8 @@ class Character:
 class Player(Character):
     """Класс игрока"""
 
+    __slots__ = ("death_descriptions",)
+
     def __init__(
         self,
         name: str,
@@ -94,6 +109,8 @@ class Player(Character):
 class Enemy(Character):
     """Класс противника"""
 
+    __slots__ = ("death_description", "defeated")
+
     def __init__(
         self,
         name: str,
@@ -115,19 +132,37 @@ class Enemy(Character):
 class Room:
     """Комната подземелья"""
 
-    def __init__(self, room_type: str, description: str, enemy: Optional[Enemy] = None):
+    # enemy — первый (или единственный) враг комнаты, pack — остальные враги стаи
+    __slots__ = ("room_type", "description", "enemy", "pack", "visited")
+
+    def __init__(
+        self,
+        room_type: str,
+        description: str,
+        enemy: Optional[Enemy] = None,
+        pack: Sequence[Enemy] = (),
+    ):
+        if pack and enemy is None:
+            raise ValueError("A room with a pack must have a first enemy")
         self.room_type = room_type
         self.description = description
         self.enemy = enemy
+        self.pack = tuple(pack)
         self.visited = False
 
+    @property
+    def enemies(self) -> Tuple[Enemy, ...]:
+        """Все враги комнаты"""
+        return (self.enemy, *self.pack) if self.enemy is not None else ()
+
     def has_alive_enemy(self) -> bool:
         """Проверка, есть ли в комнате живой (и ещё не помеченный побеждённым) враг"""
-        return (
-            self.enemy is not None
-            and not self.enemy.defeated
-            and self.enemy.is_alive()
-        )
+        enemy = self.enemy
+        if enemy is not None and not enemy.defeated and enemy.is_alive():
+            return True
+        if self.pack:
+            return any(not member.defeated and member.is_alive() for member in self.pack)
+        return False
 
     def mark_visited(self):
         """Пометить комнату как посещённую"""
@@ -135,4 +170,6 @@ class Room:
 
     def __repr__(self):
         enemy_status = f", Enemy={self.enemy.name}" if self.enemy else ""
+        if self.pack:
+            enemy_status += f" +{len(self.pack)}"
         return f"Room({self.room_type}{enemy_status})"
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+Журнал событий боя для аналитики: JSON Lines или компактный двоичный формат.
+
+Запись включается на время, как трассировка и метрики: пока журнал выключен,
+бои CombatSystem не обёрнуты и ничего не стоят. Бой со стаей пишется
+событием на каждого её врага.
+
+Двоичный формат — заголовок и записи фиксированного размера (16 байт), так что
+файл можно делить на части по смещениям без разбора. Имена врагов кодируются
+словарём: при первой встрече имени пишутся записи-определения (куски по 12
+байт), а записи боёв ссылаются на номер имени.
+"""
+
+import functools
+import json
+import os
+import struct
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from src import hooks
+
+BINARY_MAGIC = b"RPGFIGHT"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<8sH6x")
+RECORD_SIZE = 16
+_FIGHT = struct.Struct("<BBHHHII")  # вид, победа, имя, раунды, здоровье, урон нанесён, урон получен
+_NAME = struct.Struct("<BBH12s")  # вид, номер куска (| _LAST_PART), имя, кусок UTF-8
+_KIND_NAME = 0
+_KIND_FIGHT = 1
+_LAST_PART = 0x80
+_NAME_CHUNK = 12
+_READ_RECORDS = 4096  # записей за одно чтение двоичного файла
+
+
+class FightEvent(NamedTuple):
+    """Итог одного боя; enemy — имя врага (или номер имени, если определение в другой части файла)"""
+
+    enemy: Union[str, int]
+    won: bool
+    rounds: int
+    damage_dealt: int
+    damage_taken: int
+    health: int
+
+
+class JsonLinesWriter:
+    """Запись событий по одному JSON-объекту в строке"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.events = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def emit(self, event: FightEvent):
+        self._file.write(json.dumps(event._asdict(), ensure_ascii=False) + "\n")
+        self.events += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryWriter:
+    """Запись событий в двоичном формате (16 байт на бой)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.events = 0
+        self._names: Dict[str, int] = {}
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION))
+
+    def _name_id(self, name: str) -> int:
+        """Номер имени; при первой встрече имя записывается в файл"""
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+            if name_id > 0xFFFF:
+                raise ValueError("Too many distinct enemy names for the binary event format")
+            data = name.encode("utf-8")
+            chunks = [data[i:i + _NAME_CHUNK] for i in range(0, len(data), _NAME_CHUNK)] or [b""]
+            if len(chunks) > _LAST_PART:
+                raise ValueError(f"Enemy name is too long: {name!r}")
+            for part, chunk in enumerate(chunks):
+                flags = part | (_LAST_PART if part == len(chunks) - 1 else 0)
+                self._file.write(_NAME.pack(_KIND_NAME, flags, name_id, chunk))
+        return name_id
+
+    def emit(self, event: FightEvent):
+        self._file.write(
+            _FIGHT.pack(
+                _KIND_FIGHT,
+                event.won,
+                self._name_id(event.enemy),
+                event.rounds,
+                event.health,
+                event.damage_dealt,
+                event.damage_taken,
+            )
+        )
+        self.events += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NameTable:
+    """Имена врагов из записей-определений двоичного файла (в том числе собранные из разных частей)"""
+
+    def __init__(self):
+        self.parts: Dict[int, Dict[int, bytes]] = {}
+        self.sizes: Dict[int, int] = {}  # номер имени -> число кусков (известно по последнему куску)
+        self.names: Dict[int, str] = {}
+
+    def add_part(self, name_id: int, flags: int, chunk: bytes):
+        part = flags & ~_LAST_PART
+        self.parts.setdefault(name_id, {})[part] = chunk.rstrip(b"\0")
+        if flags & _LAST_PART:
+            self.sizes[name_id] = part + 1
+        self._complete(name_id)
+
+    def _complete(self, name_id: int):
+        parts = self.parts.get(name_id, {})
+        size = self.sizes.get(name_id)
+        if size is not None and len(parts) == size:
+            self.names[name_id] = b"".join(parts[i] for i in range(size)).decode("utf-8")
+            del self.parts[name_id]
+
+    def merge(self, other: "NameTable"):
+        """Добавить имена и куски, найденные в другой части файла"""
+        self.names.update(other.names)
+        self.sizes.update(other.sizes)
+        for name_id, parts in other.parts.items():
+            if name_id not in self.names:
+                self.parts.setdefault(name_id, {}).update(parts)
+                self._complete(name_id)
+
+    def resolve(self, enemy: Union[str, int]) -> str:
+        return enemy if isinstance(enemy, str) else self.names.get(enemy, f"#{enemy}")
+
+
+def is_binary(path: str) -> bool:
+    """Файл в двоичном формате событий (иначе — JSON Lines)"""
+    with open(path, "rb") as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def split_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Разбить файл на parts диапазонов байтов для параллельного чтения.
+
+    В двоичном файле границы выровнены по записям; в JSON Lines границы
+    произвольные — read_events сам дочитывает строку, начатую в его диапазоне.
+    """
+    size = os.path.getsize(path)
+    if is_binary(path):
+        records = (size - _HEADER.size) // RECORD_SIZE
+        bounds = [_HEADER.size + records * i // parts * RECORD_SIZE for i in range(parts + 1)]
+    else:
+        bounds = [size * i // parts for i in range(parts + 1)]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _json_lines(file: BinaryIO, start: int, end: Optional[int]) -> Iterator[bytes]:
+    """Строки, начинающиеся в диапазоне [start, end)"""
+    position = start
+    if start > 0:
+        # Строка, начатая до start, принадлежит предыдущему диапазону
+        file.seek(start - 1)
+        position += len(file.readline()) - 1
+    for line in file:
+        if end is not None and position >= end:
+            return
+        position += len(line)
+        yield line
+
+
+def _parse_json(lines: Iterator[bytes]) -> Iterator[FightEvent]:
+    for line in lines:
+        if line.strip():
+            yield FightEvent(**json.loads(line))
+
+
+def _binary_events(
+    file: BinaryIO, start: int, end: Optional[int], names: NameTable
+) -> Iterator[FightEvent]:
+    start = max(start, _HEADER.size)
+    file.seek(start)
+    remaining = None if end is None else max(0, end - start)
+    while remaining is None or remaining > 0:
+        size = _READ_RECORDS * RECORD_SIZE
+        block = file.read(size if remaining is None else min(size, remaining))
+        if len(block) < RECORD_SIZE:
+            return
+        if remaining is not None:
+            remaining -= len(block)
+        for offset in range(0, len(block) - RECORD_SIZE + 1, RECORD_SIZE):
+            if block[offset] == _KIND_FIGHT:
+                _, won, name_id, rounds, health, dealt, taken = _FIGHT.unpack_from(block, offset)
+                yield FightEvent(names.names.get(name_id, name_id), bool(won), rounds, dealt, taken, health)
+            else:
+                _, flags, name_id, chunk = _NAME.unpack_from(block, offset)
+                names.add_part(name_id, flags, chunk)
+
+
+def read_events(
+    path: str, start: int = 0, end: Optional[int] = None, names: Optional[NameTable] = None
+) -> Iterator[FightEvent]:
+    """
+    Потоково прочитать события файла (или диапазона байтов [start, end)).
+
+    Память не зависит от размера файла. Если определение имени врага лежит вне
+    диапазона, в событии вместо имени — его номер; names собирает найденные
+    определения, чтобы разрешить номера после объединения частей.
+    """
+    names = NameTable() if names is None else names
+    binary = is_binary(path)
+    with open(path, "rb") as file:
+        if binary:
+            version = _HEADER.unpack(file.read(_HEADER.size))[1]
+            if version != BINARY_VERSION:
+                raise ValueError(f"Unsupported event file version: {version}")
+            yield from _binary_events(file, start, end, names)
+        else:
+            yield from _parse_json(_json_lines(file, start, end))
+
+
+# Журнал, в который пишет обёрнутый auto_battle; None — журнал выключен
+active: Optional[Union[JsonLinesWriter, BinaryWriter]] = None
+
+
+def _record_fight(function: Callable) -> Callable:
+    @functools.wraps(function)
+    def auto_battle(combat, player, enemy):
+        writer = active
+        if writer is None:
+            return function(combat, player, enemy)
+        player_health, enemy_health = player.current_health, enemy.current_health
+        won = function(combat, player, enemy)
+        writer.emit(
+            FightEvent(
+                enemy.name,
+                won,
+                combat.last_rounds,
+                enemy_health - enemy.current_health,
+                player_health - player.current_health,
+                player.current_health,
+            )
+        )
+        return won
+
+    return auto_battle
+
+
+def _record_pack_fight(function: Callable) -> Callable:
+    @functools.wraps(function)
+    def pack_battle(combat, player, enemies):
+        writer = active
+        if writer is None:
+            return function(combat, player, enemies)
+        alive = combat.alive_enemies(enemies)
+        if len(alive) <= 1:
+            # Бой с одним врагом — это auto_battle, его событие запишет обёртка auto_battle
+            return function(combat, player, enemies)
+        health_before = [enemy.current_health for enemy in alive]
+        won = function(combat, player, enemies)
+        for enemy, enemy_health, damage_taken in zip(alive, health_before, combat.last_damage_taken):
+            writer.emit(
+                FightEvent(
+                    enemy.name,
+                    enemy.defeated,
+                    combat.last_rounds,
+                    enemy_health - enemy.current_health,
+                    damage_taken,
+                    player.current_health,
+                )
+            )
+        return won
+
+    return pack_battle
+
+
+def enable(path: str, binary: bool = False) -> Union[JsonLinesWriter, BinaryWriter]:
+    """Начать запись событий боя в файл path"""
+    global active
+    from src.combat import CombatSystem
+
+    if active is not None:
+        active.close()
+    active = BinaryWriter(path) if binary else JsonLinesWriter(path)
+    hooks.install("events", CombatSystem, "auto_battle", _record_fight)
+    hooks.install("events", CombatSystem, "pack_battle", _record_pack_fight)
+    return active
+
+
+def disable() -> Optional[Union[JsonLinesWriter, BinaryWriter]]:
+    """Остановить запись событий и закрыть файл"""
+    global active
+    writer, active = active, None
+    hooks.uninstall("events")
+    if writer is not None:
+        writer.close()
+    return writer
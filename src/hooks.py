@@ -0,0 +1,51 @@
+"""Временная подмена методов обёртками (трассировка, метрики)"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+# Слои обёрток по атрибутам: (класс, атрибут) -> [(владелец слоя, фабрика обёртки)]
+_layers: Dict[Tuple[type, str], List[Tuple[str, Callable[[Callable], Callable]]]] = {}
+# Исходные значения подменённых атрибутов
+_originals: Dict[Tuple[type, str], Any] = {}
+
+
+def _apply(key: Tuple[type, str]):
+    """Собрать атрибут заново: исходная функция, обёрнутая всеми слоями по порядку"""
+    owner, attribute = key
+    original = _originals[key]
+    layers = _layers.get(key)
+    if not layers:
+        setattr(owner, attribute, original)
+        del _originals[key]
+        _layers.pop(key, None)
+        return
+    is_static = isinstance(original, staticmethod)
+    function = original.__func__ if is_static else original
+    for _, make_wrapper in layers:
+        function = make_wrapper(function)
+    setattr(owner, attribute, staticmethod(function) if is_static else function)
+
+
+def install(layer: str, owner: type, attribute: str, make_wrapper: Callable[[Callable], Callable]):
+    """
+    Обернуть метод owner.attribute функцией make_wrapper(исходная) от имени слоя layer.
+
+    Слои независимы: снятие одного не затрагивает обёртки других.
+    """
+    key = (owner, attribute)
+    if key not in _originals:
+        _originals[key] = owner.__dict__[attribute]
+    layers = _layers.setdefault(key, [])
+    if any(name == layer for name, _ in layers):
+        return
+    layers.append((layer, make_wrapper))
+    _apply(key)
+
+
+def uninstall(layer: str):
+    """Снять все обёртки слоя layer"""
+    for key in list(_layers):
+        layers = _layers[key]
+        remaining = [entry for entry in layers if entry[0] != layer]
+        if len(remaining) != len(layers):
+            _layers[key] = remaining
+            _apply(key)
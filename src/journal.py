@@ -0,0 +1,221 @@
+"""Журнал действий сессии: периодические снапшоты и хвост действий после них"""
+
+import heapq
+import itertools
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.controller import ACTION_NAMES, GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer, RenderBuffer
+from src.savegame import load_game, save_game
+
+# Запись журнала: номер хода после действия + код действия. Случайность хода
+# однозначно выводится из (seed, turn), поэтому для повтора этого достаточно.
+_RECORD = struct.Struct("<IB")
+_ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+
+class JournalError(ValueError):
+    """Журнал или снапшот сессии повреждён"""
+
+
+class _JournalFlusher:
+    """
+    Один фоновый поток на процесс, сбрасывающий хвосты журналов.
+
+    Журнал с несброшенными записями ставит себя в очередь со сроком
+    sync_interval; поток спит до ближайшего срока, так что простаивающие
+    сессии не держат хвост в буфере, а потоков не больше одного.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        # (срок, порядковый номер, журнал): номер уникален, так что журналы не сравниваются
+        self._queue: List[Tuple[float, int, "ActionJournal"]] = []
+        self._order = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, journal: "ActionJournal", delay: float):
+        """Сбросить хвост журнала через delay секунд"""
+        with self._condition:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._order), journal))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if self._queue and self._queue[0][0] <= now:
+                        _, _, journal = heapq.heappop(self._queue)
+                        break
+                    self._condition.wait(self._queue[0][0] - now if self._queue else None)
+            journal._sync_tail()
+
+
+_flusher = _JournalFlusher()
+
+
+def _paths(directory: str, session_id: str):
+    """Пути к файлам снапшота и журнала сессии"""
+    base = Path(directory)
+    return base / f"{session_id}.snap", base / f"{session_id}.journal"
+
+
+class ActionJournal:
+    """
+    Журнал действий одной сессии (event sourcing).
+
+    Каждое выполненное действие дописывается в буферизованный файл журнала;
+    fsync выполняется пачками — раз в sync_every записей или раз в sync_interval
+    секунд. Хвост пачки, после которого действий больше нет, через
+    sync_interval секунд сбрасывает общий для всех журналов фоновый поток, так
+    что простаивающая сессия не держит его в буфере. Каждые snapshot_every действий пишется компактный снапшот (см.
+    src.savegame), после чего журнал обнуляется.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        session_id: str,
+        snapshot_every: int = 100,
+        sync_every: int = 64,
+        sync_interval: float = 0.005,
+    ):
+        """
+        :param snapshot_every: снапшот каждые N действий
+        :param sync_every: fsync не реже чем раз в N записей
+        :param sync_interval: fsync не реже чем раз в столько секунд
+                              (столько журнала может потеряться при сбое)
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.snapshot_path, self.journal_path = _paths(directory, session_id)
+        self.snapshot_every = snapshot_every
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = open(self.journal_path, "ab")
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+        # Хвост сбрасывает поток _flusher, поэтому запись и сброс идут под блокировкой
+        self._lock = threading.Lock()
+        self._tail_scheduled = False
+        self.controller: Optional[GameController] = None
+
+    def attach(self, controller: GameController):
+        """Начать журналирование сессии: сразу пишется начальный снапшот"""
+        self.controller = controller
+        controller.action_listeners.append(self.record)
+        self.snapshot()
+
+    def detach(self):
+        """Прекратить журналирование сессии"""
+        if self.controller is not None:
+            self.controller.action_listeners.remove(self.record)
+            self.controller = None
+
+    def record(self, controller: GameController, action: str):
+        """Дописать действие в журнал (подписчик GameController.action_listeners)"""
+        with self._lock:
+            self._file.write(_RECORD.pack(controller.turn, _ACTION_CODES[action]))
+            self._unsynced += 1
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every:
+                self._snapshot()
+            elif (
+                self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+            elif not self._tail_scheduled:
+                self._tail_scheduled = True
+                _flusher.schedule(self, self.sync_interval)
+
+    def _sync_tail(self):
+        """Сбросить хвост журнала (вызывается потоком _flusher)"""
+        with self._lock:
+            self._tail_scheduled = False
+            if not self._file.closed:
+                self._sync()
+
+    def sync(self):
+        """Сбросить буфер журнала на диск"""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def snapshot(self):
+        """Записать снапшот сессии и начать журнал заново"""
+        with self._lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        data = save_game(self.controller)
+        tmp_path = self.snapshot_path.with_suffix(".snap.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Если сбой случится до обнуления, записи старше снапшота будут пропущены по номеру хода
+        self._file.seek(0)
+        self._file.truncate()
+        self._unsynced = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Сбросить журнал на диск и закрыть файл"""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+        self.detach()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def recover_session(
+    generator: DungeonGenerator,
+    directory: str,
+    session_id: str,
+    screen: Optional[RenderBuffer] = None,
+) -> GameController:
+    """
+    Восстановить сессию: загрузить последний снапшот и повторить хвост журнала.
+
+    Недописанная последняя запись (сбой посреди записи) отбрасывается.
+    """
+    snapshot_path, journal_path = _paths(directory, session_id)
+    controller = load_game(generator, snapshot_path.read_bytes(), NullRenderBuffer())
+
+    journal = journal_path.read_bytes() if journal_path.exists() else b""
+    usable = len(journal) - len(journal) % _RECORD.size
+    for turn, code in _RECORD.iter_unpack(journal[:usable]):
+        if turn <= controller.turn:
+            continue
+        if turn != controller.turn + 1 or code >= len(ACTION_NAMES):
+            raise JournalError(f"Journal record for turn {turn} does not follow turn {controller.turn}")
+        if not controller.execute_action(ACTION_NAMES[code]):
+            controller.running = False
+
+    controller.screen = screen if screen is not None else RenderBuffer()
+    return controller
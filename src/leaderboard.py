@@ -0,0 +1,152 @@
+"""
+Таблица рекордов и история партий поверх GameStore.
+
+Агрегаты (смерти от каждого врага, итоги каждого игрока) поддерживает триггер
+SQLite в той же транзакции, что и вставка партии, поэтому запросы не
+пересчитывают историю, а читают готовые строки или идут по индексу.
+"""
+
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from src.controller import GameController
+from src.store import RUN_FIELDS, GameStore, run_from_row
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS runs_by_health ON runs (outcome, health DESC, id);
+CREATE INDEX IF NOT EXISTS runs_by_player ON runs (player, id DESC);
+CREATE TABLE IF NOT EXISTS enemy_deaths (
+    enemy TEXT PRIMARY KEY,
+    deaths INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_totals (
+    player TEXT PRIMARY KEY,
+    runs INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    best_health INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+_TRIGGER = """
+CREATE TRIGGER runs_aggregate AFTER INSERT ON runs BEGIN
+    INSERT INTO enemy_deaths (enemy, deaths) SELECT NEW.killed_by, 1 WHERE NEW.killed_by IS NOT NULL
+        ON CONFLICT (enemy) DO UPDATE SET deaths = deaths + 1;
+    INSERT INTO player_totals (player, runs, wins, best_health)
+        VALUES (NEW.player, 1, NEW.outcome = 'exit', CASE WHEN NEW.outcome = 'exit' THEN NEW.health ELSE 0 END)
+        ON CONFLICT (player) DO UPDATE SET
+            runs = runs + 1,
+            wins = wins + excluded.wins,
+            best_health = max(best_health, excluded.best_health);
+END;
+"""
+
+# Пересчёт агрегатов по уже записанным партиям (при первом подключении к старой базе)
+_REBUILD = """
+DELETE FROM enemy_deaths;
+DELETE FROM player_totals;
+INSERT INTO enemy_deaths (enemy, deaths)
+    SELECT killed_by, COUNT(*) FROM runs WHERE killed_by IS NOT NULL GROUP BY killed_by;
+INSERT INTO player_totals (player, runs, wins, best_health)
+    SELECT player, COUNT(*), SUM(outcome = 'exit'), MAX(CASE WHEN outcome = 'exit' THEN health ELSE 0 END)
+    FROM runs GROUP BY player;
+"""
+
+_TOP = f"SELECT {', '.join(RUN_FIELDS)} FROM runs WHERE outcome = 'exit' ORDER BY health DESC, id LIMIT ?"
+_HISTORY = f"SELECT {', '.join(RUN_FIELDS)} FROM runs WHERE player = ? ORDER BY id DESC LIMIT ?"
+_DEATHS = "SELECT enemy, deaths FROM enemy_deaths ORDER BY deaths DESC, enemy"
+_PLAYER = "SELECT runs, wins, best_health FROM player_totals WHERE player = ?"
+
+
+def run_outcome(controller: GameController, action: str) -> Optional[str]:
+    """
+    Итог партии после действия action: "exit", "defeat", "quit" или None, если игра идёт.
+
+    Тот же разбор, что и в execute_action: игра заканчивается выходом,
+    выходом из игры или проигранным боем.
+    """
+    if controller.running:
+        return None
+    if action in ("exit", "quit"):
+        return action
+    return "defeat"
+
+
+def _killer(controller: GameController) -> Optional[str]:
+    """Имя врага, победившего игрока: последний ударивший в бою (в стае — именно он)"""
+    attacker = controller.combat_system.last_attacker
+    if attacker is None:
+        attacker = controller.get_current_room().enemy
+    return attacker.name if attacker is not None else None
+
+
+class Leaderboard:
+    """Запросы по партиям: лучшие по оставшемуся здоровью, смерти от врагов, история игрока"""
+
+    def __init__(self, store: GameStore):
+        self.store = store
+        connection = sqlite3.connect(store.path, isolation_level=None)
+        try:
+            connection.executescript(_INDEXES)
+            # BEGIN IMMEDIATE: писатель хранилища не вставит партию между пересчётом и триггером
+            connection.execute("BEGIN IMMEDIATE")
+            installed = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'runs_aggregate'"
+            ).fetchone()
+            if not installed:
+                for statement in _REBUILD.split(";"):
+                    if statement.strip():
+                        connection.execute(statement)
+                connection.execute(_TRIGGER)
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def track(self, controller: GameController, player: str):
+        """Записать итог партии controller, когда она закончится"""
+        started = time.monotonic()
+        recorded = False
+
+        def on_action(controller: GameController, action: str):
+            nonlocal recorded
+            outcome = run_outcome(controller, action)
+            # Подписчик не удаляется из списка: execute_action как раз идёт по нему
+            if outcome is None or recorded:
+                return
+            recorded = True
+            self.store.record_run(
+                player,
+                outcome,
+                rooms_cleared=len(controller.dungeon) if outcome == "exit" else controller.current_position,
+                health=controller.player.current_health,
+                fights=sum(enemy.defeated for room in controller.dungeon for enemy in room.enemies),
+                turns=controller.turn,
+                seed=controller.seed or 0,
+                duration=time.monotonic() - started,
+                killed_by=_killer(controller) if outcome == "defeat" else None,
+            )
+
+        controller.action_listeners.append(on_action)
+
+    def top(self, limit: int = 10) -> List[dict]:
+        """Лучшие выходы из подземелья по оставшемуся здоровью"""
+        with self.store.reader() as connection:
+            rows = connection.execute(_TOP, (limit,)).fetchall()
+        return [run_from_row(row) for row in rows]
+
+    def deaths_by_enemy(self) -> Dict[str, int]:
+        """Сколько раз каждый враг победил игрока, от самых опасных"""
+        with self.store.reader() as connection:
+            return dict(connection.execute(_DEATHS).fetchall())
+
+    def history(self, player: str, limit: int = 20) -> List[dict]:
+        """Последние партии игрока, новые первыми"""
+        with self.store.reader() as connection:
+            rows = connection.execute(_HISTORY, (player, limit)).fetchall()
+        return [run_from_row(row) for row in rows]
+
+    def player_totals(self, player: str) -> Optional[Dict[str, int]]:
+        """Итоги игрока: партий, побед и лучшее оставшееся здоровье"""
+        with self.store.reader() as connection:
+            row = connection.execute(_PLAYER, (player,)).fetchone()
+        return dict(zip(("runs", "wins", "best_health"), row)) if row else None
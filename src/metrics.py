@@ -0,0 +1,331 @@
+"""Метрики времени выполнения: счётчики и гистограммы с выводом в формате Prometheus"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src import hooks
+
+# Реестр, в который пишут инструментированные методы; None — метрики выключены
+active: Optional["Registry"] = None
+
+
+def log_linear_buckets(low: float, high: float, per_octave: int = 4) -> Tuple[float, ...]:
+    """
+    Границы корзин в духе HDR-гистограмм: каждая октава [2^k, 2^(k+1)) делится
+    на per_octave равных частей, так что относительная ошибка не зависит от величины.
+    """
+    bounds = []
+    base = low
+    while base < high:
+        step = base / per_octave
+        bounds.extend(base + step * i for i in range(per_octave))
+        base *= 2
+    bounds.append(base)
+    return tuple(bounds)
+
+
+# 1 мкс … ~16 с, ошибка квантиля не больше 25 %
+LATENCY_BUCKETS = log_linear_buckets(1e-6, 10.0)
+ROUND_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 30, 50, 75, 100)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _PerThread:
+    """Ячейки значений по потокам: запись без блокировок, чтение суммирует все ячейки"""
+
+    def __init__(self, make_cell: Callable[[], list]):
+        self._make_cell = make_cell
+        self._local = threading.local()
+        self._cells: List[list] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._make_cell()
+            with self._lock:
+                self._cells.append(cell)
+            return cell
+
+    def cells(self) -> List[list]:
+        with self._lock:
+            return list(self._cells)
+
+
+class Counter:
+    """Монотонный счётчик; у каждого потока своя ячейка"""
+
+    def __init__(self):
+        self._values = _PerThread(lambda: [0])
+
+    def inc(self, amount: int = 1):
+        self._values.cell()[0] += amount
+
+    def value(self) -> int:
+        return sum(cell[0] for cell in self._values.cells())
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин; у каждого потока свои корзины"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        size = len(self.bounds) + 1  # последняя корзина — всё, что больше верхней границы
+        # ячейка: [счётчики корзин..., сумма]
+        self._values = _PerThread(lambda: [0] * size + [0.0])
+
+    def observe(self, value: float):
+        cell = self._values.cell()
+        cell[bisect.bisect_left(self.bounds, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Суммарные (счётчики корзин, сумма значений) по всем потокам"""
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        for cell in self._values.cells():
+            for index in range(len(counts)):
+                counts[index] += cell[index]
+            total += cell[-1]
+        return counts, total
+
+    def count(self) -> int:
+        return sum(self.snapshot()[0])
+
+    def quantile(self, q: float) -> float:
+        """Квантиль q (0..1): верхняя граница корзины, в которую он попадает"""
+        counts, _ = self.snapshot()
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+
+class _Family:
+    """Метрика с метками: дочерние метрики по значениям меток"""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Sequence[str], make: Callable):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._make = make
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Дочерняя метрика для значений меток (создаётся при первом обращении)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(values, self._make())
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class Registry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+
+    def _register(self, name: str, family: _Family) -> _Family:
+        if name in self._families:
+            raise ValueError(f"Metric {name} is already registered")
+        self._families[name] = family
+        return family
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        """Зарегистрировать счётчик; без меток возвращается сам счётчик"""
+        family = self._register(name, _Family(name, help_text, "counter", labels, Counter))
+        return family if labels else family.labels()
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        """Зарегистрировать гистограмму; без меток возвращается сама гистограмма"""
+        family = self._register(name, _Family(name, help_text, "histogram", labels, lambda: Histogram(buckets)))
+        return family if labels else family.labels()
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (exposition format 0.0.4)"""
+        lines = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, metric in family.children():
+                if family.kind == "counter":
+                    labels = _format_labels(family.label_names, values)
+                    lines.append(f"{family.name}{labels} {metric.value()}")
+                    continue
+                counts, total = metric.snapshot()
+                cumulative = 0
+                for bound, count in zip(metric.bounds + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_number(bound)
+                    labels = _format_labels(family.label_names, values, f'le="{le}"')
+                    lines.append(f"{family.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(family.label_names, values)
+                lines.append(f"{family.name}_sum{labels} {_format_number(total)}")
+                lines.append(f"{family.name}_count{labels} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def write_to(self, path: str):
+        """Атомарно записать метрики в файл (например, для textfile-коллектора node_exporter)"""
+        path = Path(path)
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(self.render(), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def serve(self, port: int = 9100, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Отдавать метрики по HTTP (GET /metrics) в фоновом потоке; вернуть сервер для shutdown()"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+class GameMetrics:
+    """Стандартные метрики игры"""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        self.registry = registry or Registry()
+        self.fights = self.registry.counter("game_fights_total", "Resolved fights", ["result"])
+        self.rounds = self.registry.histogram(
+            "game_fight_rounds", "Rounds per fight", buckets=ROUND_BUCKETS
+        )
+        self.rooms = self.registry.counter("game_rooms_generated_total", "Generated rooms")
+        self.actions = self.registry.counter("game_actions_total", "Executed actions", ["action"])
+        self.phases = self.registry.histogram("game_phase_seconds", "Phase latency", ["phase"])
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+def _timed(
+    phase: str, after: Optional[Callable] = None, skip: Optional[Callable] = None
+) -> Callable[[Callable], Callable]:
+    """
+    Фабрика обёртки: время вызова — в гистограмму фазы, затем after(метрики, аргументы, результат).
+
+    :param skip: skip(аргументы) истинно — вызов не учитывается (его учтёт другая обёртка)
+    """
+
+    def make_wrapper(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            metrics = active
+            if metrics is None or (skip is not None and skip(args)):
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            metrics.phases.labels(phase).observe(time.perf_counter() - start)
+            if after is not None:
+                after(metrics, args, result)
+            return result
+
+        return wrapper
+
+    return make_wrapper
+
+
+def _count_rooms(metrics: GameMetrics, args, dungeon):
+    metrics.rooms.inc(len(dungeon))
+
+
+def _count_fight(metrics: GameMetrics, args, player_won):
+    metrics.fights.labels("win" if player_won else "loss").inc()
+    metrics.rounds.observe(args[0].last_rounds)
+
+
+def _delegated_pack(args) -> bool:
+    """Бой со стаей, где остался один враг, — это auto_battle, и учтёт его обёртка auto_battle"""
+    combat, _, enemies = args
+    return len(combat.alive_enemies(enemies)) <= 1
+
+
+def _count_action(function: Callable) -> Callable:
+    @functools.wraps(function)
+    def wrapper(controller, action):
+        metrics = active
+        if metrics is not None and action in controller._action_handlers:
+            metrics.actions.labels(action).inc()
+        return function(controller, action)
+
+    return wrapper
+
+
+def enable(metrics: Optional[GameMetrics] = None) -> GameMetrics:
+    """
+    Включить сбор метрик.
+
+    Как и трассировка, метрики подменяют методы обёртками только пока
+    включены, так что в выключенном состоянии ничего не стоят.
+    """
+    global active
+    from src.combat import CombatSystem
+    from src.controller import GameController
+    from src.dungeon import DungeonGenerator
+    from src.render import RenderBuffer
+
+    active = metrics or GameMetrics()
+    hooks.install("metrics", DungeonGenerator, "create_player", _timed("generation"))
+    hooks.install("metrics", DungeonGenerator, "generate_dungeon", _timed("generation", _count_rooms))
+    hooks.install("metrics", CombatSystem, "auto_battle", _timed("combat", _count_fight))
+    hooks.install("metrics", CombatSystem, "pack_battle", _timed("combat", _count_fight, _delegated_pack))
+    hooks.install("metrics", GameController, "display_room", _timed("render"))
+    hooks.install("metrics", RenderBuffer, "flush", _timed("render"))
+    hooks.install("metrics", GameController, "execute_action", _count_action)
+    return active
+
+
+def disable() -> Optional[GameMetrics]:
+    """Выключить сбор метрик и вернуть собранные"""
+    global active
+    metrics, active = active, None
+    hooks.uninstall("metrics")
+    return metrics
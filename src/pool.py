@@ -0,0 +1,154 @@
+"""Пул заранее сгенерированных игр для мгновенного старта новых сессий"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from src.controller import create_world
+from src.dungeon import DungeonGenerator
+from src.entities import Player, Room
+
+# Фабрика мира: (генератор, зерно, число комнат) -> (игрок, подземелье)
+WorldFactory = Callable[[DungeonGenerator, int, int], Tuple[Player, List[Room]]]
+
+
+class PooledGame:
+    """Заранее созданные игрок и подземелье вместе с зерном, из которого они получены"""
+
+    __slots__ = ("seed", "player", "dungeon")
+
+    def __init__(self, seed: int, player: Player, dungeon: List[Room]):
+        self.seed = seed
+        self.player = player
+        self.dungeon = dungeon
+
+    def __repr__(self):
+        return f"PooledGame(seed={self.seed}, rooms={len(self.dungeon)})"
+
+
+class DungeonPool:
+    """
+    Пул готовых (игрок, подземелье), пополняемый фоновым потоком.
+
+    Когда в пуле остаётся меньше low_water игр, фоновый поток генерирует новые,
+    пока их не станет high_water. take() не блокируется: при пустом пуле он
+    возвращает None (промах), и контроллер создаёт мир сам, как без пула.
+
+    Каждая игра хранит своё зерно, поэтому сессии из пула сохраняются,
+    журналируются и воспроизводятся так же, как созданные напрямую
+    (если factory совпадает с процедурой, которой пользуется initialize_game).
+    """
+
+    def __init__(
+        self,
+        generator: DungeonGenerator,
+        num_rooms: int = 5,
+        high_water: int = 32,
+        low_water: Optional[int] = None,
+        factory: Optional[WorldFactory] = None,
+    ):
+        """
+        :param high_water: до скольких игр пополнять пул
+        :param low_water: при скольких оставшихся играх начинать пополнение
+                          (по умолчанию — сразу, как только пул неполон)
+        :param factory: процедура создания мира; по умолчанию controller.create_world
+        """
+        if high_water < 1:
+            raise ValueError("high_water must be at least 1")
+        self.generator = generator
+        self.num_rooms = num_rooms
+        self.high_water = high_water
+        self.low_water = high_water if low_water is None else min(low_water, high_water)
+        self.factory = factory or create_world
+        self._entries: Deque[PooledGame] = deque()
+        self._seeds = random.Random()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        # Метрики
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.refill_time_total = 0.0
+        self.refill_time_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _generate(self) -> PooledGame:
+        """Создать одну игру и учесть время её создания"""
+        seed = self._seeds.getrandbits(64)
+        start = time.perf_counter()
+        player, dungeon = self.factory(self.generator, seed, self.num_rooms)
+        elapsed = time.perf_counter() - start
+        self.generated += 1
+        self.refill_time_total += elapsed
+        self.refill_time_max = max(self.refill_time_max, elapsed)
+        return PooledGame(seed, player, dungeon)
+
+    def fill(self):
+        """Синхронно заполнить пул до high_water (например, перед стартом сервера)"""
+        while len(self._entries) < self.high_water:
+            self._entries.append(self._generate())
+
+    def take(self) -> Optional[PooledGame]:
+        """Взять готовую игру за O(1); None, если пул пуст"""
+        try:
+            entry = self._entries.popleft()
+        except IndexError:
+            self.misses += 1
+            entry = None
+        else:
+            self.hits += 1
+        if self._thread is not None and len(self._entries) < self.low_water:
+            with self._condition:
+                self._condition.notify()
+        return entry
+
+    def _refill_loop(self):
+        """Фоновый поток: ждать опустошения до low_water и пополнять до high_water"""
+        while True:
+            with self._condition:
+                while not self._stopping and len(self._entries) >= self.low_water:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+            while not self._stopping and len(self._entries) < self.high_water:
+                self._entries.append(self._generate())
+
+    def start(self) -> "DungeonPool":
+        """Запустить фоновое пополнение"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._refill_loop, name="dungeon-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Остановить фоновое пополнение (готовые игры остаются в пуле)"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики пула: попадания, промахи, размер, время создания одной игры"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "refill_time_mean": self.refill_time_total / self.generated if self.generated else 0.0,
+            "refill_time_max": self.refill_time_max,
+        }
+
+    def __enter__(self) -> "DungeonPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
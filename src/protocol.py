@@ -0,0 +1,206 @@
+"""
+Машинный протокол для ботов: JSON Lines вместо экранов на русском.
+
+Клиент шлёт по строке на запрос: {"actions": ["attack", "forward", 1]} — ходы
+(имена действий или номера пунктов меню) выполняются подряд, и ответ на весь
+пакет приходит одной строкой. {"action": "attack"} — пакет из одного хода,
+"id" запроса возвращается в ответе. Ответ: итоги ходов ("results"), состояние
+после пакета ("state") и меню ("actions"); "done": true — игра окончена.
+Пакет прерывается на первом недопустимом ходе, оставшиеся ходы помечаются
+"skipped".
+
+Запуск из корня проекта (ввод — stdin, ответы — stdout):
+    python -m src.protocol --rooms 5
+    python -m src.server --protocol ndjson
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Generator, List, Optional, Tuple, Union
+
+from src.controller import ActionMenu, GameController
+from src.render import NullRenderBuffer
+
+# Меню в виде для JSON; меню комнат общие для всех сессий, поэтому строятся один раз
+_MENU_ITEMS: Dict[int, List[dict]] = {}
+
+
+def menu_items(actions: dict) -> List[dict]:
+    """Меню действий списком {"id", "action", "label"}"""
+    cacheable = isinstance(actions, ActionMenu)
+    items = _MENU_ITEMS.get(id(actions)) if cacheable else None
+    if items is None:
+        items = [{"id": num, "action": name, "label": label} for num, (name, label) in actions.items()]
+        if cacheable:
+            _MENU_ITEMS[id(actions)] = items
+    return items
+
+
+def room_state(controller: GameController) -> dict:
+    """Состояние сессии: игрок, текущая комната и её враги"""
+    player = controller.player
+    room = controller.get_current_room()
+    return {
+        "turn": controller.turn,
+        "room": controller.current_position,
+        "rooms": len(controller.dungeon),
+        "type": room.room_type,
+        "description": room.description,
+        "enemies": [
+            {
+                "name": enemy.name,
+                "health": enemy.current_health,
+                "max_health": enemy.max_health,
+                "defeated": enemy.defeated,
+            }
+            for enemy in room.enemies
+        ],
+        "player": {"name": player.name, "health": player.current_health, "max_health": player.max_health},
+    }
+
+
+def encode(message: dict) -> str:
+    """Сообщение протокола одной строкой JSON (без перевода строки)"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class BotSession:
+    """
+    Сессия для ботов поверх GameController.
+
+    Экраны не собираются (NullRenderBuffer), лог боя не ведётся: бот получает
+    только структурированное состояние.
+    """
+
+    __slots__ = ("controller",)
+
+    def __init__(self, controller: GameController):
+        self.controller = controller
+        controller.screen = NullRenderBuffer()
+        controller.combat_system.log_enabled = False
+
+    def _resolve(self, choice: Union[int, str], actions: dict) -> Optional[str]:
+        """Действие по номеру пункта меню или имени; None — ход недопустим"""
+        if isinstance(choice, str) and choice.isdecimal():
+            choice = int(choice)
+        if isinstance(choice, int) and not isinstance(choice, bool):
+            item = actions.get(choice)
+            return item[0] if item is not None else None
+        if choice == "quit" or any(choice == name for name, _ in actions.values()):
+            return choice
+        return None
+
+    def _step(self, choice: Union[int, str]) -> dict:
+        """Выполнить один ход пакета"""
+        controller = self.controller
+        action = self._resolve(choice, controller.get_available_actions())
+        if action is None:
+            return {"action": choice, "ok": False, "error": "invalid action"}
+        health = controller.player.current_health
+        result = {"action": action, "ok": True}
+        if action == "attack":
+            won = controller.execute_action(action)
+            result.update(
+                won=won,
+                rounds=controller.combat_system.last_rounds,
+                damage_taken=health - controller.player.current_health,
+            )
+        else:
+            controller.execute_action(action)
+        return result
+
+    def execute(self, choices: List[Union[int, str]]) -> List[dict]:
+        """Выполнить пакет ходов подряд; после недопустимого хода или конца игры остальные пропускаются"""
+        results = []
+        for index, choice in enumerate(choices):
+            if not self.controller.running:
+                results.extend({"action": rest, "ok": False, "error": "skipped"} for rest in choices[index:])
+                break
+            result = self._step(choice)
+            results.append(result)
+            if not result["ok"]:
+                results.extend({"action": rest, "ok": False, "error": "skipped"} for rest in choices[index + 1:])
+                break
+        return results
+
+    def response(self, request_id=None, results: Optional[List[dict]] = None, error: Optional[str] = None) -> dict:
+        """Ответ: итоги пакета, состояние и меню (пустое, если игра окончена)"""
+        controller = self.controller
+        message = {}
+        if request_id is not None:
+            message["id"] = request_id
+        if error is not None:
+            message["error"] = error
+        if results is not None:
+            message["results"] = results
+        message["state"] = room_state(controller)
+        message["actions"] = menu_items(controller.get_available_actions()) if controller.running else []
+        message["done"] = not controller.running
+        return message
+
+    def handle(self, line: Union[str, bytes]) -> dict:
+        """Разобрать строку запроса и выполнить её пакет ходов"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self.response(error="invalid JSON")
+        if not isinstance(request, dict):
+            return self.response(error="request must be a JSON object")
+        request_id = request.get("id")
+        if "actions" in request:
+            choices = request["actions"]
+        elif "action" in request:
+            choices = [request["action"]]
+        else:
+            return self.response(request_id, error="request has no actions")
+        if not isinstance(choices, list) or not all(isinstance(c, (int, str)) for c in choices):
+            return self.response(request_id, error="actions must be a list of names or menu numbers")
+        return self.response(request_id, self.execute(choices))
+
+    def play(
+        self, num_rooms: Optional[int] = None, seed: Optional[int] = None
+    ) -> Generator[Tuple[str, dict], Union[str, bytes, None], None]:
+        """
+        Тот же контракт, что у GameController.play(): отдаёт (строка ответа, меню)
+        и получает через send() строку запроса; пустое меню — игра окончена.
+
+        :param num_rooms: если задан, игра инициализируется внутри генератора
+        """
+        controller = self.controller
+        if num_rooms is not None:
+            controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+        line = yield encode(self.response()), controller.get_available_actions()
+        while controller.running:
+            if line is None or not line.strip():
+                message = self.response(error="empty request")
+            else:
+                message = self.handle(line)
+            actions = controller.get_available_actions() if controller.running else {}
+            line = yield encode(message), actions
+
+
+def main():
+    """Игра по протоколу через stdin/stdout: python -m src.protocol --rooms 5"""
+    from src.dungeon import DungeonGenerator
+
+    parser = argparse.ArgumentParser(description="Протокол JSON Lines для ботов")
+    parser.add_argument("--rooms", type=int, default=5, help="комнат в подземелье")
+    parser.add_argument("--seed", type=int, default=None, help="зерно подземелья")
+    parser.add_argument("--data-dir", default="data", help="каталог с JSON-данными игры")
+    args = parser.parse_args()
+
+    session = BotSession(GameController(DungeonGenerator(data_dir=args.data_dir)))
+    game = session.play(args.rooms, args.seed)
+    message, actions = next(game)
+    print(message, flush=True)
+    for line in sys.stdin:
+        if not actions:
+            break
+        message, actions = game.send(line)
+        print(message, flush=True)
+    game.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Буферизованный вывод игровых экранов"""
+
+import sys
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+
+SEPARATOR_WIDTH = 70
+
+# Кэш готовых разделителей: (символ, ширина, пустая строка перед ним) -> str/bytes
+_SEPARATORS: Dict[Tuple[str, int, bool, bool], Union[str, bytes]] = {}
+
+
+def get_separator(
+    char: str = "=",
+    width: int = SEPARATOR_WIDTH,
+    blank_before: bool = False,
+    encoded: bool = False,
+) -> Union[str, bytes]:
+    """Вернуть строку-разделитель (с переводом строки), собранную один раз"""
+    key = (char, width, blank_before, encoded)
+    separator = _SEPARATORS.get(key)
+    if separator is None:
+        text = ("\n" if blank_before else "") + char * width + "\n"
+        separator = text.encode("utf-8") if encoded else text
+        _SEPARATORS[key] = separator
+    return separator
+
+
+class RenderBuffer:
+    """
+    Собирает экран из строк и выводит его одной операцией записи.
+
+    В текстовом режиме хранит строки, в бинарном (binary=True) — заранее
+    закодированные в UTF-8 фрагменты и пишет их в stream.buffer.
+    """
+
+    __slots__ = ("stream", "binary", "_chunks")
+
+    def __init__(self, stream: Optional[TextIO] = None, binary: bool = False):
+        """
+        :param stream: поток вывода; по умолчанию — текущий sys.stdout
+        :param binary: хранить фрагменты в виде UTF-8 байтов
+        """
+        self.stream = stream
+        self.binary = binary
+        self._chunks: List[Union[str, bytes]] = []
+
+    def line(self, text: str = ""):
+        """Добавить строку экрана"""
+        chunk = text + "\n"
+        self._chunks.append(chunk.encode("utf-8") if self.binary else chunk)
+
+    def lines(self, texts: List[str]):
+        """Добавить несколько строк экрана"""
+        for text in texts:
+            self.line(text)
+
+    def separator(self, char: str = "=", width: int = SEPARATOR_WIDTH, blank_before: bool = False):
+        """Добавить готовый разделитель вида «=====»"""
+        self._chunks.append(get_separator(char, width, blank_before, self.binary))
+
+    def getvalue(self) -> str:
+        """Вернуть накопленный экран одной строкой"""
+        if self.binary:
+            return b"".join(self._chunks).decode("utf-8")
+        return "".join(self._chunks)
+
+    def getbytes(self) -> bytes:
+        """Вернуть накопленный экран в кодировке UTF-8"""
+        if self.binary:
+            return b"".join(self._chunks)
+        return "".join(self._chunks).encode("utf-8")
+
+    def clear(self):
+        """Очистить буфер без вывода"""
+        self._chunks.clear()
+
+    def flush(self) -> int:
+        """Вывести накопленный экран одной записью и очистить буфер"""
+        if not self._chunks:
+            return 0
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.binary:
+            data = b"".join(self._chunks)
+            stream.flush()  # не обгоняем текст, уже лежащий в буфере потока
+            getattr(stream, "buffer", stream).write(data)
+        else:
+            data = "".join(self._chunks)
+            stream.write(data)
+        stream.flush()
+        self._chunks.clear()
+        return len(data)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+
+class NullRenderBuffer(RenderBuffer):
+    """Буфер для режима без вывода (боты, бенчмарки): все строки отбрасываются"""
+
+    __slots__ = ()
+
+    def line(self, text: str = ""):
+        pass
+
+    def lines(self, texts: List[str]):
+        pass
+
+    def separator(self, char: str = "=", width: int = SEPARATOR_WIDTH, blank_before: bool = False):
+        pass
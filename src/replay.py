@@ -0,0 +1,188 @@
+"""Запись и воспроизведение игровых сессий для отладки"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer, RenderBuffer
+
+REPLAY_VERSION = 1
+
+# Одна буква на действие: последовательность ходов читается глазами и занимает мало места
+_ACTION_LETTERS = {"forward": "f", "back": "b", "attack": "a", "exit": "x", "quit": "q"}
+_LETTER_ACTIONS = {letter: action for action, letter in _ACTION_LETTERS.items()}
+
+
+class ReplayError(ValueError):
+    """Повтор не может быть воспроизведён"""
+
+
+class Replay:
+    """Повтор сессии: зерно, отпечаток контента, число комнат и последовательность ходов"""
+
+    def __init__(self, seed: int, content_hash: str, num_rooms: int, actions: str = ""):
+        self.seed = seed
+        self.content_hash = content_hash
+        self.num_rooms = num_rooms
+        self.actions = actions
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def action_at(self, turn: int) -> str:
+        """Действие, выполненное на ходу turn (ходы нумеруются с 1)"""
+        return _LETTER_ACTIONS[self.actions[turn - 1]]
+
+    def to_json(self) -> str:
+        """Сериализовать повтор в JSON"""
+        return json.dumps(
+            {
+                "version": REPLAY_VERSION,
+                "seed": self.seed,
+                "content_hash": self.content_hash,
+                "num_rooms": self.num_rooms,
+                "actions": self.actions,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "Replay":
+        """Прочитать повтор из JSON"""
+        data = json.loads(text)
+        if data.get("version") != REPLAY_VERSION:
+            raise ReplayError(f"Unsupported replay version: {data.get('version')}")
+        actions = data["actions"]
+        if any(letter not in _LETTER_ACTIONS for letter in actions):
+            raise ReplayError("Replay contains unknown actions")
+        return cls(data["seed"], data["content_hash"], data["num_rooms"], actions)
+
+    def save(self, path: str):
+        """Сохранить повтор в файл"""
+        Path(path).write_text(self.to_json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        """Загрузить повтор из файла"""
+        return cls.from_json(Path(path).read_text(encoding="utf-8"))
+
+    def __repr__(self):
+        return f"Replay(seed={self.seed}, rooms={self.num_rooms}, turns={len(self)})"
+
+
+class ReplayRecorder:
+    """Записывает ходы сессии в повтор (подписчик GameController.action_listeners)"""
+
+    def __init__(self, controller: GameController):
+        if controller.player is None or controller.turn != 0:
+            raise ReplayError("Recording must start right after initialize_game()")
+        self.controller = controller
+        self.replay = Replay(
+            controller.seed, controller.generator.content_hash(), len(controller.dungeon)
+        )
+        self._letters = []
+        controller.action_listeners.append(self._record)
+
+    def _record(self, controller: GameController, action: str):
+        self._letters.append(_ACTION_LETTERS[action])
+
+    def stop(self) -> Replay:
+        """Прекратить запись и вернуть повтор"""
+        if self._record in self.controller.action_listeners:
+            self.controller.action_listeners.remove(self._record)
+        return self.get_replay()
+
+    def get_replay(self) -> Replay:
+        """Вернуть повтор со всеми записанными на данный момент ходами"""
+        self.replay.actions = "".join(self._letters)
+        return self.replay
+
+
+def run_replay(
+    generator: DungeonGenerator,
+    replay: Replay,
+    stop_at_turn: Optional[int] = None,
+    render_from_turn: Optional[int] = None,
+    screen: Optional[RenderBuffer] = None,
+) -> GameController:
+    """
+    Воспроизвести повтор через GameController с максимальной скоростью.
+
+    До хода render_from_turn ничего не выводится и лог боя не ведётся; начиная
+    с него экраны выводятся в screen, как в обычной игре.
+
+    :param stop_at_turn: остановиться после этого хода (по умолчанию — в конце)
+    :return: контроллер в состоянии после последнего воспроизведённого хода
+    """
+    if replay.content_hash != generator.content_hash():
+        raise ReplayError("Replay was recorded with different game content")
+
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.combat_system.log_enabled = False
+    controller.initialize_game(replay.num_rooms, wait_for_start=False, seed=replay.seed)
+
+    last_turn = len(replay) if stop_at_turn is None else min(stop_at_turn, len(replay))
+    for turn in range(1, last_turn + 1):
+        if render_from_turn is not None and turn == render_from_turn:
+            controller.screen = screen if screen is not None else RenderBuffer()
+            controller.combat_system.log_enabled = True
+            controller.display_room()
+        if not controller.running:
+            raise ReplayError(f"Game is already over before turn {turn}")
+        if not controller.execute_action(replay.action_at(turn)):
+            controller.running = False
+
+    controller.screen = screen if screen is not None else RenderBuffer()
+    controller.combat_system.log_enabled = True
+    return controller
+
+
+def bisect_replay(
+    generator: DungeonGenerator,
+    replay: Replay,
+    predicate: Callable[[GameController], bool],
+) -> Optional[int]:
+    """
+    Найти первый ход, после которого predicate(controller) становится истинным.
+
+    Предполагается, что условие монотонно (раз выполнившись, не перестаёт
+    выполняться). Каждая проба — это полное headless-воспроизведение префикса.
+
+    :return: номер хода (0 — условие истинно сразу после инициализации) или None
+    """
+    if not predicate(run_replay(generator, replay, stop_at_turn=len(replay))):
+        return None
+    low, high = 0, len(replay)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(run_replay(generator, replay, stop_at_turn=middle)):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def main():
+    """Воспроизвести повтор из файла: python -m src.replay replay.json --from-turn N"""
+    parser = argparse.ArgumentParser(description="Воспроизведение повтора игры")
+    parser.add_argument("path", help="файл повтора (JSON)")
+    parser.add_argument("--data-dir", default="data", help="каталог с JSON-данными игры")
+    parser.add_argument("--from-turn", type=int, default=1, help="выводить экраны начиная с хода")
+    parser.add_argument("--to-turn", type=int, default=None, help="остановиться после хода")
+    args = parser.parse_args()
+
+    generator = DungeonGenerator(data_dir=args.data_dir)
+    controller = run_replay(
+        generator,
+        Replay.load(args.path),
+        stop_at_turn=args.to_turn,
+        render_from_turn=args.from_turn,
+    )
+    if controller.running:
+        controller.display_room()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Компактное бинарное сохранение и загрузка игровых сессий"""
+
+import struct
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.entities import Room
+from src.render import RenderBuffer
+
+SAVE_MAGIC = b"TRPG"
+SAVE_VERSION = 2
+_READABLE_VERSIONS = (1, 2)  # версия 2 добавила стаи врагов; сохранения версии 1 читаются как есть
+
+# Формат (little-endian). Тексты не копируются — хранятся номера строк в JSON-пулах.
+#   заголовок: magic, версия, 4 байта хэша контента, seed, turn, позиция, флаги,
+#              число комнат
+#   игрок:     имя, описание, макс. здоровье, здоровье, урон, шанс попадания, защита
+#   комната:   тип, описание, флаги [+ шаблон врага, здоровье врага]
+#              [+ размер стаи, затем для каждого: шаблон, здоровье, побеждён]
+_HEADER = struct.Struct("<4sB4sQIIBI")
+_PLAYER = struct.Struct("<HHiiiHi")
+_ROOM = struct.Struct("<BHB")
+_ENEMY = struct.Struct("<Hi")
+_PACK_SIZE = struct.Struct("<B")
+_PACK_MEMBER = struct.Struct("<HiB")
+
+_ROOM_TYPES = ("St", "Rm", "Ex")
+_ROOM_TYPE_CODES = {room_type: code for code, room_type in enumerate(_ROOM_TYPES)}
+
+_FLAG_RUNNING = 0x01
+_FLAG_VISITED = 0x01
+_FLAG_HAS_ENEMY = 0x02
+_FLAG_DEFEATED = 0x04
+_FLAG_PACK = 0x08
+
+
+class SaveFormatError(ValueError):
+    """Сохранение повреждено или не подходит к загруженному контенту"""
+
+
+def _content_tag(generator: DungeonGenerator) -> bytes:
+    """Короткий отпечаток контента, с которым сделано сохранение"""
+    return bytes.fromhex(generator.content_hash())[:4]
+
+
+def _lookup(index: Dict[str, int], key: str, what: str) -> int:
+    """Найти номер строки в пуле или сообщить, что её нельзя сохранить"""
+    try:
+        return index[key]
+    except KeyError:
+        raise SaveFormatError(f"{what} {key!r} is not part of the loaded content") from None
+
+
+def save_game(controller: GameController) -> bytes:
+    """Сохранить состояние сессии в компактный бинарный вид"""
+    if controller.player is None:
+        raise SaveFormatError("Game is not initialized")
+    index = controller.generator.content_index()
+    player = controller.player
+
+    parts = [
+        _HEADER.pack(
+            SAVE_MAGIC,
+            SAVE_VERSION,
+            _content_tag(controller.generator),
+            controller.seed,
+            controller.turn,
+            controller.current_position,
+            _FLAG_RUNNING if controller.running else 0,
+            len(controller.dungeon),
+        ),
+        _PLAYER.pack(
+            _lookup(index["names"], player.name, "Player name"),
+            _lookup(index["player_descriptions"], player.description, "Player description"),
+            player.max_health,
+            player.current_health,
+            player.weapon.damage,
+            player.weapon.hit_chance,
+            player.armor.defense,
+        ),
+    ]
+
+    room_index = index["room_descriptions"]
+    enemy_index = index["enemies"]
+    for room in controller.dungeon:
+        flags = _FLAG_VISITED if room.visited else 0
+        enemy = room.enemy
+        if enemy is not None:
+            flags |= _FLAG_HAS_ENEMY | (_FLAG_DEFEATED if enemy.defeated else 0)
+        if room.pack:
+            flags |= _FLAG_PACK
+        parts.append(
+            _ROOM.pack(
+                _ROOM_TYPE_CODES[room.room_type],
+                _lookup(room_index, room.description, "Room description"),
+                flags,
+            )
+        )
+        if enemy is not None:
+            parts.append(
+                _ENEMY.pack(_lookup(enemy_index, enemy.name, "Enemy"), enemy.current_health)
+            )
+        if room.pack:
+            parts.append(_PACK_SIZE.pack(len(room.pack)))
+            for member in room.pack:
+                parts.append(
+                    _PACK_MEMBER.pack(
+                        _lookup(enemy_index, member.name, "Enemy"), member.current_health, member.defeated
+                    )
+                )
+
+    return b"".join(parts)
+
+
+def _unpack_state(generator: DungeonGenerator, data: bytes, offset: int, num_rooms: int):
+    """Разобрать игрока и комнаты из сохранения, начиная с offset; возвращает и смещение конца"""
+    name_id, description_id, max_health, health, damage, hit_chance, defense = (
+        _PLAYER.unpack_from(data, offset)
+    )
+    offset += _PLAYER.size
+
+    player = generator.build_player(
+        generator.player_data["names"][name_id],
+        generator.player_data["descriptions"][description_id],
+    )
+    player.max_health = max_health
+    player.current_health = health
+    player.weapon.damage = damage
+    player.weapon.hit_chance = hit_chance
+    player.armor.defense = defense
+
+    descriptions = generator.rooms_data["descriptions"]
+    dungeon = []
+    for _ in range(num_rooms):
+        type_code, room_description_id, room_flags = _ROOM.unpack_from(data, offset)
+        offset += _ROOM.size
+        enemy = None
+        if room_flags & _FLAG_HAS_ENEMY:
+            template_id, enemy_health = _ENEMY.unpack_from(data, offset)
+            offset += _ENEMY.size
+            enemy = generator.build_enemy(template_id)
+            enemy.current_health = enemy_health
+            enemy.defeated = bool(room_flags & _FLAG_DEFEATED)
+        pack = []
+        if room_flags & _FLAG_PACK:
+            (pack_size,) = _PACK_SIZE.unpack_from(data, offset)
+            offset += _PACK_SIZE.size
+            for _ in range(pack_size):
+                template_id, member_health, defeated = _PACK_MEMBER.unpack_from(data, offset)
+                offset += _PACK_MEMBER.size
+                member = generator.build_enemy(template_id)
+                member.current_health = member_health
+                member.defeated = bool(defeated)
+                pack.append(member)
+        room = Room(_ROOM_TYPES[type_code], descriptions[room_description_id], enemy, pack)
+        room.visited = bool(room_flags & _FLAG_VISITED)
+        dungeon.append(room)
+    return player, dungeon, offset
+
+
+def load_game(
+    generator: DungeonGenerator, data: bytes, screen: Optional[RenderBuffer] = None
+) -> GameController:
+    """
+    Восстановить сессию из сохранения.
+
+    Тексты и характеристики врагов берутся из шаблонов генератора; из сохранения —
+    только изменяемые числа (здоровье, флаги, позиция, состояние ГСЧ).
+    """
+    if len(data) < _HEADER.size:
+        raise SaveFormatError("Save data is truncated")
+    magic, version, tag, seed, turn, position, flags, num_rooms = _HEADER.unpack_from(data, 0)
+    if magic != SAVE_MAGIC:
+        raise SaveFormatError("Not a game save")
+    if version not in _READABLE_VERSIONS:
+        raise SaveFormatError(f"Unsupported save version: {version}")
+    if tag != _content_tag(generator):
+        raise SaveFormatError("Save was made with different game content")
+    if position >= num_rooms:
+        raise SaveFormatError(f"Save data is corrupted: position {position} is outside {num_rooms} rooms")
+
+    try:
+        player, dungeon, end = _unpack_state(generator, data, _HEADER.size, num_rooms)
+    except (struct.error, IndexError) as e:
+        raise SaveFormatError(f"Save data is corrupted: {e}") from None
+    if end != len(data):
+        raise SaveFormatError(f"Save data is corrupted: {len(data) - end} trailing bytes")
+
+    controller = GameController(generator, screen=screen)
+    controller.seed = seed
+    controller.turn = turn
+    controller.player = player
+    controller.dungeon = dungeon
+    controller.current_position = position
+    controller.running = bool(flags & _FLAG_RUNNING)
+    return controller
+
+
+def save_to_file(controller: GameController, path: str):
+    """Сохранить сессию в файл"""
+    Path(path).write_bytes(save_game(controller))
+
+
+def load_from_file(
+    generator: DungeonGenerator, path: str, screen: Optional[RenderBuffer] = None
+) -> GameController:
+    """Загрузить сессию из файла"""
+    return load_game(generator, Path(path).read_bytes(), screen)
@@ -0,0 +1,414 @@
+"""
+Сетевой сервер игры: процессы-работники, разделяющие загруженный контент.
+
+Протокол по умолчанию текстовый: после подключения сервер присылает первый
+экран и приглашение «> », клиент отвечает строкой — номером пункта меню или
+именем действия. Последний экран приходит без приглашения, после него
+соединение закрывается. С protocol="ndjson" вместо экранов — ответы в JSON
+Lines для ботов (см. src.protocol). Все строки, пришедшие одним пакетом,
+выполняются подряд, а ответы на них уходят одной записью в сокет.
+
+Запуск из корня проекта:
+    python -m src.server --port 7000 --workers 4 [--protocol ndjson]
+"""
+
+import argparse
+import gc
+import os
+import selectors
+import signal
+import socket
+import time
+from typing import Dict, Generator, List, Optional, Tuple
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.protocol import BotSession, encode
+from src.render import RenderBuffer
+
+PROMPT = "\n> "
+PROTOCOLS = ("text", "ndjson")
+_RECV_SIZE = 4096
+# Наибольшая строка ввода: ход человека короткий, а пакет ходов бота может быть длинным
+MAX_LINE = {"text": 1024, "ndjson": 256 * 1024}
+_TOO_LONG = {
+    "text": "\nСлишком длинная строка ввода. Соединение закрыто.\n",
+    "ndjson": encode({"error": "request too long", "done": True}) + "\n",
+}
+_SESSION_FAILED = {
+    "text": "\nВнутренняя ошибка игры. Соединение закрыто.\n",
+    "ndjson": encode({"error": "internal error", "done": True}) + "\n",
+}
+
+
+class _Connection:
+    """Подключение клиента: сокет, игра и буферы ввода/вывода"""
+
+    __slots__ = ("sock", "game", "inbox", "outbox", "closing", "draining")
+
+    def __init__(self, sock: socket.socket, game: Generator):
+        self.sock = sock
+        self.game = game
+        self.inbox = b""
+        self.outbox = b""
+        self.closing = False
+        # После отправки закрыть только запись и дочитать ввод: закрытие сокета с
+        # непрочитанными данными шлёт RST, и клиент может не получить последний ответ
+        self.draining = False
+
+
+def _encode_frame(frame: Tuple[str, dict]) -> bytes:
+    """Экран игры для отправки клиенту (с приглашением, если игра продолжается)"""
+    text, actions = frame
+    return (text + PROMPT if actions else text).encode("utf-8")
+
+
+def _encode_message(frame: Tuple[str, dict]) -> bytes:
+    """Ответ протокола для ботов — строка JSON"""
+    return (frame[0] + "\n").encode("utf-8")
+
+
+class Worker:
+    """
+    Обслуживает множество сессий в одном процессе.
+
+    Каждая сессия — генератор GameController.play(); сокеты неблокирующие,
+    события разбирает selectors, так что медленный клиент не задерживает остальных.
+    """
+
+    def __init__(
+        self,
+        listener: socket.socket,
+        generator: DungeonGenerator,
+        num_rooms: int = 5,
+        protocol: str = "text",
+        max_line: Optional[int] = None,
+    ):
+        """
+        :param protocol: "text" — экраны для людей, "ndjson" — JSON Lines для ботов
+        :param max_line: наибольшая длина строки ввода в байтах (по умолчанию — MAX_LINE протокола)
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.listener = listener
+        self.generator = generator
+        self.num_rooms = num_rooms
+        self.protocol = protocol
+        self.max_line = max_line or MAX_LINE[protocol]
+        self._encode = _encode_message if protocol == "ndjson" else _encode_frame
+        self.running = False
+        self.sessions_started = 0
+        self.sessions_failed = 0  # сессии, закрытые из-за ошибки (длинный ввод, исключение в игре)
+        self._selector = selectors.DefaultSelector()
+        self._connections: Dict[socket.socket, _Connection] = {}
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def serve(self, poll_interval: float = 0.2):
+        """Обслуживать клиентов, пока running не станет False"""
+        self.running = True
+        self.listener.setblocking(False)
+        self._selector.register(self.listener, selectors.EVENT_READ)
+        try:
+            while self.running:
+                for key, events in self._selector.select(poll_interval):
+                    if key.fileobj is self.listener:
+                        self._accept()
+                        continue
+                    connection = self._connections.get(key.fileobj)
+                    if connection is None:
+                        continue
+                    if events & selectors.EVENT_READ:
+                        self._read(connection)
+                    if events & selectors.EVENT_WRITE and connection.sock in self._connections:
+                        self._flush(connection)
+        finally:
+            for connection in list(self._connections.values()):
+                self._close(connection)
+            self._selector.unregister(self.listener)
+            self._selector.close()
+
+    def _accept(self):
+        """Принять все ожидающие подключения (listener общий для всех работников)"""
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            controller = GameController(self.generator, screen=RenderBuffer())
+            if self.protocol == "ndjson":
+                game = BotSession(controller).play(self.num_rooms)
+            else:
+                game = controller.play(self.num_rooms)
+            connection = _Connection(sock, game)
+            self._connections[sock] = connection
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.sessions_started += 1
+            try:
+                frame = next(game)
+            except Exception:
+                self._reject(connection, _SESSION_FAILED)
+                continue
+            self._send(connection, frame)
+
+    def _read(self, connection: _Connection):
+        """Прочитать ввод клиента, выполнить каждую полученную строку и ответить одной записью"""
+        try:
+            data = connection.sock.recv(_RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(connection)
+            return
+        if connection.closing:
+            return  # ответ уже последний: ввод после него не нужен
+        connection.inbox += data
+        too_long = False
+        while b"\n" in connection.inbox and not connection.closing:
+            line, connection.inbox = connection.inbox.split(b"\n", 1)
+            if len(line) > self.max_line:
+                too_long = True
+                break
+            choice = line.decode("utf-8", "replace").strip()
+            try:
+                frame = connection.game.send(choice)
+            except Exception:
+                # Ошибка одной сессии не должна останавливать работника с остальными
+                self._reject(connection, _SESSION_FAILED)
+                return
+            self._send(connection, frame, flush=False)
+        if not connection.closing and (too_long or len(connection.inbox) > self.max_line):
+            self._reject(connection, _TOO_LONG)
+        elif connection.outbox:
+            self._flush(connection)
+
+    def _reject(self, connection: _Connection, messages: Dict[str, str]):
+        """Отправить уже готовые ответы и сообщение об ошибке (по протоколу), затем закрыть соединение"""
+        self.sessions_failed += 1
+        connection.inbox = b""
+        connection.outbox += messages[self.protocol].encode("utf-8")
+        connection.closing = connection.draining = True
+        connection.game.close()
+        self._flush(connection)
+
+    def _send(self, connection: _Connection, frame: Tuple[str, dict], flush: bool = True):
+        """Поставить экран в очередь отправки; после финального экрана закрыть сессию"""
+        connection.outbox += self._encode(frame)
+        if not frame[1]:
+            connection.closing = True
+            connection.game.close()
+        if flush:
+            self._flush(connection)
+
+    def _flush(self, connection: _Connection):
+        """Отправить сколько получится; остаток ждёт готовности сокета к записи"""
+        try:
+            sent = connection.sock.send(connection.outbox)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._close(connection)
+            return
+        connection.outbox = connection.outbox[sent:]
+        if connection.outbox:
+            self._selector.modify(connection.sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        elif connection.closing and connection.draining:
+            # Соединение закроется в _read, когда клиент закроет своё
+            try:
+                connection.sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                self._close(connection)
+                return
+            self._selector.modify(connection.sock, selectors.EVENT_READ)
+        elif connection.closing:
+            self._close(connection)
+        else:
+            self._selector.modify(connection.sock, selectors.EVENT_READ)
+
+    def _close(self, connection: _Connection):
+        if self._connections.pop(connection.sock, None) is None:
+            return
+        self._selector.unregister(connection.sock)
+        connection.game.close()
+        connection.sock.close()
+
+
+def warm_up(generator: DungeonGenerator):
+    """Заранее загрузить весь контент и построить кэши, чтобы работники их не изменяли"""
+    generator.build_enemy(0)
+    generator.content_index()
+    generator.content_hash()
+
+
+class PreforkServer:
+    """
+    Родительский процесс: загружает контент, «замораживает» его и запускает работников.
+
+    После загрузки вызывается gc.freeze(): объекты контента переезжают в
+    постоянное поколение, сборщик мусора в работниках их не обходит и не
+    пишет в их заголовки, поэтому страницы памяти после fork() остаются
+    общими (copy-on-write). Упавший работник перезапускается.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = "data",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        workers: Optional[int] = None,
+        num_rooms: int = 5,
+        freeze: bool = True,
+        protocol: str = "text",
+    ):
+        """
+        :param workers: число процессов-работников (по умолчанию — по числу ядер)
+        :param freeze: вызывать gc.freeze() перед fork() (False — для сравнения в бенчмарке)
+        :param protocol: протокол сессий: "text" или "ndjson" (см. Worker)
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.data_dir = data_dir
+        self.host = host
+        self.port = port
+        self.num_workers = workers or os.cpu_count() or 1
+        self.num_rooms = num_rooms
+        self.freeze = freeze
+        self.protocol = protocol
+        self.generator: Optional[DungeonGenerator] = None
+        self.listener: Optional[socket.socket] = None
+        self.pids: List[int] = []
+        self.restarts = 0
+        self._stopping = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.listener.getsockname()
+
+    def prepare(self):
+        """Загрузить контент, открыть слушающий сокет и заморозить кучу"""
+        self.generator = DungeonGenerator.shared(self.data_dir)
+        warm_up(self.generator)
+        self.listener = socket.create_server((self.host, self.port), backlog=512)
+        gc.collect()
+        if self.freeze:
+            gc.freeze()
+
+    def _spawn(self) -> int:
+        """Запустить одного работника"""
+        pid = os.fork()
+        if pid:
+            return pid
+        # Процесс-работник: из этой функции он никогда не возвращается
+        status = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            worker = Worker(self.listener, self.generator, self.num_rooms, self.protocol)
+
+            def shutdown(signum, frame):
+                worker.running = False
+
+            signal.signal(signal.SIGTERM, shutdown)
+            worker.serve()
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+    def start(self):
+        """Запустить работников (prepare() вызывается автоматически)"""
+        if self.listener is None:
+            self.prepare()
+        self._stopping = False
+        while len(self.pids) < self.num_workers:
+            self.pids.append(self._spawn())
+
+    def check_workers(self) -> int:
+        """Собрать завершившихся работников и перезапустить их; вернуть число перезапусков"""
+        restarted = 0
+        for pid in list(self.pids):
+            try:
+                finished, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished = pid
+            if finished:
+                self.pids.remove(pid)
+                if not self._stopping:
+                    self.pids.append(self._spawn())
+                    restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def supervise(self, poll_interval: float = 0.5):
+        """Следить за работниками до вызова stop()"""
+        while not self._stopping:
+            self.check_workers()
+            time.sleep(poll_interval)
+
+    def stop(self, timeout: float = 5.0):
+        """Остановить работников (SIGTERM, затем SIGKILL по таймауту) и закрыть сокет"""
+        self._stopping = True
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        for pid in self.pids:
+            while True:
+                try:
+                    finished, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    break
+                if finished:
+                    break
+                if time.monotonic() > deadline:
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                    break
+                time.sleep(0.01)
+        self.pids.clear()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if self.freeze:
+            gc.unfreeze()
+
+    def serve_forever(self):
+        """Запустить работников и следить за ними до SIGINT/SIGTERM"""
+        self.start()
+
+        def shutdown(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        try:
+            self.supervise()
+        finally:
+            self.stop()
+
+
+def main():
+    """Запуск сервера: python -m src.server --port 7000 --workers 4"""
+    parser = argparse.ArgumentParser(description="Сервер текстового подземелья")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — по ядрам)")
+    parser.add_argument("--rooms", type=int, default=5, help="комнат в подземелье")
+    parser.add_argument("--data-dir", default="data", help="каталог с JSON-данными игры")
+    parser.add_argument("--protocol", choices=PROTOCOLS, default="text", help="ndjson — JSON Lines для ботов")
+    args = parser.parse_args()
+
+    server = PreforkServer(args.data_dir, args.host, args.port, args.workers, args.rooms, protocol=args.protocol)
+    server.prepare()
+    host, port = server.address
+    print(f"Сервер слушает {host}:{port}, работников: {server.num_workers}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Менеджер сессий: вытеснение простаивающих игр на диск и прозрачная загрузка обратно"""
+
+import os
+import secrets
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer, RenderBuffer
+from src.savegame import load_game, save_game
+from src.store import GameStore
+
+
+class SessionNotFound(KeyError):
+    """Сессии с таким идентификатором нет ни в памяти, ни на диске"""
+
+
+class SessionManager:
+    """
+    Держит в памяти не больше max_resident сессий.
+
+    Бюджет памяти задаётся числом сессий, а не байтами: сессия стоит
+    предсказуемые ~1.3 КБ на 5 комнат (benchmarks/bench_memory.py), так что
+    бюджет в байтах — это max_resident × размер сессии. Сверх бюджета
+    вытесняются давно не использованные (LRU) сессии — дольше всех
+    простаивающие, даже если простой короче idle_timeout; evict_idle() вдобавок
+    вытесняет все, что простаивают дольше idle_timeout. Состояние
+    записывается компактным сохранением savegame (~80 байт на 5 комнат) в файл
+    каталога directory или в GameStore, а контроллер освобождается. При
+    следующем обращении сессия загружается обратно — для вызывающего кода это
+    незаметно. Подписчики action_listeners при вытеснении не сохраняются.
+    """
+
+    def __init__(
+        self,
+        generator: DungeonGenerator,
+        directory: Optional[str] = None,
+        max_resident: int = 10_000,
+        idle_timeout: Optional[float] = None,
+        screen_factory: Callable[[], RenderBuffer] = NullRenderBuffer,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional[GameStore] = None,
+    ):
+        """
+        :param directory: каталог для вытесненных сессий (если не задан store)
+        :param max_resident: бюджет памяти в сессиях (~1.3 КБ каждая на 5 комнат)
+        :param idle_timeout: evict_idle() вытесняет сессии, простаивающие дольше (с)
+        :param screen_factory: буфер экрана для создаваемых и загруженных сессий
+        :param store: хранилище SQLite вместо файлов; запись в него не ждёт диска
+        """
+        if max_resident < 1:
+            raise ValueError("max_resident must be at least 1")
+        if (directory is None) == (store is None):
+            raise ValueError("Exactly one of directory and store must be given")
+        self.generator = generator
+        self.store = store
+        self.directory = None
+        if directory is not None:
+            self.directory = Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_resident = max_resident
+        self.idle_timeout = idle_timeout
+        self.screen_factory = screen_factory
+        self.clock = clock
+        # id -> (контроллер, время последнего обращения); порядок — от давних к свежим
+        self._resident: "OrderedDict[str, list]" = OrderedDict()
+        self._evicted = set()
+        # Метрики
+        self.evictions = 0
+        self.rehydrations = 0
+        self.rehydrate_time_total = 0.0
+        self.rehydrate_time_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._evicted)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._resident or session_id in self._evicted
+
+    @property
+    def resident(self) -> int:
+        """Сколько сессий сейчас в памяти"""
+        return len(self._resident)
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{session_id}.sav"
+
+    def create(self, num_rooms: int = 5, seed: Optional[int] = None) -> str:
+        """Начать новую игру и вернуть идентификатор сессии"""
+        session_id = secrets.token_hex(8)
+        controller = GameController(self.generator, screen=self.screen_factory())
+        controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+        self._resident[session_id] = [controller, self.clock()]
+        self._enforce_budget()
+        return session_id
+
+    def get(self, session_id: str) -> GameController:
+        """Вернуть контроллер сессии, при необходимости загрузив его с диска"""
+        entry = self._resident.get(session_id)
+        if entry is None:
+            entry = self._rehydrate(session_id)
+        else:
+            self._resident.move_to_end(session_id)
+        entry[1] = self.clock()
+        return entry[0]
+
+    def execute(self, session_id: str, action: str) -> bool:
+        """Выполнить действие в сессии (см. GameController.execute_action)"""
+        controller = self.get(session_id)
+        if not controller.execute_action(action):
+            controller.running = False
+            return False
+        return True
+
+    def close(self, session_id: str):
+        """Удалить сессию из памяти и с диска"""
+        if self._resident.pop(session_id, None) is None:
+            if session_id not in self._evicted:
+                raise SessionNotFound(session_id)
+            self._evicted.discard(session_id)
+            if self.store is None:
+                self._path(session_id).unlink(missing_ok=True)
+        if self.store is not None:
+            self.store.delete_session(session_id)
+
+    def _evict(self, session_id: str):
+        """Записать сессию на диск и убрать из памяти"""
+        controller, _ = self._resident.pop(session_id)
+        if self.store is not None:
+            self.store.checkpoint(session_id, save_game(controller))
+        else:
+            path = self._path(session_id)
+            temporary = path.with_name(path.name + ".tmp")
+            temporary.write_bytes(save_game(controller))
+            os.replace(temporary, path)
+        self._evicted.add(session_id)
+        self.evictions += 1
+
+    def _rehydrate(self, session_id: str) -> list:
+        """Загрузить вытесненную сессию обратно в память"""
+        if session_id not in self._evicted:
+            raise SessionNotFound(session_id)
+        start = time.perf_counter()
+        if self.store is not None:
+            # Запись в хранилище не удаляется: следующее вытеснение её перезапишет
+            data = self.store.load_session(session_id)
+            if data is None:
+                self._evicted.discard(session_id)
+                raise SessionNotFound(session_id)
+            controller = load_game(self.generator, data, self.screen_factory())
+        else:
+            path = self._path(session_id)
+            controller = load_game(self.generator, path.read_bytes(), self.screen_factory())
+            path.unlink()
+        self._evicted.discard(session_id)
+        entry = self._resident[session_id] = [controller, self.clock()]
+        elapsed = time.perf_counter() - start
+        self.rehydrations += 1
+        self.rehydrate_time_total += elapsed
+        self.rehydrate_time_max = max(self.rehydrate_time_max, elapsed)
+        self._enforce_budget(keep=session_id)
+        return entry
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Вытеснять самые давние сессии, пока их больше бюджета"""
+        while len(self._resident) > self.max_resident:
+            oldest = next(iter(self._resident))
+            if oldest == keep:
+                self._resident.move_to_end(oldest)
+                continue
+            self._evict(oldest)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Вытеснить сессии, простаивающие дольше idle_timeout; вернуть их число"""
+        if self.idle_timeout is None:
+            return 0
+        deadline = (self.clock() if now is None else now) - self.idle_timeout
+        evicted = 0
+        while self._resident:
+            session_id, (_, last_used) = next(iter(self._resident.items()))
+            if last_used > deadline:
+                break
+            self._evict(session_id)
+            evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики: сессии в памяти и на диске, вытеснения, загрузки и их время"""
+        return {
+            "resident": len(self._resident),
+            "evicted": len(self._evicted),
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "rehydrate_time_mean": (
+                self.rehydrate_time_total / self.rehydrations if self.rehydrations else 0.0
+            ),
+            "rehydrate_time_max": self.rehydrate_time_max,
+        }
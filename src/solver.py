@@ -0,0 +1,191 @@
+"""Точные распределения исходов боя и оптимальная политика прохождения подземелья"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.combat import CombatSystem
+from src.entities import Enemy, Player, Room
+
+
+class FightOutcome:
+    """
+    Распределение исходов одного боя.
+
+    win — кортеж пар (оставшееся здоровье игрока, вероятность) для побед,
+    loss — вероятность поражения (смерть или проигрыш по времени).
+    """
+
+    __slots__ = ("win", "loss")
+
+    def __init__(self, win: Tuple[Tuple[int, float], ...], loss: float):
+        self.win = win
+        self.loss = loss
+
+    @property
+    def win_probability(self) -> float:
+        """Вероятность победы в бою"""
+        return sum(probability for _, probability in self.win)
+
+    def __repr__(self):
+        return f"FightOutcome(win={self.win_probability:.4f}, loss={self.loss:.4f})"
+
+
+def hit_probability(hit_chance: int) -> float:
+    """Вероятность попадания: randint(1, 100) <= hit_chance"""
+    return min(max(hit_chance, 0), 100) / 100
+
+
+@lru_cache(maxsize=None)
+def fight_outcome(
+    player_health: int,
+    player_damage: int,
+    player_hit_chance: int,
+    player_defense: int,
+    enemy_health: int,
+    enemy_damage: int,
+    enemy_hit_chance: int,
+    enemy_defense: int,
+    max_rounds: int = CombatSystem.MAX_ROUNDS,
+) -> FightOutcome:
+    """
+    Точное распределение исходов автобоя (CombatSystem.auto_battle).
+
+    Марковская цепь по состояниям (здоровье игрока, здоровье врага) с теми же
+    правилами, что и в автобое: игрок бьёт первым, урон max(0, урон - защита),
+    после max_rounds раундов побеждает тот, у кого больше здоровья (при равенстве
+    проигрывает игрок). Результат кэшируется по характеристикам сторон.
+    """
+    if player_health <= 0:
+        return FightOutcome((), 1.0)
+    if enemy_health <= 0:
+        return FightOutcome(((player_health, 1.0),), 0.0)
+
+    player_hit = hit_probability(player_hit_chance)
+    enemy_hit = hit_probability(enemy_hit_chance)
+    player_blow = max(0, player_damage - enemy_defense)
+    enemy_blow = max(0, enemy_damage - player_defense)
+    player_branches = [(p, hit) for p, hit in ((player_hit, True), (1 - player_hit, False)) if p > 0]
+    enemy_branches = [(p, hit) for p, hit in ((enemy_hit, True), (1 - enemy_hit, False)) if p > 0]
+
+    win: Dict[int, float] = defaultdict(float)
+    loss = 0.0
+    states = {(player_health, enemy_health): 1.0}
+    for _ in range(max_rounds):
+        next_states: Dict[Tuple[int, int], float] = defaultdict(float)
+        for (health, foe_health), probability in states.items():
+            for player_p, player_hits in player_branches:
+                foe_after = max(0, foe_health - player_blow) if player_hits else foe_health
+                branch = probability * player_p
+                if foe_after == 0:
+                    win[health] += branch
+                    continue
+                for enemy_p, enemy_hits in enemy_branches:
+                    health_after = max(0, health - enemy_blow) if enemy_hits else health
+                    if health_after == 0:
+                        loss += branch * enemy_p
+                    else:
+                        next_states[health_after, foe_after] += branch * enemy_p
+        states = next_states
+        if not states:
+            break
+
+    for (health, foe_health), probability in states.items():
+        if health > foe_health:
+            win[health] += probability
+        else:
+            loss += probability
+
+    return FightOutcome(tuple(sorted(win.items())), loss)
+
+
+def fight_outcome_for(player: Player, enemy: Enemy, player_health: Optional[int] = None) -> FightOutcome:
+    """Распределение исходов боя игрока с конкретным врагом в его текущем состоянии"""
+    return fight_outcome(
+        player.current_health if player_health is None else player_health,
+        player.weapon.damage,
+        player.weapon.hit_chance,
+        player.armor.defense,
+        enemy.current_health,
+        enemy.weapon.damage,
+        enemy.weapon.hit_chance,
+        enemy.armor.defense,
+    )
+
+
+class DungeonSolver:
+    """
+    Оптимальная политика прохождения подземелья (бой / отступление / продвижение).
+
+    Цель — максимальная вероятность выйти из подземелья. Здоровье не
+    восстанавливается, а живой враг не пропускает дальше, поэтому из всех
+    состояний (позиция, здоровье, состояния врагов) достижимы только те, где все
+    враги до «фронта» побеждены, а после — нетронуты. Динамика идёт от выхода
+    к началу по (комната, здоровье): O(комнат × здоровье²) плюс кэшированные
+    распределения боёв для каждого различного врага. Отступление выбирается,
+    только когда бой безнадёжен (шанс выйти нулевой), — так игрок хотя бы выживает.
+    """
+
+    def __init__(self, dungeon: List[Room], player: Player):
+        if any(room.pack for room in dungeon):
+            raise ValueError("Exact solver does not support rooms with enemy packs")
+        self.dungeon = dungeon
+        self.player = player
+        self.max_health = player.current_health
+        # values[i][h] — шанс выйти из комнаты i с здоровьем h при текущем состоянии её врага;
+        # cleared[i][h] — то же, если враг комнаты i уже побеждён
+        self._values: List[List[float]] = [[] for _ in dungeon]
+        self._cleared: List[List[float]] = [[] for _ in dungeon]
+        self._solve()
+
+    def _solve(self):
+        """Посчитать таблицы ценностей от выхода к началу"""
+        health_range = range(self.max_health + 1)
+        dead_end = [0.0] * (self.max_health + 1)
+        ahead = dead_end  # ценность следующей комнаты; за последней комнатой выхода нет
+        for index in range(len(self.dungeon) - 1, -1, -1):
+            room = self.dungeon[index]
+            if room.room_type == "Ex":
+                cleared = [0.0] + [1.0] * self.max_health
+            else:
+                cleared = ahead  # пустые комнаты разделяют таблицу со следующей
+            if room.has_alive_enemy():
+                values = [0.0] * (self.max_health + 1)
+                for health in health_range:
+                    if health == 0:
+                        continue
+                    outcome = fight_outcome_for(self.player, room.enemy, health)
+                    values[health] = sum(
+                        probability * cleared[after] for after, probability in outcome.win
+                    )
+            else:
+                values = cleared
+            self._values[index] = values
+            self._cleared[index] = cleared
+            ahead = values
+
+    def _health(self, health: Optional[int]) -> int:
+        health = self.player.current_health if health is None else health
+        return min(max(health, 0), self.max_health)
+
+    def win_probability(self, position: int = 0, health: Optional[int] = None) -> float:
+        """Шанс выйти из подземелья при оптимальной игре из комнаты position"""
+        room = self.dungeon[position]
+        table = self._values[position] if room.has_alive_enemy() else self._cleared[position]
+        return table[self._health(health)]
+
+    def best_action(self, position: int, health: Optional[int] = None) -> str:
+        """Оптимальное действие в комнате position при здоровье health"""
+        room = self.dungeon[position]
+        if room.has_alive_enemy():
+            if self._values[position][self._health(health)] > 0:
+                return "attack"
+            return "back" if room.room_type != "St" else "quit"
+        return "exit" if room.room_type == "Ex" else "forward"
+
+    def policy(self) -> List[Tuple[str, float]]:
+        """Политика для полного здоровья: (действие, шанс выйти) для каждой комнаты"""
+        return [
+            (self.best_action(position, self.max_health), self.win_probability(position, self.max_health))
+            for position in range(len(self.dungeon))
+        ]
@@ -0,0 +1,226 @@
+"""
+Трансляция сессии зрителям.
+
+Экран игры кодируется в байты один раз и кладётся в кольцевой буфер канала —
+публикация стоит O(1) и не зависит от числа зрителей. Каждый зритель читает
+кольцо со своей позиции: кольцо ограничивает его очередь, и медленный зритель
+теряет самые старые кадры (они учитываются в dropped), а всё накопленное
+получает одним куском — одной записью в сокет.
+
+Запуск игры с трансляцией из корня проекта:
+    python main.py --broadcast 7100
+    nc localhost 7100      # зритель
+"""
+
+import selectors
+import socket
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+from src.render import RenderBuffer
+
+
+class Channel:
+    """Кольцо последних capacity кадров одной сессии"""
+
+    def __init__(self, capacity: int = 64):
+        if capacity < 1:
+            raise ValueError("Channel capacity must be at least 1")
+        self.capacity = capacity
+        self._frames: List[bytes] = [b""] * capacity
+        self._head = 0  # номер следующего кадра
+
+    @property
+    def published(self) -> int:
+        """Сколько кадров опубликовано"""
+        return self._head
+
+    def publish(self, frame: bytes):
+        """Опубликовать кадр (уже закодированный в UTF-8)"""
+        # Сначала кадр, потом номер: читатель не увидит номер без кадра
+        self._frames[self._head % self.capacity] = frame
+        self._head += 1
+
+    def subscribe(self, backlog: int = 1) -> "Subscription":
+        """Подписаться; новый зритель сразу получает backlog последних кадров"""
+        return Subscription(self, max(0, self._head - min(backlog, self.capacity)))
+
+
+class Subscription:
+    """Позиция зрителя в кольце канала"""
+
+    __slots__ = ("channel", "cursor", "delivered", "dropped")
+
+    def __init__(self, channel: Channel, cursor: int):
+        self.channel = channel
+        self.cursor = cursor
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def lag(self) -> int:
+        """Сколько кадров ждёт зрителя"""
+        return self.channel.published - self.cursor
+
+    def poll(self) -> bytes:
+        """Все новые кадры одним куском (b"" — новых нет); отставшие сверх кольца теряются"""
+        channel = self.channel
+        capacity = channel.capacity
+        head = channel.published
+        start = self.cursor
+        if head - start > capacity:
+            self.dropped += head - capacity - start
+            start = head - capacity
+        frames = [channel._frames[number % capacity] for number in range(start, head)]
+        # Издатель мог успеть перезаписать начало, пока мы копировали: такие кадры теряем
+        overwritten = channel.published - capacity - start
+        if overwritten > 0:
+            del frames[:overwritten]
+            self.dropped += overwritten
+        self.cursor = head
+        self.delivered += len(frames)
+        return b"".join(frames)
+
+
+class BroadcastRenderBuffer(RenderBuffer):
+    """
+    Буфер экрана, публикующий каждый выведенный экран в канал.
+
+    Работает в бинарном режиме: экран кодируется один раз, и те же байты идут и
+    в поток вывода, и зрителям.
+    """
+
+    __slots__ = ("channel", "echo")
+
+    def __init__(self, channel: Channel, stream: Optional[TextIO] = None, echo: bool = True):
+        """
+        :param echo: выводить экран и в stream (False — только трансляция)
+        """
+        super().__init__(stream, binary=True)
+        self.channel = channel
+        self.echo = echo
+
+    def flush(self) -> int:
+        if not self._chunks:
+            return 0
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.channel.publish(data)
+        if self.echo:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.flush()  # не обгоняем текст, уже лежащий в буфере потока
+            getattr(stream, "buffer", stream).write(data)
+            stream.flush()
+        return len(data)
+
+
+class _Viewer:
+    __slots__ = ("sock", "subscription", "outbox")
+
+    def __init__(self, sock: socket.socket, subscription: Subscription):
+        self.sock = sock
+        self.subscription = subscription
+        self.outbox = b""
+
+
+class SpectatorServer:
+    """
+    Раздаёт кадры канала зрителям по TCP из отдельного потока.
+
+    Поток раз в interval секунд забирает у каждого зрителя накопленное и пишет
+    в неблокирующий сокет; пока зритель не принял прошлую порцию, новых кадров
+    он не получает, и его отставание ограничено кольцом канала. Игрок при этом
+    только публикует кадры.
+    """
+
+    def __init__(self, channel: Channel, host: str = "127.0.0.1", port: int = 0, interval: float = 0.05):
+        self.channel = channel
+        self.interval = interval
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.running = False
+        self._viewers: Dict[socket.socket, _Viewer] = {}
+        self._selector = selectors.DefaultSelector()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self):
+        return self.listener.getsockname()
+
+    def __len__(self) -> int:
+        return len(self._viewers)
+
+    def start(self) -> "SpectatorServer":
+        self.running = True
+        self._thread = threading.Thread(target=self.serve, name="spectators", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.listener.close()
+
+    def serve(self):
+        """Обслуживать зрителей, пока running не станет False"""
+        self._selector.register(self.listener, selectors.EVENT_READ)
+        try:
+            while self.running:
+                for key, _ in self._selector.select(self.interval):
+                    if key.fileobj is self.listener:
+                        self._accept()
+                    else:
+                        self._read(self._viewers.get(key.fileobj))
+                for viewer in list(self._viewers.values()):
+                    self._send(viewer)
+        finally:
+            for viewer in list(self._viewers.values()):
+                self._close(viewer)
+            self._selector.unregister(self.listener)
+            self._selector.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            self._viewers[sock] = _Viewer(sock, self.channel.subscribe())
+            self._selector.register(sock, selectors.EVENT_READ)
+
+    def _read(self, viewer: Optional[_Viewer]):
+        """Ввод зрителей не нужен: чтение только замечает отключение"""
+        if viewer is None:
+            return
+        try:
+            data = viewer.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(viewer)
+
+    def _send(self, viewer: _Viewer):
+        if not viewer.outbox:
+            viewer.outbox = viewer.subscription.poll()
+            if not viewer.outbox:
+                return
+        try:
+            sent = viewer.sock.send(viewer.outbox)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close(viewer)
+            return
+        viewer.outbox = viewer.outbox[sent:]
+
+    def _close(self, viewer: _Viewer):
+        if self._viewers.pop(viewer.sock, None) is None:
+            return
+        self._selector.unregister(viewer.sock)
+        viewer.sock.close()
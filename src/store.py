@@ -0,0 +1,321 @@
+"""
+Хранилище сохранённых сессий и итогов партий на SQLite (режим WAL).
+
+Запись идёт в одном фоновом потоке: вызовы checkpoint()/record_run() только
+кладут данные в очередь и не ждут диска, поэтому не задерживают цикл событий
+сервера. Поток-писатель забирает накопившееся пачкой и пишет одной
+транзакцией; несколько контрольных точек одной сессии схлопываются в
+последнюю. Чтение идёт через небольшой пул соединений — в режиме WAL читатели
+не блокируются писателем.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    rooms_cleared INTEGER NOT NULL,
+    health INTEGER NOT NULL,
+    fights INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    finished REAL NOT NULL,
+    killed_by TEXT
+);
+"""
+
+# Колонки, добавленные после первой версии схемы: (таблица, колонка, определение)
+_ADDED_COLUMNS = (("runs", "killed_by", "TEXT"),)
+
+# Тексты запросов неизменны: sqlite3 кэширует подготовленные выражения по тексту
+_UPSERT_SESSION = (
+    "INSERT INTO sessions (session_id, data, updated) VALUES (?, ?, ?) "
+    "ON CONFLICT (session_id) DO UPDATE SET data = excluded.data, updated = excluded.updated"
+)
+_DELETE_SESSION = "DELETE FROM sessions WHERE session_id = ?"
+_SELECT_SESSION = "SELECT data FROM sessions WHERE session_id = ?"
+_INSERT_RUN = (
+    "INSERT INTO runs (player, seed, outcome, rooms_cleared, health, fights, turns, duration, finished, killed_by) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+RUN_FIELDS = (
+    "player", "seed", "outcome", "rooms_cleared", "health", "fights", "turns", "duration", "finished", "killed_by"
+)
+
+_DELETED = None  # отметка об удалении сессии в очереди записи
+_SEED_BITS = 64
+_SEED_SIGN = 1 << (_SEED_BITS - 1)
+
+
+def _seed_to_sql(seed: int) -> int:
+    """Зерно (до 64 бит без знака) как знаковое 64-битное целое SQLite"""
+    if not 0 <= seed < 1 << _SEED_BITS:
+        raise ValueError(f"Seed must fit in {_SEED_BITS} bits: {seed}")
+    return seed - (1 << _SEED_BITS) if seed >= _SEED_SIGN else seed
+
+
+def run_from_row(row: Tuple) -> dict:
+    """Партия из строки выборки по RUN_FIELDS (зерно снова без знака)"""
+    run = dict(zip(RUN_FIELDS, row))
+    run["seed"] %= 1 << _SEED_BITS
+    return run
+
+
+class StoreClosed(RuntimeError):
+    """Запись в закрытое хранилище"""
+
+
+class GameStore:
+    """
+    Сессии (сохранения savegame) и итоги партий в одном файле SQLite.
+
+    Прочитанное сразу после checkpoint() совпадает с записанным, даже если
+    поток-писатель ещё не добрался до диска.
+    """
+
+    def __init__(self, path: str, readers: int = 4, batch_size: int = 5_000):
+        """
+        :param readers: число соединений для чтения
+        :param batch_size: сколько записей писать одной транзакцией
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self._lock = threading.Condition()
+        # Очередь записи: последняя контрольная точка каждой сессии и новые партии
+        self._pending: Dict[str, Optional[bytes]] = {}
+        self._pending_runs: List[Tuple] = []
+        # Пачка, которую писатель пишет прямо сейчас (видна читателям до фиксации)
+        self._inflight: Dict[str, Optional[bytes]] = {}
+        self._enqueued = 0
+        self._committed = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        # Метрики
+        self.checkpoints = 0
+        self.runs_recorded = 0
+        self.batches = 0
+        self.batch_max = 0
+        self.write_time_total = 0.0
+
+        writer = self._connect()
+        writer.executescript(_SCHEMA)
+        self._migrate(writer)
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        for _ in range(readers):
+            self._readers.put(self._connect())
+        self._thread = threading.Thread(target=self._write_loop, args=(writer,), name="game-store", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # В WAL режим NORMAL не теряет целостность при сбое, но не ждёт fsync на каждую транзакцию
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def _migrate(connection: sqlite3.Connection):
+        """Добавить в базу, созданную прежней версией схемы, недостающие колонки"""
+        for table, column, definition in _ADDED_COLUMNS:
+            columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def __enter__(self) -> "GameStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check_writable(self):
+        """Запись возможна: хранилище открыто и писатель жив (под self._lock)"""
+        if self._error is not None:
+            raise StoreClosed("Store writer failed") from self._error
+        if self._closed:
+            raise StoreClosed("Store is closed")
+
+    def _enqueue(self):
+        """Учесть поставленную в очередь запись и разбудить писателя (под self._lock)"""
+        self._enqueued += 1
+        self._lock.notify_all()
+
+    def checkpoint(self, session_id: str, data: bytes):
+        """Сохранить состояние сессии (не дожидаясь записи на диск)"""
+        with self._lock:
+            self._check_writable()
+            self._pending[session_id] = data
+            self.checkpoints += 1
+            self._enqueue()
+
+    def delete_session(self, session_id: str):
+        """Удалить сохранение сессии"""
+        with self._lock:
+            self._check_writable()
+            self._pending[session_id] = _DELETED
+            self._enqueue()
+
+    def record_run(
+        self,
+        player: str,
+        outcome: str,
+        rooms_cleared: int,
+        health: int,
+        fights: int,
+        turns: int,
+        seed: int = 0,
+        duration: float = 0.0,
+        killed_by: Optional[str] = None,
+    ):
+        """
+        Записать итог завершённой партии.
+
+        :param outcome: "exit", "defeat" или "quit"
+        :param health: здоровье игрока в конце партии
+        :param seed: зерно сессии (до 64 бит без знака)
+        :param duration: длительность партии в секундах
+        :param killed_by: имя врага, победившего игрока
+        """
+        row = (player, _seed_to_sql(seed), outcome, rooms_cleared, health, fights, turns, duration, time.time(), killed_by)
+        with self._lock:
+            self._check_writable()
+            self._pending_runs.append(row)
+            self.runs_recorded += 1
+            self._enqueue()
+
+    def load_session(self, session_id: str) -> Optional[bytes]:
+        """Последнее сохранение сессии или None"""
+        with self._lock:
+            for batch in (self._pending, self._inflight):
+                if session_id in batch:
+                    return batch[session_id]
+        with self.reader() as connection:
+            row = connection.execute(_SELECT_SESSION, (session_id,)).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Соединение для чтения из пула (ждёт, если все заняты)"""
+        connection = self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться записи всего, что поставлено в очередь; False — по таймауту"""
+        with self._lock:
+            target = self._enqueued
+            done = self._lock.wait_for(lambda: self._committed >= target or self._error is not None, timeout)
+            if self._error is not None:
+                raise self._error
+            return done
+
+    def close(self):
+        """Дописать очередь, остановить писателя и закрыть соединения"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        self._thread.join()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    def _take_batch(self) -> Tuple[Dict[str, Optional[bytes]], List[Tuple], int]:
+        """Забрать из очереди до batch_size записей (под self._lock)"""
+        sessions = self._pending
+        runs = self._pending_runs
+        if len(sessions) + len(runs) <= self.batch_size:
+            self._pending, self._pending_runs = {}, []
+            return sessions, runs, self._enqueued
+        # Очередь больше пачки: сначала сессии (по порядку постановки), затем партии
+        batch: Dict[str, Optional[bytes]] = {}
+        for session_id in list(sessions)[: self.batch_size]:
+            batch[session_id] = sessions.pop(session_id)
+        taken_runs = runs[: self.batch_size - len(batch)]
+        del runs[: len(taken_runs)]
+        return batch, taken_runs, None
+
+    def _write_loop(self, connection: sqlite3.Connection):
+        try:
+            while True:
+                with self._lock:
+                    self._lock.wait_for(lambda: self._pending or self._pending_runs or self._closed)
+                    if not (self._pending or self._pending_runs):
+                        return
+                    sessions, runs, enqueued = self._take_batch()
+                    self._inflight = sessions
+                start = time.perf_counter()
+                self._write(connection, sessions, runs)
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._inflight = {}
+                    if enqueued is not None:
+                        self._committed = enqueued
+                    self.batches += 1
+                    self.batch_max = max(self.batch_max, len(sessions) + len(runs))
+                    self.write_time_total += elapsed
+                    self._lock.notify_all()
+        except BaseException as e:
+            # Ошибку получат flush() и следующие вызовы записи (см. _check_writable)
+            with self._lock:
+                self._error = e
+                self._lock.notify_all()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, sessions: Dict[str, Optional[bytes]], runs: List[Tuple]):
+        """Записать пачку одной транзакцией"""
+        now = time.time()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                _UPSERT_SESSION, ((sid, data, now) for sid, data in sessions.items() if data is not _DELETED)
+            )
+            connection.executemany(
+                _DELETE_SESSION, ((sid,) for sid, data in sessions.items() if data is _DELETED)
+            )
+            connection.executemany(_INSERT_RUN, runs)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def count_runs(self) -> int:
+        """Число записанных партий"""
+        with self.reader() as connection:
+            return connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def recent_runs(self, limit: int = 10) -> List[dict]:
+        """Последние партии, новые первыми"""
+        with self.reader() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(RUN_FIELDS)} FROM runs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [run_from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики: очередь, число и размер пачек, среднее время записи пачки"""
+        with self._lock:
+            return {
+                "pending": len(self._pending) + len(self._pending_runs),
+                "checkpoints": self.checkpoints,
+                "runs": self.runs_recorded,
+                "batches": self.batches,
+                "batch_max": self.batch_max,
+                "write_time_mean": self.write_time_total / self.batches if self.batches else 0.0,
+            }
@@ -0,0 +1,154 @@
+"""Трассировка времени выполнения с экспортом в формат Chrome trace-event"""
+
+import functools
+import json
+import os
+import time
+from _thread import get_ident
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src import hooks
+
+# Текущий трассировщик; None — трассировка выключена. Горячие циклы (раунды боя)
+# читают его один раз и дальше проверяют только локальную переменную
+active: Optional["Tracer"] = None
+
+
+class Tracer:
+    """
+    Собирает интервалы (spans) в памяти.
+
+    Время берётся из time.perf_counter_ns; события хранятся как «complete»
+    (ph="X") события Chrome trace-event и экспортируются в JSON, который
+    открывается в chrome://tracing или Perfetto.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.pid = os.getpid()
+        self._origin = time.perf_counter_ns()
+
+    def complete(self, name: str, category: str, start_ns: int, end_ns: Optional[int] = None, **args):
+        """Записать интервал [start_ns, end_ns] (по умолчанию — до текущего момента)"""
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self.pid,
+            "tid": get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = "game", **args) -> Iterator[None]:
+        """Замерить блок кода"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.complete(name, category, start, **args)
+
+    def to_json(self) -> str:
+        """События в формате Chrome trace-event"""
+        return json.dumps({"traceEvents": self.events, "displayTimeUnit": "ns"}, ensure_ascii=False)
+
+    def export(self, path: str):
+        """Записать трассу в файл"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+def _instrumented() -> List[Tuple[type, str, str, str]]:
+    """Что оборачивается при включении: (класс, атрибут, имя интервала, категория)"""
+    # Импорт здесь: эти модули сами импортируют tracing
+    from src.combat import CombatSystem
+    from src.controller import GameController
+    from src.dungeon import DungeonGenerator
+    from src.render import RenderBuffer
+
+    return [
+        (DungeonGenerator, "_load_json", "load_json", "content"),
+        (DungeonGenerator, "create_player", "create_player", "generation"),
+        (DungeonGenerator, "generate_dungeon", "generate_dungeon", "generation"),
+        (CombatSystem, "auto_battle", "auto_battle", "combat"),
+        (CombatSystem, "pack_battle", "pack_battle", "combat"),
+        (GameController, "display_room", "display_room", "render"),
+        (RenderBuffer, "lines", "print_lines", "render"),
+        (RenderBuffer, "flush", "flush", "render"),
+        (GameController, "get_user_input", "input_wait", "input"),
+    ]
+
+
+def _wrap(name: str, category: str) -> Callable[[Callable], Callable]:
+    """Фабрика обёртки, замеряющей вызов функции"""
+
+    def make_wrapper(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = active
+            if tracer is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.complete(name, category, start)
+
+        return wrapper
+
+    return make_wrapper
+
+
+def enable(tracer: Optional[Tracer] = None) -> Tracer:
+    """
+    Включить трассировку.
+
+    Инструментированные методы подменяются обёртками только на время
+    трассировки, поэтому в выключенном состоянии накладных расходов нет.
+    """
+    global active
+    active = tracer or Tracer()
+    for owner, attribute, name, category in _instrumented():
+        hooks.install("tracing", owner, attribute, _wrap(name, category))
+    return active
+
+
+def disable() -> Optional[Tracer]:
+    """Выключить трассировку, вернуть исходные методы и отдать собранную трассу"""
+    global active
+    tracer, active = active, None
+    hooks.uninstall("tracing")
+    return tracer
+
+
+@contextmanager
+def tracing(path: Optional[str] = None) -> Iterator[Tracer]:
+    """Трассировать блок кода и, если задан path, записать трассу в файл"""
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        disable()
+        if path is not None:
+            tracer.export(path)
+
+
+@contextmanager
+def span(name: str, category: str = "game", **args) -> Iterator[None]:
+    """Замерить произвольный блок кода, если трассировка включена"""
+    tracer = active
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name, category, **args):
+        yield
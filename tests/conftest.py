@@ -1,5 +1,7 @@
 """Конфигурация pytest и фикстуры для тестирования"""
 
+import io
+
 import pytest
 from pathlib import Path
 
@@ -156,3 +158,22 @@ def empty_room() -> Room:
 def room_with_enemy(sample_enemy) -> Room:
     """Фикстура: создание комнаты с врагом"""
     return Room("Rm", "Комната с врагом", sample_enemy)
+
+
+class CountingStream(io.StringIO):
+    """Текстовый поток, считающий количество операций записи"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.buffer = io.BytesIO()
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.fixture
+def counting_stream() -> CountingStream:
+    """Фикстура: поток вывода со счётчиком записей"""
+    return CountingStream()
@@ -0,0 +1,45 @@
+"""Тесты для потоковой аналитики журнала боёв"""
+import pytest
+import allure
+
+from src.analytics import analyze, format_report
+from src.events import BinaryWriter, FightEvent, JsonLinesWriter
+
+
+@pytest.fixture(params=[False, True], ids=["jsonl", "binary"])
+def events_file(request, tmp_path):
+    """Файл событий: 300 боёв с крысой и 100 — со скелетом"""
+    path = str(tmp_path / "fights")
+    writer = BinaryWriter(path) if request.param else JsonLinesWriter(path)
+    with writer:
+        for i in range(300):
+            writer.emit(FightEvent("Крыса", i % 3 != 0, i % 10 + 1, 6, 2, 30))
+        for i in range(100):
+            writer.emit(FightEvent("Скелет", False, 20, 15, 10, 0))
+    return path
+
+
+@allure.feature("Аналитика")
+@allure.story("Агрегаты по врагам")
+class TestAnalytics:
+    """Тесты агрегатов"""
+
+    @allure.title("Доля побед, урон и раунды")
+    @allure.description("Проверка агрегатов по врагам, в том числе в параллельном режиме")
+    @pytest.mark.parametrize("processes", [1, 3])
+    def test_aggregates(self, events_file, processes):
+        """Проверка агрегатов"""
+        stats = analyze(events_file, processes=processes)
+        rat = stats["Крыса"].to_dict()
+        assert rat["fights"] == 300 and rat["win_rate"] == pytest.approx(2 / 3)
+        assert rat["damage_dealt_mean"] == 6 and rat["damage_taken_mean"] == 2
+        assert rat["rounds_p50"] == 5 and rat["rounds_max"] == 10
+        assert stats["Скелет"].to_dict()["rounds_p90"] == 20
+        assert "Крыса" in format_report(stats)
+
+    @allure.title("Фильтр по врагу")
+    @allure.description("Проверка, что --enemy оставляет бои только с одним врагом")
+    def test_enemy_filter(self, events_file):
+        """Проверка фильтра"""
+        stats = analyze(events_file, processes=2, enemy="Скелет")
+        assert list(stats) == ["Скелет"] and stats["Скелет"].fights == 100
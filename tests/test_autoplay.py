@@ -0,0 +1,86 @@
+"""Тесты для массовой автоигры"""
+import random
+
+import pytest
+import allure
+
+from src.autoplay import CountingRandom, RunSummary, play_many, play_run
+from src.controller import GameController
+from src.render import NullRenderBuffer
+from src.solver import DungeonSolver
+
+
+@allure.feature("Автоигра")
+@allure.story("Партии без ввода и вывода")
+class TestAutoplay:
+    """Тесты автоигры"""
+
+    @allure.title("ГСЧ со счётчиком совпадает с обычным")
+    @allure.description("Проверка, что CountingRandom выдаёт ту же последовательность, что и random.Random")
+    def test_counting_random_same_sequence(self):
+        """Проверка последовательности"""
+        counting, plain = CountingRandom(42), random.Random(42)
+        assert [counting.randint(1, 100) for _ in range(50)] == [plain.randint(1, 100) for _ in range(50)]
+        assert counting.choice("abcdef") == plain.choice("abcdef")
+        assert counting.draws >= 51
+
+    @allure.title("Итог совпадает с игрой через контроллер")
+    @allure.description("Проверка, что автоигра даёт тот же исход, что и обычная сессия с теми же действиями")
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_controller(self, dungeon_generator, seed):
+        """Проверка исхода"""
+        summary = play_run(dungeon_generator, seed, num_rooms=6)
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(6, wait_for_start=False, seed=seed)
+        health = [controller.player.current_health]
+        while controller.running:
+            room = controller.get_current_room()
+            if room.has_alive_enemy():
+                won = controller.execute_action("attack")
+                health.append(controller.player.current_health)
+                if not won:
+                    break
+            else:
+                controller.execute_action("exit" if room.room_type == "Ex" else "forward")
+        assert summary.hp_trace == tuple(health)
+        assert summary.fights == len(health) - 1
+        assert summary.turns == controller.turn
+        assert summary.rng_draws > 0
+        assert summary.outcome in ("exit", "defeat")
+
+    @allure.title("Политика решателя")
+    @allure.description("Проверка, что решатель уходит из безнадёжных партий, а не погибает")
+    def test_solver_policy(self, dungeon_generator):
+        """Проверка политики решателя"""
+        for seed in range(30):
+            summary = play_run(dungeon_generator, seed, num_rooms=5, policy="solver")
+            controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+            controller.initialize_game(5, wait_for_start=False, seed=seed)
+            if DungeonSolver(controller.dungeon, controller.player).win_probability() == 0:
+                assert summary.outcome == "quit"
+            assert summary.outcome != "timeout"
+
+    @allure.title("Жадная политика")
+    @allure.description("Проверка, что жадная политика не выбирает бой без шансов")
+    def test_greedy_policy(self, dungeon_generator):
+        """Проверка жадной политики"""
+        summaries = [play_run(dungeon_generator, seed, policy="greedy") for seed in range(50)]
+        assert {summary.outcome for summary in summaries} <= {"exit", "defeat", "quit"}
+
+    @allure.title("Пул процессов")
+    @allure.description("Проверка, что партии в пуле процессов дают те же итоги и в том же порядке")
+    def test_process_pool(self, dungeon_generator):
+        """Проверка пула процессов"""
+        seeds = list(range(20))
+        inline = list(play_many(dungeon_generator, seeds, processes=1))
+        pooled = list(play_many(dungeon_generator, seeds, processes=2, chunksize=4))
+        assert pooled == inline
+        assert [summary.seed for summary in pooled] == seeds
+        assert isinstance(pooled[0], RunSummary)
+
+    @allure.title("Неизвестная политика")
+    @allure.description("Проверка, что неизвестная политика отклоняется")
+    def test_unknown_policy(self, dungeon_generator):
+        """Проверка ошибки"""
+        with pytest.raises(ValueError):
+            list(play_many(dungeon_generator, [1], policy="random", processes=1))
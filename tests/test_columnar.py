@@ -0,0 +1,77 @@
+"""Тесты для колоночного хранения событий"""
+import pytest
+import allure
+
+from src.columnar import ACTION_SCHEMA, ColumnarReader, ColumnarWriter, convert
+from src.controller import GameController
+from src.events import FightEvent, JsonLinesWriter
+from src.render import NullRenderBuffer
+
+
+@pytest.fixture
+def fights_file(tmp_path):
+    """Колоночный файл: 10 блоков по 100 боёв; долгие бои со скелетом — только в блоке 7"""
+    path = str(tmp_path / "fights.col")
+    with ColumnarWriter(path, chunk_rows=100) as writer:
+        for chunk in range(10):
+            enemy = "Скелет" if chunk in (3, 7) else "Крыса"
+            for i in range(100):
+                rounds = 30 if chunk == 7 and i < 5 else i % 10 + 1
+                writer.emit(FightEvent(enemy, i % 2 == 0, rounds, 6, 2, 40 - i % 40))
+    return path
+
+
+@allure.feature("Колоночное хранение")
+@allure.story("Запросы")
+class TestColumnarReader:
+    """Тесты чтения и пропуска блоков"""
+
+    @allure.title("Пропуск блоков по условию")
+    @allure.description("Проверка, что запрос «враг X и раундов больше 20» читает только подходящий блок")
+    def test_chunk_skipping(self, fights_file):
+        """Проверка пропуска блоков"""
+        with ColumnarReader(fights_file) as reader:
+            rows = list(reader.scan(["enemy", "rounds"], enemy="Скелет", rounds=(21, None)))
+            assert rows == [("Скелет", 30)] * 5
+            assert reader.chunks_read == 1 and reader.chunks_skipped == 9
+            assert reader.count(enemy="Скелет") == 200 and reader.chunks_read == 2
+            assert reader.count(enemy="Гоблин") == 0 and reader.chunks_read == 0
+            assert reader.count(won=1, rounds=(None, 2)) == 99
+
+    @allure.title("Полное чтение совпадает с записанным")
+    @allure.description("Проверка конвертации журнала JSON Lines и чтения всех колонок")
+    def test_convert_roundtrip(self, tmp_path):
+        """Проверка конвертации"""
+        source = str(tmp_path / "fights.jsonl")
+        events = [FightEvent("Крыса", bool(i % 3), i % 100 + 1, i, 2 * i, 7) for i in range(250)]
+        with JsonLinesWriter(source) as writer:
+            for event in events:
+                writer.emit(event)
+        target = str(tmp_path / "fights.col")
+        assert convert(source, target, chunk_rows=64) == 250
+        with ColumnarReader(target) as reader:
+            assert len(reader) == 250
+            assert [FightEvent(*row[:1], bool(row[1]), *row[2:]) for row in reader.scan()] == events
+        with pytest.raises(ValueError):
+            ColumnarReader(source)
+
+
+@allure.feature("Колоночное хранение")
+@allure.story("Действия")
+class TestActionColumns:
+    """Тесты записи действий"""
+
+    @allure.title("Действия игрока в колоночном файле")
+    @allure.description("Проверка, что record_action записывает ход, действие, позицию и здоровье")
+    def test_record_actions(self, tmp_path, dungeon_generator):
+        """Проверка записи действий"""
+        path = str(tmp_path / "actions.col")
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(5, wait_for_start=False, seed=2)
+        with ColumnarWriter(path, ACTION_SCHEMA) as writer:
+            controller.action_listeners.append(writer.record_action)
+            controller.execute_action("forward")
+            controller.execute_action("back")
+        with ColumnarReader(path) as reader:
+            assert list(reader.scan(["turn", "action", "position"])) == [(1, "forward", 1), (2, "back", 0)]
+            assert reader.count(action="back") == 1
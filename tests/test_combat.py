@@ -1,4 +1,6 @@
 """Тесты для боевой системы"""
+import random
+
 import pytest
 import allure
 
@@ -431,3 +433,117 @@ class TestCombatLog:
             assert "Состояние здоровья" in log_text
         with allure.step("Проверка наличия информации об атаках"):
             assert len(combat.combat_log) > 5
+
+
+@allure.feature("Боевая система")
+@allure.story("Бой без лога")
+class TestCombatWithoutLog:
+    """Тесты боя с выключенным текстовым логом"""
+
+    @allure.title("Исход боя не зависит от лога")
+    @allure.description("Проверка, что с логом и без лога бой с тем же зерном идёт одинаково")
+    @pytest.mark.parametrize("seed", range(5))
+    def test_same_outcome_without_log(self, dungeon_generator, seed):
+        """Проверка одинакового исхода"""
+        results = []
+        for log_enabled in (True, False):
+            rng = random.Random(seed)
+            combat = CombatSystem(dungeon_generator, rng)
+            combat.log_enabled = log_enabled
+            player = dungeon_generator.build_player("Степан Дубина", "")
+            enemy = dungeon_generator.build_enemy(seed % 3)
+            won = combat.auto_battle(player, enemy)
+            results.append((won, player.current_health, enemy.current_health, rng.random()))
+            if not log_enabled:
+                with allure.step("Проверка пустого лога"):
+                    assert combat.combat_log == []
+        with allure.step("Сравнение исходов"):
+            assert results[0] == results[1]
+
+
+def _pack_enemy(name: str, health: int = 10, damage: int = 1, hit_chance: int = 100, speed: int = 100) -> Enemy:
+    """Враг стаи с заданным оружием"""
+    return Enemy(name, health, Weapon("Коготь", "", damage, hit_chance, speed), Armor("Шкура", "", 0))
+
+
+@allure.feature("Боевая система")
+@allure.story("Бой со стаей")
+class TestPackBattle:
+    """Тесты боя со стаей по шкале инициативы"""
+
+    @allure.title("Один живой враг — обычный бой")
+    @allure.description("Проверка, что pack_battle с одним живым врагом идёт ровно как auto_battle")
+    @pytest.mark.parametrize("seed", range(3))
+    def test_single_enemy_identical(self, dungeon_generator, seed):
+        """Проверка совместимости с боем один на один"""
+        results = []
+        for pack in (False, True):
+            rng = random.Random(seed)
+            combat = CombatSystem(dungeon_generator, rng)
+            player = dungeon_generator.build_player("Степан Дубина", "")
+            enemy = dungeon_generator.build_enemy(seed % 3)
+            if pack:
+                fallen = dungeon_generator.build_enemy(0)
+                fallen.defeat()
+                won = combat.pack_battle(player, [fallen, enemy])
+            else:
+                won = combat.auto_battle(player, enemy)
+            results.append((won, player.current_health, enemy.current_health, combat.combat_log, rng.random()))
+        assert results[0] == results[1]
+
+    @allure.title("Победа над стаей и выбор цели")
+    @allure.description("Проверка, что игрок добивает самого раненого врага и побеждает всю стаю")
+    def test_player_defeats_pack(self, dungeon_generator, sample_player):
+        """Проверка победы и порядка целей"""
+        sample_player.weapon = Weapon("Меч", "", 10, 100)
+        sample_player.max_health = sample_player.current_health = 100
+        pack = [_pack_enemy("Волк", 20), _pack_enemy("Крыса", 5), _pack_enemy("Паук", 10)]
+        combat = CombatSystem(dungeon_generator, random.Random(0))
+        assert combat.pack_battle(sample_player, pack) is True
+        assert all(enemy.defeated for enemy in pack)
+        targets = [line for line in combat.combat_log if line.startswith("\nВы наносите удар по")]
+        assert targets == [
+            "\nВы наносите удар по Крыса!",
+            "\nВы наносите удар по Паук!",
+            "\nВы наносите удар по Волк!",
+            "\nВы наносите удар по Волк!",
+        ]
+        assert combat.last_rounds == 4
+        # Броня игрока поглощает удары стаи
+        assert sample_player.current_health == 100
+
+    @allure.title("Скорость оружия")
+    @allure.description("Проверка, что оружие со скоростью 200 бьёт вдвое чаще")
+    def test_weapon_speed(self, dungeon_generator, sample_player):
+        """Проверка шкалы инициативы"""
+        sample_player.weapon = Weapon("Палка", "", 0, 100)
+        sample_player.armor = Armor("Ничего", "", 0)
+        sample_player.max_health = sample_player.current_health = 1000
+        pack = [_pack_enemy("Быстрый", speed=200), _pack_enemy("Медленный", speed=50)]
+        combat = CombatSystem(dungeon_generator, random.Random(0))
+        combat.log_enabled = False
+        # Ничья по времени: здоровья у игрока больше, чем у всей стаи, — стая отступает
+        assert combat.pack_battle(sample_player, pack) is True
+        assert combat.last_rounds == CombatSystem.MAX_ROUNDS and all(enemy.defeated for enemy in pack)
+        # За 100 раундов: 200 ударов быстрого и 50 медленного
+        assert sample_player.current_health == 1000 - 250
+
+    @allure.title("Гибель игрока в бою со стаей")
+    @allure.description("Проверка поражения против сильной стаи")
+    def test_player_loses(self, dungeon_generator, sample_player):
+        """Проверка поражения"""
+        pack = [_pack_enemy("Огр", 100, damage=50) for _ in range(3)]
+        combat = CombatSystem(dungeon_generator, random.Random(0))
+        assert combat.pack_battle(sample_player, pack) is False
+        assert not sample_player.is_alive()
+        assert combat.combat_log[-1].startswith("Вы погибли...")
+
+    @allure.title("Кто победил игрока в стае")
+    @allure.description("Проверка, что last_attacker — враг, нанёсший смертельный удар, а не первый в стае")
+    def test_last_attacker(self, dungeon_generator, sample_player):
+        """Проверка последнего ударившего"""
+        slime, ogre = _pack_enemy("Слизень", 100, speed=50), _pack_enemy("Огр", 100, damage=50)
+        combat = CombatSystem(dungeon_generator, random.Random(0))
+        assert combat.pack_battle(sample_player, [slime, ogre]) is False
+        assert combat.last_attacker is ogre
+        assert combat.last_damage_taken[0] == 0 and combat.last_damage_taken[1] > 0
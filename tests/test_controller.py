@@ -4,6 +4,7 @@ import allure
 from unittest.mock import patch
 
 from src.controller import GameController
+from src.render import RenderBuffer
 from src.entities import Weapon, Armor, Enemy
 
 
@@ -653,3 +654,273 @@ class TestGameControllerIntegration:
             assert enemy2.defeated is True
         with allure.step("Проверка, что игрок все еще жив"):
             assert controller.player.is_alive()
+
+
+@allure.feature("Игровой контроллер")
+@allure.story("Неблокирующий игровой цикл")
+class TestGameControllerPlayCoroutine:
+    """Тесты игрового цикла в виде генератора"""
+
+    @allure.title("Первый экран содержит приветствие и меню")
+    @allure.description("Проверка, что play() отдаёт текст экрана и действия без print/input")
+    def test_play_first_frame(self, dungeon_generator):
+        """Проверка первого экрана генератора"""
+        controller = GameController(dungeon_generator)
+        with patch("builtins.input", side_effect=AssertionError("input() вызван")):
+            with patch("builtins.print") as mock_print:
+                with allure.step("Запуск генератора"):
+                    output, actions = next(controller.play(num_rooms=3))
+                with allure.step("Проверка отсутствия прямого вывода"):
+                    mock_print.assert_not_called()
+        with allure.step("Проверка содержимого экрана"):
+            assert "Добро пожаловать" in output
+            assert "Комната 1 из 3" in output
+        with allure.step("Проверка доступных действий"):
+            assert actions == {1: ("forward", "Пойти дальше")}
+
+    @allure.title("Прохождение подземелья через send()")
+    @allure.description("Проверка полного прохождения игры с выбором действий по имени и номеру")
+    def test_play_walkthrough(self, dungeon_generator):
+        """Проверка прохождения через send()"""
+        controller = GameController(dungeon_generator)
+        with patch("builtins.print"):
+            controller.initialize_game(num_rooms=3, wait_for_start=False)
+        with allure.step("Очистка комнат от врагов"):
+            for room in controller.dungeon:
+                room.enemy = None
+        game = controller.play()
+        with allure.step("Движение вперёд по номеру пункта и по имени"):
+            next(game)
+            game.send(1)
+            output, actions = game.send("forward")
+        with allure.step("Проверка выходной комнаты"):
+            assert controller.current_position == 2
+            assert ("exit", "Выйти из подземелья") in actions.values()
+        with allure.step("Выход из подземелья"):
+            output, actions = game.send("exit")
+        with allure.step("Проверка финального экрана"):
+            assert "Поздравляем" in output
+            assert actions == {}
+            assert controller.running is False
+        with allure.step("Проверка завершения генератора"):
+            with pytest.raises(StopIteration):
+                next(game)
+
+    @allure.title("Неверный выбор в play()")
+    @allure.description("Проверка, что неверный выбор возвращает сообщение и прежнее меню")
+    @pytest.mark.parametrize("choice", [5, "abc", None, "attack", "²", "①"])
+    def test_play_invalid_choice(self, dungeon_generator, choice):
+        """Проверка обработки неверного выбора"""
+        controller = GameController(dungeon_generator)
+        game = controller.play(num_rooms=3)
+        _, actions = next(game)
+        with allure.step(f"Отправка неверного выбора {choice!r}"):
+            output, same_actions = game.send(choice)
+        with allure.step("Проверка сообщения об ошибке и прежнего меню"):
+            assert "Неверный выбор" in output
+            assert same_actions == actions
+            assert controller.current_position == 0
+
+    @allure.title("Независимые сессии в одном потоке")
+    @allure.description("Проверка чередования нескольких генераторов без взаимного влияния")
+    def test_play_multiplexed_sessions(self, dungeon_generator):
+        """Проверка мультиплексирования сессий"""
+        controllers = [GameController(dungeon_generator) for _ in range(3)]
+        games = [controller.play(num_rooms=4) for controller in controllers]
+        for game in games:
+            next(game)
+        with allure.step("Ход только в первой сессии"):
+            games[0].send("quit")
+        with allure.step("Проверка состояний сессий"):
+            assert controllers[0].running is False
+            assert all(controller.running for controller in controllers[1:])
+
+
+@allure.feature("Игровой контроллер")
+@allure.story("Буферизованный вывод")
+class TestGameControllerBufferedOutput:
+    """Тесты вывода экранов одной записью"""
+
+    @allure.title("Экран комнаты выводится одной записью")
+    @allure.description("Проверка, что display_room и execute_action пишут в поток по одному разу")
+    def test_screens_written_once(self, dungeon_generator, counting_stream):
+        """Проверка количества записей в поток"""
+        stream = counting_stream
+        controller = GameController(dungeon_generator, screen=RenderBuffer(stream))
+        with patch("builtins.input", return_value=""):
+            with allure.step("Инициализация игры"):
+                controller.initialize_game(num_rooms=3)
+        with allure.step("Проверка одной записи приветствия"):
+            assert stream.writes == 1
+        with allure.step("Отображение комнаты"):
+            controller.display_room()
+            assert stream.writes == 2
+        with allure.step("Бой с выводом лога"):
+            controller.get_current_room().enemy = Enemy(
+                "Пещерный гоблин",
+                1,
+                Weapon("Ржавый нож", "Нож", 1, 50),
+                Armor("Набедренная повязка", "Повязка", 0),
+                "Слабый",
+                "Мертв",
+            )
+            controller.player.weapon.hit_chance = 100
+            controller.execute_action("attack")
+        with allure.step("Проверка, что бой выведен одной записью вместе с логом"):
+            assert stream.writes == 3
+            assert "Бой начинается!" in stream.getvalue()
+            assert "Враг повержен!" in stream.getvalue()
+
+
+@allure.feature("Игровой контроллер")
+@allure.story("Кэш меню и таблица действий")
+class TestGameControllerActionMenus:
+    """Тесты заранее построенных меню и диспетчеризации действий"""
+
+    @allure.title("Меню переиспользуется между ходами и сессиями")
+    @allure.description("Проверка, что для одного состояния комнаты возвращается один и тот же объект меню")
+    def test_menu_is_cached(self, dungeon_generator):
+        """Проверка кэширования меню"""
+        first = GameController(dungeon_generator)
+        second = GameController(dungeon_generator)
+        with patch("builtins.print"):
+            first.initialize_game(num_rooms=3, wait_for_start=False)
+            second.initialize_game(num_rooms=3, wait_for_start=False)
+        with allure.step("Сравнение меню стартовых комнат"):
+            assert first.get_available_actions() is second.get_available_actions()
+
+    @allure.title("Меню только для чтения")
+    @allure.description("Проверка, что общее меню нельзя изменить")
+    def test_menu_read_only(self, dungeon_generator):
+        """Проверка защиты меню от изменения"""
+        controller = GameController(dungeon_generator)
+        with patch("builtins.print"):
+            controller.initialize_game(num_rooms=3, wait_for_start=False)
+        actions = controller.get_available_actions()
+        with allure.step("Попытка изменить меню"):
+            with pytest.raises(TypeError):
+                actions[5] = ("exit", "Выйти")
+            with pytest.raises(TypeError):
+                actions.clear()
+            with pytest.raises(TypeError):
+                actions |= {5: ("exit", "Выйти")}
+        assert controller.get_available_actions() is actions and 5 not in actions
+
+    @allure.title("Готовый текст меню")
+    @allure.description("Проверка, что текст кэшированного меню совпадает с форматированием обычного словаря")
+    def test_menu_text_matches_format(self, dungeon_generator):
+        """Проверка текста меню"""
+        controller = GameController(dungeon_generator)
+        with patch("builtins.print"):
+            controller.initialize_game(num_rooms=3, wait_for_start=False)
+        controller.current_position = len(controller.dungeon) - 1
+        actions = controller.get_available_actions()
+        with allure.step("Сравнение текста"):
+            assert controller.format_actions(actions) == controller.format_actions(dict(actions))
+            assert "1. Вернуться назад" in controller.format_actions(actions)
+
+    @allure.title("Неизвестное действие")
+    @allure.description("Проверка, что неизвестное действие не меняет состояние игры")
+    def test_execute_unknown_action(self, dungeon_generator):
+        """Проверка неизвестного действия"""
+        controller = GameController(dungeon_generator)
+        with patch("builtins.print"):
+            controller.initialize_game(num_rooms=3, wait_for_start=False)
+        with allure.step("Выполнение неизвестного действия"):
+            assert controller.execute_action("dance") is True
+        with allure.step("Проверка, что позиция не изменилась"):
+            assert controller.current_position == 0
+            assert controller.running is True
+
+
+@allure.feature("Игровой контроллер")
+@allure.story("Зерно сессии")
+class TestGameControllerSeed:
+    """Тесты детерминированности сессии"""
+
+    @allure.title("Одинаковое зерно — одинаковая игра")
+    @allure.description("Проверка, что две сессии с одним зерном и одинаковыми ходами совпадают")
+    def test_same_seed_same_game(self, dungeon_generator):
+        """Проверка воспроизводимости сессии"""
+        logs = []
+        for _ in range(2):
+            controller = GameController(dungeon_generator)
+            game = controller.play()
+            with patch("builtins.print"):
+                controller.initialize_game(num_rooms=6, wait_for_start=False, seed=2024)
+            frames = [next(game)]
+            while frames[-1][1]:
+                names = [name for name, _ in frames[-1][1].values()]
+                action = next(a for a in ("attack", "forward", "exit") if a in names)
+                frames.append(game.send(action))
+            logs.append([output for output, _ in frames])
+        with allure.step("Сравнение всех экранов двух сессий"):
+            assert logs[0] == logs[1]
+
+    @allure.title("Чередование сессий не меняет игру")
+    @allure.description("Проверка, что сессии с общим ГСЧ потока дают те же экраны при чередовании ходов")
+    def test_interleaved_sessions(self, dungeon_generator):
+        """Проверка сессий с общим ГСЧ"""
+
+        def walkthrough(game):
+            frame = next(game)
+            while frame[1]:
+                names = [name for name, _ in frame[1].values()]
+                yield frame[0]
+                frame = game.send(next(a for a in ("attack", "forward", "exit") if a in names))
+            yield frame[0]
+
+        def sequential(seed):
+            controller = GameController(dungeon_generator, screen=RenderBuffer())
+            with patch("builtins.print"):
+                controller.initialize_game(num_rooms=8, wait_for_start=False, seed=seed)
+            return list(walkthrough(controller.play()))
+
+        expected = {seed: sequential(seed) for seed in (1, 2, 3)}
+        runners = {}
+        for seed in expected:
+            controller = GameController(dungeon_generator, screen=RenderBuffer())
+            with patch("builtins.print"):
+                controller.initialize_game(num_rooms=8, wait_for_start=False, seed=seed)
+            runners[seed] = (walkthrough(controller.play()), [])
+        active = set(expected)
+        while active:
+            for seed in sorted(active):
+                runner, screens = runners[seed]
+                try:
+                    screens.append(next(runner))
+                except StopIteration:
+                    active.discard(seed)
+        assert {seed: screens for seed, (_, screens) in runners.items()} == expected
+
+
+@allure.feature("Игровой контроллер")
+@allure.story("Память сессии")
+class TestGameControllerMemory:
+    """Тесты компактности сессии"""
+
+    @allure.title("Сессия на 5 комнат меньше 2 КБ")
+    @allure.description("Проверка, что сессия хранит только изменяемое состояние, а контент общий")
+    def test_session_memory(self, dungeon_generator):
+        """Проверка размера сессии"""
+        import gc
+        import tracemalloc
+        from src.render import NullRenderBuffer
+
+        def new_session(seed):
+            controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+            controller.initialize_game(5, wait_for_start=False, seed=seed)
+            return controller
+
+        warm = [new_session(seed) for seed in range(5)]
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            sessions = [new_session(seed) for seed in range(500)]
+            gc.collect()
+            per_session = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+        finally:
+            tracemalloc.stop()
+        assert len(warm) == 5
+        assert per_session < 2048
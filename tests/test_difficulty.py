@@ -0,0 +1,105 @@
+"""Тесты для оценки сложности подземелий"""
+import random
+
+import pytest
+import allure
+
+from src.difficulty import (
+    DifficultyTuner,
+    exit_health_distribution,
+    generate_dungeon_for_difficulty,
+    is_winnable,
+    survival_probability,
+)
+from src.entities import Room
+from src.solver import DungeonSolver
+
+
+@allure.feature("Сложность подземелий")
+@allure.story("Вероятность пройти подземелье")
+class TestSurvivalProbability:
+    """Тесты расчёта вероятности прохождения"""
+
+    @allure.title("Подземелье без врагов")
+    @allure.description("Проверка, что без врагов игрок выходит с полным здоровьем")
+    def test_no_enemies(self, sample_player):
+        """Проверка пустого подземелья"""
+        dungeon = [Room("St", ""), Room("Rm", ""), Room("Ex", "")]
+        assert exit_health_distribution(dungeon, sample_player) == {10: 1.0}
+        assert survival_probability(dungeon, sample_player) == 1.0
+
+    @allure.title("Совпадение с оптимальной политикой")
+    @allure.description("Проверка, что свёртка по комнатам даёт тот же результат, что и решатель")
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_solver(self, dungeon_generator, seed):
+        """Сравнение с решателем"""
+        rng = random.Random(seed)
+        dungeon = dungeon_generator.generate_dungeon(rng.randint(3, 20), rng=rng)
+        player = dungeon_generator.create_player(rng)
+        expected = DungeonSolver(dungeon, player).win_probability()
+        assert survival_probability(dungeon, player) == pytest.approx(expected)
+
+    @allure.title("Побеждённые враги не учитываются")
+    @allure.description("Проверка, что уже побеждённый враг не влияет на вероятность")
+    def test_defeated_enemy_ignored(self, sample_player, strong_enemy):
+        """Проверка побеждённого врага"""
+        dungeon = [Room("St", ""), Room("Rm", "", strong_enemy), Room("Ex", "")]
+        assert survival_probability(dungeon, sample_player) == 0.0
+        assert not is_winnable(dungeon, sample_player)
+        strong_enemy.defeat()
+        assert survival_probability(dungeon, sample_player) == 1.0
+        assert is_winnable(dungeon, sample_player)
+
+    @allure.title("Повторный расчёт")
+    @allure.description("Проверка, что расчёт не меняет подземелье и игрока и повторяется с тем же результатом")
+    def test_repeatable(self, dungeon_generator):
+        """Проверка повторного расчёта"""
+        rng = random.Random(0)
+        dungeon = dungeon_generator.generate_dungeon(5, enemy_probability=1.0, rng=rng)
+        player = dungeon_generator.create_player(rng)
+        health = [room.enemy.current_health for room in dungeon if room.enemy is not None]
+        first = survival_probability(dungeon, player)
+        assert 0.0 <= first <= 1.0
+        assert all(survival_probability(dungeon, player) == first for _ in range(10))
+        assert [room.enemy.current_health for room in dungeon if room.enemy is not None] == health
+        assert player.current_health == player.max_health
+
+
+@allure.feature("Сложность подземелий")
+@allure.story("Генерация под заданную сложность")
+class TestDifficultyTuner:
+    """Тесты генерации подземелий с заданным шансом прохождения"""
+
+    @allure.title("Попадание в цель")
+    @allure.description("Проверка, что шанс пройти подземелье лежит в пределах target ± tolerance")
+    @pytest.mark.parametrize("num_rooms,target", [(15, 0.7), (30, 0.5), (60, 0.3)])
+    def test_reaches_target(self, dungeon_generator, num_rooms, target):
+        """Проверка точности"""
+        rng = random.Random(num_rooms)
+        player = dungeon_generator.create_player(rng)
+        dungeon = generate_dungeon_for_difficulty(
+            dungeon_generator, player, target, tolerance=0.05, num_rooms=num_rooms, rng=rng
+        )
+        assert len(dungeon) == num_rooms
+        assert dungeon[0].room_type == "St" and dungeon[-1].room_type == "Ex"
+        assert dungeon[0].enemy is None and dungeon[-1].enemy is None
+        assert survival_probability(dungeon, player) == pytest.approx(target, abs=0.05)
+
+    @allure.title("Недостижимая цель")
+    @allure.description("Проверка, что для слишком короткого подземелья выбрасывается ValueError")
+    def test_unreachable_target(self, dungeon_generator):
+        """Проверка ошибки"""
+        rng = random.Random(0)
+        player = dungeon_generator.create_player(rng)
+        with pytest.raises(ValueError):
+            DifficultyTuner(dungeon_generator, player).generate(0.01, 0.005, num_rooms=3, rng=rng)
+
+    @allure.title("Длинное подземелье")
+    @allure.description("Проверка, что подземелье из 2000 комнат попадает в цель")
+    def test_long_dungeon(self, dungeon_generator):
+        """Проверка длинного подземелья"""
+        rng = random.Random(1)
+        player = dungeon_generator.create_player(rng)
+        dungeon = DifficultyTuner(dungeon_generator, player).generate(0.4, num_rooms=2000, rng=rng)
+        assert len(dungeon) == 2000
+        assert survival_probability(dungeon, player) == pytest.approx(0.4, abs=0.05)
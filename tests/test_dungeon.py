@@ -1,4 +1,6 @@
 """Тесты для генератора подземелья"""
+import random
+
 import pytest
 import allure
 
@@ -255,3 +257,81 @@ class TestDungeonMessages:
         for value in kwargs.values():
             with allure.step(f"Проверка наличия '{value}' в сообщении"):
                 assert str(value) in message
+
+
+@allure.feature("Генератор подземелья")
+@allure.story("Воспроизводимость")
+class TestDungeonReproducibility:
+    """Тесты генерации с собственным источником случайности"""
+
+    @allure.title("Одинаковое зерно — одинаковое подземелье")
+    @allure.description("Проверка, что генерация с одинаково засеянным ГСЧ повторяется")
+    def test_same_seed_same_dungeon(self, dungeon_generator):
+        """Проверка воспроизводимости генерации"""
+        with allure.step("Две генерации с одинаковым зерном"):
+            first = dungeon_generator.generate_dungeon(10, rng=random.Random(1))
+            second = dungeon_generator.generate_dungeon(10, rng=random.Random(1))
+        with allure.step("Сравнение комнат"):
+            assert [repr(room) for room in first] == [repr(room) for room in second]
+            assert [room.description for room in first] == [room.description for room in second]
+
+    @allure.title("Стаи врагов")
+    @allure.description("Проверка, что стаи появляются только по pack_probability и не меняют подземелье без них")
+    def test_packs(self, dungeon_generator):
+        """Проверка генерации стай"""
+        plain = dungeon_generator.generate_dungeon(30, rng=random.Random(4))
+        without = dungeon_generator.generate_dungeon(30, rng=random.Random(4), pack_probability=0.0)
+        assert [repr(room) for room in plain] == [repr(room) for room in without]
+        assert not any(room.pack for room in plain)
+
+        packed = dungeon_generator.generate_dungeon(30, rng=random.Random(4), pack_probability=1.0, max_pack=4)
+        for room in packed:
+            if room.enemy is not None:
+                assert 2 <= len(room.enemies) <= 4
+
+    @allure.title("Создание врага по номеру шаблона")
+    @allure.description("Проверка build_enemy и индекса контента")
+    def test_build_enemy_by_index(self, dungeon_generator):
+        """Проверка создания врага по шаблону"""
+        index = dungeon_generator.content_index()["enemies"]
+        for name, template_index in index.items():
+            with allure.step(f"Шаблон {template_index}: {name}"):
+                assert dungeon_generator.build_enemy(template_index).name == name
+
+    @allure.title("Хэш контента")
+    @allure.description("Проверка, что хэш контента стабилен для одних и тех же данных")
+    def test_content_hash_stable(self, dungeon_generator, data_dir):
+        """Проверка хэша контента"""
+        other = DungeonGenerator(data_dir=data_dir)
+        assert dungeon_generator.content_hash() == other.content_hash()
+        assert len(other.content_hash()) == 64
+
+
+@allure.feature("Генератор подземелья")
+@allure.story("Быстрый запуск")
+class TestDungeonLazyLoading:
+    """Тесты отложенной загрузки данных"""
+
+    @allure.title("enemies.json загружается при первом враге")
+    @allure.description("Проверка, что файл врагов читается только при первом обращении к ним")
+    def test_enemies_loaded_lazily(self, data_dir):
+        """Проверка отложенной загрузки"""
+        generator = DungeonGenerator(data_dir=data_dir)
+        assert set(generator.load_times) == {"player.json", "rooms.json"}
+        generator.create_player()
+        assert "enemies.json" not in generator.load_times
+        enemy = generator.create_enemy()
+        assert enemy.name in generator.content_index()["enemies"]
+        assert "enemies.json" in generator.load_times
+
+    @allure.title("Общий генератор и снаряжение врагов")
+    @allure.description("Проверка, что генератор и снаряжение врагов одного шаблона общие")
+    def test_shared_content(self, data_dir):
+        """Проверка общего контента"""
+        generator = DungeonGenerator.shared(data_dir)
+        assert DungeonGenerator.shared(data_dir) is generator
+        first, second = generator.build_enemy(0), generator.build_enemy(0)
+        assert first.weapon is second.weapon and first.armor is second.armor
+        first.take_damage(1000)
+        assert second.current_health == second.max_health
+        assert generator.create_player().weapon is not generator.create_player().weapon
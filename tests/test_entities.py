@@ -364,3 +364,18 @@ class TestRoom:
             assert room.room_type == room_type
         with allure.step("Проверка описания"):
             assert room.description == description
+
+    @allure.title("Комната со стаей")
+    @allure.description("Проверка, что комната со стаей считается опасной, пока жив хоть один враг")
+    def test_room_with_pack(self, sample_enemy, weak_enemy):
+        """Проверка стаи врагов"""
+        room = Room("Rm", "Логово", sample_enemy, [weak_enemy])
+        assert room.enemies == (sample_enemy, weak_enemy)
+        sample_enemy.defeat()
+        assert room.has_alive_enemy() is True
+        weak_enemy.defeat()
+        assert room.has_alive_enemy() is False
+        with pytest.raises(ValueError):
+            Room("Rm", "Логово", None, [weak_enemy])
+        with pytest.raises(ValueError):
+            Weapon("Сломанный лук", "", 1, 50, speed=0)
@@ -0,0 +1,119 @@
+"""Тесты для журнала событий боя"""
+import random
+
+import pytest
+import allure
+
+from src import events, metrics
+from src.combat import CombatSystem
+from src.entities import Armor, Enemy, Weapon
+from src.events import FightEvent, NameTable, read_events, split_ranges
+
+
+def _sample_events(count: int):
+    rng = random.Random(1)
+    names = ["Крыса", "Скелет", "Очень длинное имя древнего лича"]
+    return [
+        FightEvent(rng.choice(names), rng.random() < 0.5, rng.randint(1, 100), rng.randint(0, 90), rng.randint(0, 90), rng.randint(0, 50))
+        for _ in range(count)
+    ]
+
+
+@allure.feature("События боя")
+@allure.story("Форматы")
+class TestEventFormats:
+    """Тесты записи и чтения событий"""
+
+    @pytest.mark.parametrize("binary", [False, True])
+    @allure.title("Запись и чтение событий")
+    @allure.description("Проверка, что события читаются так же, как записаны, целиком и по диапазонам")
+    def test_roundtrip_and_ranges(self, tmp_path, binary):
+        """Проверка формата"""
+        path = str(tmp_path / ("fights.bin" if binary else "fights.jsonl"))
+        sample = _sample_events(500)
+        writer = events.BinaryWriter(path) if binary else events.JsonLinesWriter(path)
+        with writer:
+            for event in sample:
+                writer.emit(event)
+        assert list(read_events(path)) == sample
+
+        names = NameTable()
+        parts = [list(read_events(path, start, end, names)) for start, end in split_ranges(path, 7)]
+        assert sum(len(part) for part in parts) == len(sample)
+        resolved = [event._replace(enemy=names.resolve(event.enemy)) for part in parts for event in part]
+        assert resolved == sample
+
+    @allure.title("Двоичный формат компактнее")
+    @allure.description("Проверка, что бой занимает 16 байт в двоичном формате")
+    def test_binary_is_compact(self, tmp_path):
+        """Проверка размера записи"""
+        path = tmp_path / "fights.bin"
+        with events.BinaryWriter(str(path)) as writer:
+            for _ in range(100):
+                writer.emit(FightEvent("Крыса", True, 3, 10, 2, 40))
+        assert path.stat().st_size == 16 + 16 + 100 * 16
+
+
+@allure.feature("События боя")
+@allure.story("Запись из CombatSystem")
+class TestEventEmitter:
+    """Тесты записи боёв"""
+
+    @allure.title("Бой записывается с уроном и раундами")
+    @allure.description("Проверка, что включённый журнал записывает итог auto_battle, а выключенный снимает обёртку")
+    def test_emit_fight(self, tmp_path, dungeon_generator, sample_player, weak_enemy):
+        """Проверка записи боя"""
+        original = CombatSystem.auto_battle
+        path = str(tmp_path / "fights.jsonl")
+        events.enable(path)
+        try:
+            combat = CombatSystem(dungeon_generator, random.Random(0))
+            won = combat.auto_battle(sample_player, weak_enemy)
+        finally:
+            writer = events.disable()
+        assert CombatSystem.auto_battle is original and writer.events == 1
+
+        [event] = read_events(path)
+        assert event.enemy == weak_enemy.name and event.won == won
+        assert event.rounds == combat.last_rounds
+        assert event.damage_dealt == weak_enemy.max_health - weak_enemy.current_health
+        assert event.damage_taken == sample_player.max_health - sample_player.current_health
+        assert event.health == sample_player.current_health
+
+    @allure.title("Бой со стаей в журнале и метриках")
+    @allure.description("Проверка, что бой со стаей даёт событие на каждого врага и один бой в метриках, без двойного учёта")
+    def test_pack_fight(self, tmp_path, dungeon_generator, sample_player):
+        """Проверка боя со стаей"""
+        def pack():
+            return [
+                Enemy(name, health, Weapon("Коготь", "", 3, 100), Armor("Шкура", "", 0))
+                for name, health in (("Волк", 20), ("Крыса", 5), ("Паук", 10))
+            ]
+
+        sample_player.max_health = sample_player.current_health = 100
+        path = str(tmp_path / "fights.jsonl")
+        game_metrics = metrics.enable()
+        events.enable(path)
+        try:
+            combat = CombatSystem(dungeon_generator, random.Random(0))
+            health = sample_player.current_health
+            won = combat.pack_battle(sample_player, pack())
+            health_lost = health - sample_player.current_health
+            # Один живой враг: бой идёт через auto_battle и учитывается один раз
+            single = pack()
+            single[0].defeat()
+            single[1].defeat()
+            combat.pack_battle(sample_player, single)
+        finally:
+            events.disable()
+            metrics.disable()
+
+        fights = list(read_events(path))
+        assert [event.enemy for event in fights] == ["Волк", "Крыса", "Паук", "Паук"]
+        assert all(event.won for event in fights[:3]) and won
+        assert [event.damage_dealt for event in fights[:3]] == [20, 5, 10]
+        assert health_lost > 0 and sum(event.damage_taken for event in fights[:3]) == health_lost
+        assert fights[0].rounds == fights[2].rounds
+        assert game_metrics.fights.labels("win").value() + game_metrics.fights.labels("loss").value() == 2
+        assert game_metrics.rounds.count() == 2
+        assert game_metrics.phases.labels("combat").count() == 2
@@ -0,0 +1,144 @@
+"""Тесты для журнала действий и восстановления сессий"""
+import threading
+import time
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.journal import ActionJournal, JournalError, recover_session
+from src.render import NullRenderBuffer
+from src.savegame import save_game
+
+
+def _new_session(generator, seed: int = 11) -> GameController:
+    """Создать сессию без вывода на экран"""
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(8, wait_for_start=False, seed=seed)
+    return controller
+
+
+def _bot_turn(controller: GameController):
+    """Сделать один ход: вперёд-назад по подземелью, сражаясь с врагами"""
+    names = [name for name, _ in controller.get_available_actions().values()]
+    if "attack" in names:
+        action = "attack"
+    elif "forward" in names and controller.turn % 3:
+        action = "forward"
+    else:
+        action = "back" if "back" in names else "forward"
+    controller.execute_action(action)
+
+
+@allure.feature("Журнал действий")
+@allure.story("Восстановление после сбоя")
+class TestActionJournal:
+    """Тесты журнала действий"""
+
+    @allure.title("Восстановление из снапшота и хвоста журнала")
+    @allure.description("Проверка, что восстановленная сессия совпадает с исходной")
+    @pytest.mark.parametrize("turns", [0, 3, 7, 12])
+    def test_recover_after_crash(self, dungeon_generator, tmp_path, turns):
+        """Проверка восстановления после «падения» процесса"""
+        controller = _new_session(dungeon_generator)
+        journal = ActionJournal(str(tmp_path), "s1", snapshot_every=5)
+        journal.attach(controller)
+        with allure.step(f"{turns} ходов"):
+            for _ in range(turns):
+                if controller.running:
+                    _bot_turn(controller)
+        with allure.step("Сбой: журнал сброшен на диск, но не закрыт"):
+            journal.sync()
+        with allure.step("Восстановление"):
+            restored = recover_session(dungeon_generator, str(tmp_path), "s1")
+        with allure.step("Сравнение сохранённых состояний"):
+            assert save_game(restored) == save_game(controller)
+        journal.close()
+
+    @allure.title("Снапшот обнуляет журнал")
+    @allure.description("Проверка, что после снапшота журнал содержит только новые действия")
+    def test_snapshot_truncates_journal(self, dungeon_generator, tmp_path):
+        """Проверка размера журнала после снапшота"""
+        controller = _new_session(dungeon_generator)
+        for room in controller.dungeon:
+            room.enemy = None
+        with ActionJournal(str(tmp_path), "s2", snapshot_every=4) as journal:
+            journal.attach(controller)
+            for _ in range(6):
+                _bot_turn(controller)
+        with allure.step("В журнале только два действия после снапшота"):
+            assert journal.journal_path.stat().st_size == 2 * 5
+        with allure.step("Журнал отписан от контроллера"):
+            assert controller.action_listeners == []
+
+    @allure.title("Недописанная запись")
+    @allure.description("Проверка, что оборванная последняя запись журнала игнорируется")
+    def test_torn_record_ignored(self, dungeon_generator, tmp_path):
+        """Проверка оборванной записи"""
+        controller = _new_session(dungeon_generator)
+        with ActionJournal(str(tmp_path), "s3") as journal:
+            journal.attach(controller)
+            _bot_turn(controller)
+        expected = save_game(controller)
+        with open(journal.journal_path, "ab") as f:
+            f.write(b"\x02\x00")
+        restored = recover_session(dungeon_generator, str(tmp_path), "s3")
+        assert save_game(restored) == expected
+
+    @allure.title("Пропуск в журнале")
+    @allure.description("Проверка ошибки при пропущенном ходе в журнале")
+    def test_gap_in_journal(self, dungeon_generator, tmp_path):
+        """Проверка пропуска хода"""
+        controller = _new_session(dungeon_generator)
+        with ActionJournal(str(tmp_path), "s4") as journal:
+            journal.attach(controller)
+            _bot_turn(controller)
+        with open(journal.journal_path, "ab") as f:
+            f.write(b"\x09\x00\x00\x00\x01")
+        with pytest.raises(JournalError):
+            recover_session(dungeon_generator, str(tmp_path), "s4")
+
+    @allure.title("Хвост журнала сбрасывается без новых действий")
+    @allure.description("Проверка, что после пачки действий хвост попадает на диск фоновым потоком, даже если сессия простаивает")
+    def test_idle_tail_synced(self, dungeon_generator, tmp_path):
+        """Проверка сброса хвоста фоновым потоком"""
+        controller = _new_session(dungeon_generator)
+        journal = ActionJournal(str(tmp_path), "s1", sync_every=1000, sync_interval=0.2)
+        journal.attach(controller)
+        try:
+            for _ in range(3):
+                _bot_turn(controller)
+            with allure.step("Хвост ещё в буфере"):
+                assert journal.journal_path.stat().st_size < 3 * 5
+            with allure.step("Ждём сброса, новых действий нет"):
+                deadline = time.monotonic() + 5
+                while journal.journal_path.stat().st_size < 3 * 5 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            assert journal.journal_path.stat().st_size == 3 * 5
+            restored = recover_session(dungeon_generator, str(tmp_path), "s1")
+            assert save_game(restored) == save_game(controller)
+        finally:
+            journal.close()
+
+    @allure.title("Один поток сброса на все журналы")
+    @allure.description("Проверка, что хвосты многих простаивающих сессий сбрасывает один общий поток")
+    def test_shared_flusher(self, dungeon_generator, tmp_path):
+        """Проверка общего потока сброса"""
+        sessions = [_new_session(dungeon_generator, seed) for seed in range(20)]
+        journals = [
+            ActionJournal(str(tmp_path), f"s{number}", sync_every=1000, sync_interval=0.2)
+            for number in range(len(sessions))
+        ]
+        try:
+            for controller, journal in zip(sessions, journals):
+                journal.attach(controller)
+                _bot_turn(controller)
+            flushers = [thread for thread in threading.enumerate() if thread.name == "journal-flusher"]
+            assert len(flushers) == 1
+            deadline = time.monotonic() + 5
+            while any(j.journal_path.stat().st_size < 5 for j in journals) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert all(journal.journal_path.stat().st_size == 5 for journal in journals)
+        finally:
+            for journal in journals:
+                journal.close()
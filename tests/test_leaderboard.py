@@ -0,0 +1,164 @@
+"""Тесты для таблицы рекордов и истории партий"""
+import sqlite3
+
+import pytest
+import allure
+
+from src.autoplay import AttackPolicy
+from src.controller import GameController
+from src.entities import Armor, Enemy, Room, Weapon
+from src.leaderboard import Leaderboard
+from src.render import NullRenderBuffer
+from src.store import GameStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameStore(str(tmp_path / "game.db"), readers=2)
+    yield store
+    store.close()
+
+
+def _record(store: GameStore, player: str, outcome: str, health: int, killed_by=None):
+    store.record_run(player, outcome, rooms_cleared=3, health=health, fights=1, turns=5, killed_by=killed_by)
+
+
+@allure.feature("Таблица рекордов")
+@allure.story("Запросы")
+class TestLeaderboard:
+    """Тесты запросов по партиям"""
+
+    @allure.title("Лучшие партии, смерти и история")
+    @allure.description("Проверка запросов top, deaths_by_enemy, history и player_totals")
+    def test_queries(self, store):
+        """Проверка запросов"""
+        leaderboard = Leaderboard(store)
+        _record(store, "anna", "exit", 7)
+        _record(store, "boris", "defeat", 0, killed_by="Зомби")
+        _record(store, "anna", "exit", 12)
+        _record(store, "boris", "exit", 9)
+        _record(store, "anna", "defeat", 0, killed_by="Зомби")
+        _record(store, "anna", "defeat", 0, killed_by="Скелет")
+        store.flush()
+
+        assert [(run["player"], run["health"]) for run in leaderboard.top(2)] == [("anna", 12), ("boris", 9)]
+        assert leaderboard.deaths_by_enemy() == {"Зомби": 2, "Скелет": 1}
+        assert [run["outcome"] for run in leaderboard.history("anna", 3)] == ["defeat", "defeat", "exit"]
+        assert leaderboard.player_totals("anna") == {"runs": 4, "wins": 2, "best_health": 12}
+        assert leaderboard.player_totals("nobody") is None
+
+    @allure.title("Пересчёт агрегатов для старой базы")
+    @allure.description("Проверка, что партии, записанные до подключения таблицы рекордов, попадают в агрегаты")
+    def test_rebuild_existing_runs(self, store):
+        """Проверка пересчёта"""
+        _record(store, "vera", "defeat", 0, killed_by="Крыса")
+        _record(store, "vera", "exit", 4)
+        store.flush()
+        leaderboard = Leaderboard(store)
+        assert leaderboard.deaths_by_enemy() == {"Крыса": 1}
+        assert leaderboard.player_totals("vera") == {"runs": 2, "wins": 1, "best_health": 4}
+        Leaderboard(store)
+        assert leaderboard.player_totals("vera")["runs"] == 2
+
+    @allure.title("Запросы идут по индексам")
+    @allure.description("Проверка, что top и history не сканируют таблицу партий целиком")
+    def test_queries_use_indexes(self, store):
+        """Проверка планов запросов"""
+        Leaderboard(store)
+        with sqlite3.connect(store.path) as connection:
+            for query in (
+                "SELECT * FROM runs WHERE outcome = 'exit' ORDER BY health DESC, id LIMIT 10",
+                "SELECT * FROM runs WHERE player = 'anna' ORDER BY id DESC LIMIT 10",
+            ):
+                plan = " ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + query))
+                assert "USING INDEX" in plan and "TEMP B-TREE" not in plan
+
+
+@allure.feature("Таблица рекордов")
+@allure.story("Запись партий")
+class TestTrack:
+    """Тесты записи итогов партий контроллера"""
+
+    @allure.title("Итог партии записывается по её окончании")
+    @allure.description("Проверка, что track() записывает ровно одну партию с итогом, определённым execute_action")
+    def test_track_records_outcome(self, store, dungeon_generator):
+        """Проверка записи итога"""
+        leaderboard = Leaderboard(store)
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(5, wait_for_start=False, seed=3)
+        leaderboard.track(controller, "gleb")
+        policy = AttackPolicy(controller)
+        while controller.execute_action(policy(controller)):
+            pass
+        store.flush()
+
+        [run] = leaderboard.history("gleb")
+        assert run["outcome"] in ("exit", "defeat") and run["seed"] == 3
+        assert run["health"] == controller.player.current_health
+        if run["outcome"] == "defeat":
+            assert leaderboard.deaths_by_enemy() == {run["killed_by"]: 1}
+        else:
+            assert run["rooms_cleared"] == 5 and leaderboard.top(1)[0]["player"] == "gleb"
+
+    @allure.title("64-битное зерно партии")
+    @allure.description("Проверка, что партия со случайным зерном от 2**63 попадает в таблицу рекордов")
+    def test_track_large_seed(self, store, dungeon_generator):
+        """Проверка большого зерна"""
+        leaderboard = Leaderboard(store)
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(5, wait_for_start=False, seed=2**63 + 5)
+        leaderboard.track(controller, "gleb")
+        controller.execute_action("quit")
+        store.flush()
+        [run] = leaderboard.history("gleb")
+        assert run["seed"] == 2**63 + 5 and run["outcome"] == "quit"
+
+
+    @allure.title("Гибель в комнате со стаей")
+    @allure.description("Проверка, что killed_by — враг стаи, нанёсший смертельный удар, а не первый в стае")
+    def test_track_pack_killer(self, store, dungeon_generator):
+        """Проверка виновника гибели в стае"""
+        leaderboard = Leaderboard(store)
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(3, wait_for_start=False, seed=5)
+        slime = Enemy("Слизень", 100, Weapon("Слизь", "", 0, 100, speed=50), Armor("Слизь", "", 0))
+        ogre = Enemy("Огр", 100, Weapon("Дубина", "", 1000, 100), Armor("Шкура", "", 0))
+        controller.dungeon[0] = Room("St", "Засада", slime, [ogre])
+        leaderboard.track(controller, "gleb")
+        controller.execute_action("attack")
+        store.flush()
+        [run] = leaderboard.history("gleb")
+        assert run["outcome"] == "defeat" and run["killed_by"] == "Огр"
+
+
+@allure.feature("Таблица рекордов")
+@allure.story("Старые базы")
+class TestMigration:
+    """Тесты подключения к базе прежней версии"""
+
+    @allure.title("База без колонки killed_by")
+    @allure.description("Проверка, что база первой версии хранилища дополняется колонкой и пересчитывает агрегаты")
+    def test_old_database(self, tmp_path):
+        """Проверка миграции"""
+        path = str(tmp_path / "old.db")
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            """
+            CREATE TABLE runs (
+                id INTEGER PRIMARY KEY, player TEXT NOT NULL, seed INTEGER NOT NULL, outcome TEXT NOT NULL,
+                rooms_cleared INTEGER NOT NULL, health INTEGER NOT NULL, fights INTEGER NOT NULL,
+                turns INTEGER NOT NULL, duration REAL NOT NULL, finished REAL NOT NULL
+            );
+            INSERT INTO runs (player, seed, outcome, rooms_cleared, health, fights, turns, duration, finished)
+                VALUES ('gleb', 1, 'exit', 5, 40, 3, 12, 1.0, 0.0), ('gleb', 2, 'defeat', 2, 0, 1, 4, 1.0, 0.0);
+            """
+        )
+        connection.close()
+
+        with GameStore(path, readers=1) as store:
+            leaderboard = Leaderboard(store)
+            assert leaderboard.player_totals("gleb") == {"runs": 2, "wins": 1, "best_health": 40}
+            _record(store, "gleb", "defeat", 0, killed_by="Крыса")
+            store.flush()
+            assert leaderboard.deaths_by_enemy() == {"Крыса": 1}
+            assert [run["killed_by"] for run in leaderboard.history("gleb")] == ["Крыса", None, None]
@@ -0,0 +1,134 @@
+"""Тесты для метрик времени выполнения"""
+import threading
+import urllib.request
+
+import pytest
+import allure
+
+from src import metrics, tracing
+from src.combat import CombatSystem
+from src.controller import GameController
+from src.metrics import Histogram, Registry, log_linear_buckets
+from src.render import NullRenderBuffer
+
+
+@pytest.fixture
+def game_metrics():
+    """Включённые метрики игры, выключаемые после теста"""
+    yield metrics.enable()
+    metrics.disable()
+
+
+@allure.feature("Метрики")
+@allure.story("Счётчики и гистограммы")
+class TestRegistry:
+    """Тесты реестра метрик"""
+
+    @allure.title("Счётчик из нескольких потоков")
+    @allure.description("Проверка, что приращения из разных потоков суммируются")
+    def test_counter_threads(self):
+        """Проверка потоков"""
+        counter = Registry().counter("hits_total", "Hits")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.value() == 4000
+
+    @allure.title("Квантили гистограммы")
+    @allure.description("Проверка, что квантиль попадает в корзину с ограниченной относительной ошибкой")
+    def test_histogram_quantiles(self):
+        """Проверка квантилей"""
+        histogram = Histogram(log_linear_buckets(1e-6, 1.0))
+        for i in range(1, 1001):
+            histogram.observe(i * 1e-5)
+        assert histogram.count() == 1000
+        assert histogram.quantile(0.5) == pytest.approx(5e-3, rel=0.25)
+        assert histogram.quantile(0.99) == pytest.approx(9.9e-3, rel=0.25)
+        assert Histogram([1, 2]).quantile(0.5) == 0.0
+
+    @allure.title("Формат Prometheus")
+    @allure.description("Проверка текстового формата счётчиков и гистограмм")
+    def test_render(self):
+        """Проверка формата"""
+        registry = Registry()
+        registry.counter("actions_total", "Actions", ["action"]).labels("attack").inc(2)
+        histogram = registry.histogram("rounds", "Rounds", buckets=[1, 5])
+        histogram.observe(3)
+        text = registry.render()
+        assert '# TYPE actions_total counter\nactions_total{action="attack"} 2' in text
+        assert 'rounds_bucket{le="1"} 0' in text
+        assert 'rounds_bucket{le="5"} 1' in text
+        assert 'rounds_bucket{le="+Inf"} 1' in text
+        assert "rounds_sum 3.0" in text and "rounds_count 1" in text
+        with pytest.raises(ValueError):
+            registry.counter("rounds", "Duplicate")
+
+    @allure.title("Запись в файл и HTTP")
+    @allure.description("Проверка вывода метрик в файл и по HTTP на localhost")
+    def test_exposition(self, tmp_path):
+        """Проверка вывода"""
+        registry = Registry()
+        registry.counter("up_total", "Up").inc()
+        path = tmp_path / "game.prom"
+        registry.write_to(str(path))
+        assert "up_total 1" in path.read_text(encoding="utf-8")
+
+        server = registry.serve(port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                assert "up_total 1" in response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+@allure.feature("Метрики")
+@allure.story("Метрики игры")
+class TestGameMetrics:
+    """Тесты метрик игры"""
+
+    @allure.title("Метрики партии")
+    @allure.description("Проверка счётчиков боёв, комнат, действий и гистограмм фаз")
+    def test_game_counts(self, game_metrics, dungeon_generator):
+        """Проверка метрик партии"""
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(6, wait_for_start=False, seed=11)
+        for room in controller.dungeon:
+            room.enemy = None
+        controller.dungeon[1].enemy = dungeon_generator.build_enemy(0)
+        controller.display_room()
+        controller.execute_action("forward")
+        controller.execute_action("attack")
+        controller.execute_action("dance")
+
+        assert game_metrics.rooms.value() == 6
+        assert game_metrics.actions.labels("forward").value() == 1
+        assert game_metrics.actions.labels("attack").value() == 1
+        fights = sum(game_metrics.fights.labels(result).value() for result in ("win", "loss"))
+        assert fights == 1
+        assert game_metrics.rounds.count() == 1
+        for phase in ("generation", "combat", "render"):
+            assert game_metrics.phases.labels(phase).count() > 0
+        assert 'game_actions_total{action="attack"} 1' in game_metrics.render()
+
+    @allure.title("Метрики и трассировка вместе")
+    @allure.description("Проверка, что выключение трассировки не снимает обёртки метрик")
+    def test_independent_layers(self, dungeon_generator):
+        """Проверка независимости обёрток"""
+        original = CombatSystem.__dict__["auto_battle"]
+        game_metrics = metrics.enable()
+        tracing.enable()
+        tracing.disable()
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(4, wait_for_start=False, seed=1)
+        assert game_metrics.rooms.value() == 4
+        metrics.disable()
+        assert CombatSystem.__dict__["auto_battle"] is original
@@ -0,0 +1,94 @@
+"""Тесты для пула заранее сгенерированных игр"""
+import time
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.pool import DungeonPool
+from src.render import NullRenderBuffer
+from src.savegame import save_game
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    """Дождаться выполнения условия фоновым потоком"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the pool"
+        time.sleep(0.001)
+
+
+@allure.feature("Пул игр")
+@allure.story("Заранее сгенерированные подземелья")
+class TestDungeonPool:
+    """Тесты пула игр"""
+
+    @allure.title("Игра из пула совпадает с игрой по зерну")
+    @allure.description("Проверка, что мир из пула совпадает с миром, созданным initialize_game по тому же зерну")
+    def test_pooled_game_matches_seed(self, dungeon_generator):
+        """Проверка воспроизводимости"""
+        pool = DungeonPool(dungeon_generator, num_rooms=6, high_water=3)
+        pool.fill()
+        pooled = GameController(dungeon_generator, screen=NullRenderBuffer(), pool=pool)
+        pooled.initialize_game(6, wait_for_start=False)
+        direct = GameController(dungeon_generator, screen=NullRenderBuffer())
+        direct.initialize_game(6, wait_for_start=False, seed=pooled.seed)
+        assert save_game(pooled) == save_game(direct)
+        assert pool.hits == 1 and len(pool) == 2
+
+    @allure.title("Промах при пустом пуле")
+    @allure.description("Проверка, что при пустом пуле игра создаётся напрямую и промах учитывается")
+    def test_miss_falls_back(self, dungeon_generator):
+        """Проверка промаха"""
+        pool = DungeonPool(dungeon_generator, num_rooms=5, high_water=2)
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer(), pool=pool)
+        controller.initialize_game(5, wait_for_start=False)
+        assert controller.player is not None and len(controller.dungeon) == 5
+        assert pool.stats()["misses"] == 1 and pool.stats()["hits"] == 0
+
+    @allure.title("Явное зерно и другое число комнат")
+    @allure.description("Проверка, что игры с явным зерном или другим размером не берутся из пула")
+    def test_pool_bypassed(self, dungeon_generator):
+        """Проверка обхода пула"""
+        pool = DungeonPool(dungeon_generator, num_rooms=5, high_water=2)
+        pool.fill()
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer(), pool=pool)
+        controller.initialize_game(5, wait_for_start=False, seed=7)
+        controller.initialize_game(8, wait_for_start=False)
+        assert len(pool) == 2 and pool.hits == pool.misses == 0
+
+    @allure.title("Фоновое пополнение")
+    @allure.description("Проверка, что фоновый поток пополняет пул до high_water после выдачи игр")
+    def test_background_refill(self, dungeon_generator):
+        """Проверка фонового потока"""
+        with DungeonPool(dungeon_generator, high_water=4, low_water=2) as pool:
+            _wait_for(lambda: len(pool) == 4)
+            seeds = {pool.take().seed for _ in range(3)}
+            _wait_for(lambda: len(pool) == 4)
+        stats = pool.stats()
+        assert len(seeds) == 3
+        assert stats["hits"] == 3 and stats["generated"] == 7
+        assert 0 < stats["refill_time_mean"] <= stats["refill_time_max"]
+
+    @allure.title("Своя фабрика мира")
+    @allure.description("Проверка, что пул использует переданную фабрику и передаёт ей зерно")
+    def test_custom_factory(self, dungeon_generator):
+        """Проверка фабрики"""
+        calls = []
+
+        def factory(generator, seed, num_rooms):
+            calls.append(seed)
+            return generator.create_player(), generator.generate_dungeon(num_rooms, enemy_probability=0.0)
+
+        pool = DungeonPool(dungeon_generator, num_rooms=4, high_water=1, factory=factory)
+        pool.fill()
+        entry = pool.take()
+        assert calls == [entry.seed]
+        assert not any(room.has_alive_enemy() for room in entry.dungeon)
+
+    @allure.title("Некорректный размер пула")
+    @allure.description("Проверка, что high_water меньше 1 отклоняется")
+    def test_invalid_high_water(self, dungeon_generator):
+        """Проверка ошибки"""
+        with pytest.raises(ValueError):
+            DungeonPool(dungeon_generator, high_water=0)
@@ -0,0 +1,146 @@
+"""Тесты для протокола JSON Lines для ботов"""
+import json
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.protocol import BotSession, encode, menu_items, room_state
+from src.render import NullRenderBuffer
+
+
+@pytest.fixture
+def session(dungeon_generator) -> BotSession:
+    """Сессия бота в начале игры на 4 комнаты"""
+    session = BotSession(GameController(dungeon_generator))
+    session.controller.initialize_game(num_rooms=4, wait_for_start=False, seed=7)
+    return session
+
+
+def _winning_actions(session: BotSession):
+    """Ходы жадного бота до конца игры (по меню и состоянию)"""
+    while session.controller.running:
+        names = [item["action"] for item in menu_items(session.controller.get_available_actions())]
+        action = next(name for name in ("attack", "exit", "forward") if name in names)
+        yield action
+        session.execute([action])
+
+
+@allure.feature("Протокол для ботов")
+@allure.story("Состояние и меню")
+class TestState:
+    """Тесты структурированного состояния"""
+
+    @allure.title("Состояние комнаты")
+    @allure.description("Проверка полей состояния: ход, комната, враги и здоровье игрока")
+    def test_room_state(self, session):
+        """Проверка состояния"""
+        state = room_state(session.controller)
+        assert state["turn"] == 0 and state["room"] == 0 and state["rooms"] == 4
+        assert state["type"] == "St"
+        assert state["player"]["health"] == session.controller.player.current_health
+        assert all(set(enemy) == {"name", "health", "max_health", "defeated"} for enemy in state["enemies"])
+
+    @allure.title("Меню действий")
+    @allure.description("Проверка, что меню совпадает с get_available_actions и строится один раз")
+    def test_menu_items(self, session):
+        """Проверка меню"""
+        actions = session.controller.get_available_actions()
+        items = menu_items(actions)
+        assert [(item["id"], item["action"], item["label"]) for item in items] == [
+            (num, name, label) for num, (name, label) in actions.items()
+        ]
+        assert menu_items(actions) is items
+
+    @allure.title("Сессия без экранов")
+    @allure.description("Проверка, что сессия бота не собирает экраны и лог боя")
+    def test_no_text(self, session):
+        """Проверка отключённого текста"""
+        assert isinstance(session.controller.screen, NullRenderBuffer)
+        assert session.controller.combat_system.log_enabled is False
+
+
+@allure.feature("Протокол для ботов")
+@allure.story("Пакеты ходов")
+class TestPipelining:
+    """Тесты выполнения пакетов ходов"""
+
+    @allure.title("Пакет выполняется подряд")
+    @allure.description("Проверка, что несколько ходов одного запроса дают один ответ с итогами каждого")
+    def test_batch(self, session, dungeon_generator):
+        """Проверка пакета"""
+        reference = BotSession(GameController(dungeon_generator))
+        reference.controller.initialize_game(num_rooms=4, wait_for_start=False, seed=7)
+        actions = list(_winning_actions(reference))
+        message = session.handle(json.dumps({"id": 3, "actions": actions}))
+        assert message["id"] == 3
+        assert [result["action"] for result in message["results"]] == actions
+        assert all(result["ok"] for result in message["results"])
+        assert message["done"] is True and message["actions"] == []
+        assert message["state"] == room_state(reference.controller)
+
+    @allure.title("Номер пункта меню и одиночный ход")
+    @allure.description("Проверка хода по номеру пункта и запроса вида {\"action\": ...}")
+    def test_single_action(self, session):
+        """Проверка одиночного хода"""
+        message = session.handle('{"action": 1}')
+        assert message["results"] == [{"action": "forward", "ok": True}]
+        assert message["state"]["room"] == 1
+        assert message["done"] is False and message["actions"]
+
+    @allure.title("Недопустимый ход прерывает пакет")
+    @allure.description("Проверка, что ходы после недопустимого пропускаются, а состояние не меняется")
+    def test_invalid_action_stops_batch(self, session):
+        """Проверка прерывания пакета"""
+        message = session.handle('{"actions": ["back", "forward"]}')
+        assert message["results"] == [
+            {"action": "back", "ok": False, "error": "invalid action"},
+            {"action": "forward", "ok": False, "error": "skipped"},
+        ]
+        assert message["state"]["room"] == 0 and message["state"]["turn"] == 0
+
+    @allure.title("Не десятичные цифры")
+    @allure.description("Проверка, что ход вида \"²\" — недопустимый ход, а не ошибка сессии")
+    @pytest.mark.parametrize("choice", ["²", "①"])
+    def test_non_decimal_digit(self, session, choice):
+        """Проверка символов-цифр Юникода"""
+        message = session.handle(json.dumps({"action": choice}))
+        assert message["results"] == [{"action": choice, "ok": False, "error": "invalid action"}]
+        assert message["state"]["turn"] == 0
+
+    @allure.title("Ошибки запроса")
+    @allure.description("Проверка ответов на испорченный JSON и запрос без ходов")
+    @pytest.mark.parametrize(
+        "line, error",
+        [
+            ("not json", "invalid JSON"),
+            ("[1, 2]", "request must be a JSON object"),
+            ('{"id": 1}', "request has no actions"),
+            ('{"actions": [null]}', "actions must be a list of names or menu numbers"),
+        ],
+    )
+    def test_bad_request(self, session, line, error):
+        """Проверка ошибок запроса"""
+        message = session.handle(line)
+        assert message["error"] == error
+        assert message["done"] is False and message["actions"]
+
+
+@allure.feature("Протокол для ботов")
+@allure.story("Генератор сессии")
+class TestPlay:
+    """Тесты генератора play()"""
+
+    @allure.title("Контракт GameController.play()")
+    @allure.description("Проверка, что play() отдаёт строки JSON и пустое меню в конце игры")
+    def test_play(self, dungeon_generator):
+        """Проверка генератора"""
+        session = BotSession(GameController(dungeon_generator))
+        game = session.play(num_rooms=3, seed=11)
+        line, actions = next(game)
+        first = json.loads(line)
+        assert first["state"]["rooms"] == 3 and actions
+        line, actions = game.send('{"action": "quit"}')
+        last = json.loads(line)
+        assert last["done"] is True and actions == {}
+        assert encode(last) == line
@@ -0,0 +1,60 @@
+"""Тесты для буферизованного вывода экранов"""
+import pytest
+import allure
+
+from src.render import RenderBuffer, get_separator, SEPARATOR_WIDTH
+
+
+@allure.feature("Вывод экранов")
+@allure.story("Буфер экрана")
+class TestRenderBuffer:
+    """Тесты буфера экрана"""
+
+    @allure.title("Экран выводится одной записью")
+    @allure.description("Проверка, что flush() пишет весь накопленный экран одним вызовом write")
+    def test_flush_single_write(self, counting_stream):
+        """Проверка единственной записи"""
+        stream = counting_stream
+        screen = RenderBuffer(stream)
+        with allure.step("Сборка экрана из нескольких строк"):
+            screen.separator(blank_before=True)
+            screen.line("Комната 1 из 5")
+            screen.separator()
+            screen.lines(["a", "b"])
+        with allure.step("Вывод экрана"):
+            written = screen.flush()
+        with allure.step("Проверка одной записи и содержимого"):
+            assert stream.writes == 1
+            assert stream.getvalue() == "\n" + "=" * 70 + "\nКомната 1 из 5\n" + "=" * 70 + "\na\nb\n"
+            assert written == len(stream.getvalue())
+        with allure.step("Проверка очистки буфера"):
+            assert len(screen) == 0
+            assert screen.flush() == 0
+
+    @allure.title("Бинарный режим")
+    @allure.description("Проверка вывода заранее закодированных UTF-8 фрагментов в stream.buffer")
+    def test_binary_mode(self, counting_stream):
+        """Проверка бинарного режима"""
+        stream = counting_stream
+        screen = RenderBuffer(stream, binary=True)
+        screen.separator()
+        screen.line("Привет")
+        with allure.step("Проверка текстового и байтового представлений"):
+            assert screen.getvalue() == "=" * 70 + "\nПривет\n"
+            assert screen.getbytes() == screen.getvalue().encode("utf-8")
+        screen.flush()
+        with allure.step("Проверка записи в бинарный поток"):
+            assert stream.buffer.getvalue() == ("=" * 70 + "\nПривет\n").encode("utf-8")
+            assert stream.writes == 0
+
+    @allure.title("Разделители кэшируются")
+    @allure.description("Проверка, что разделитель собирается и кодируется один раз")
+    @pytest.mark.parametrize("encoded", [False, True])
+    def test_separator_cached(self, encoded):
+        """Проверка кэша разделителей"""
+        first = get_separator("=", SEPARATOR_WIDTH, True, encoded)
+        second = get_separator("=", SEPARATOR_WIDTH, True, encoded)
+        with allure.step("Проверка, что возвращается тот же объект"):
+            assert first is second
+        with allure.step("Проверка типа"):
+            assert isinstance(first, bytes if encoded else str)
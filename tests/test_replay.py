@@ -0,0 +1,101 @@
+"""Тесты для записи и воспроизведения повторов"""
+import pytest
+import allure
+
+from src.controller import GameController
+from src.render import NullRenderBuffer, RenderBuffer
+from src.replay import Replay, ReplayError, ReplayRecorder, bisect_replay, run_replay
+from src.savegame import save_game
+
+
+def _record_session(generator, seed: int = 5, num_rooms: int = 6):
+    """Сыграть сессию простым ботом с записью повтора"""
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+    recorder = ReplayRecorder(controller)
+    while controller.running:
+        names = [name for name, _ in controller.get_available_actions().values()]
+        action = next(a for a in ("attack", "forward", "exit") if a in names)
+        if controller.turn == 1 and "back" in names:
+            action = "back"
+        if not controller.execute_action(action):
+            controller.running = False
+    return controller, recorder.stop()
+
+
+@allure.feature("Повторы")
+@allure.story("Запись и воспроизведение")
+class TestReplay:
+    """Тесты повторов"""
+
+    @allure.title("Повтор воспроизводит сессию")
+    @allure.description("Проверка, что воспроизведение даёт то же состояние, что и исходная игра")
+    @pytest.mark.parametrize("seed", [1, 2, 3, 4])
+    def test_replay_reproduces_session(self, dungeon_generator, seed):
+        """Проверка совпадения состояния"""
+        controller, replay = _record_session(dungeon_generator, seed=seed)
+        with allure.step("Сериализация и чтение повтора"):
+            replay = Replay.from_json(replay.to_json())
+        with allure.step("Воспроизведение"):
+            replayed = run_replay(dungeon_generator, replay)
+        with allure.step("Сравнение состояний"):
+            assert save_game(replayed) == save_game(controller)
+
+    @allure.title("Остановка на заданном ходу")
+    @allure.description("Проверка, что воспроизведение останавливается после хода stop_at_turn")
+    def test_stop_at_turn(self, dungeon_generator):
+        """Проверка частичного воспроизведения"""
+        _, replay = _record_session(dungeon_generator)
+        controller = run_replay(dungeon_generator, replay, stop_at_turn=2)
+        assert controller.turn == 2
+
+    @allure.title("Вывод начиная с заданного хода")
+    @allure.description("Проверка, что экраны выводятся только начиная с render_from_turn")
+    def test_render_from_turn(self, dungeon_generator, counting_stream):
+        """Проверка вывода с заданного хода"""
+        _, replay = _record_session(dungeon_generator)
+        run_replay(
+            dungeon_generator,
+            replay,
+            render_from_turn=len(replay),
+            screen=RenderBuffer(counting_stream),
+        )
+        with allure.step("Проверка вывода только последнего хода"):
+            output = counting_stream.getvalue()
+            assert "Добро пожаловать" not in output
+            assert f"Комната {replay.num_rooms} из {replay.num_rooms}" in output
+            assert "Поздравляем" in output or "Игра окончена" in output
+
+    @allure.title("Поиск хода бисекцией")
+    @allure.description("Проверка поиска первого хода, на котором выполняется условие")
+    def test_bisect(self, dungeon_generator):
+        """Проверка бисекции по ходам"""
+        controller, replay = _record_session(dungeon_generator, seed=3)
+        with allure.step("Первый ход, на котором игрок добрался до выхода"):
+            turn = bisect_replay(
+                dungeon_generator, replay, lambda c: c.current_position == replay.num_rooms - 1
+            )
+        if controller.current_position == replay.num_rooms - 1:
+            assert run_replay(dungeon_generator, replay, stop_at_turn=turn).current_position == replay.num_rooms - 1
+            assert run_replay(dungeon_generator, replay, stop_at_turn=turn - 1).current_position < replay.num_rooms - 1
+        with allure.step("Недостижимое условие"):
+            assert bisect_replay(dungeon_generator, replay, lambda c: c.turn > 10_000) is None
+
+    @allure.title("Запись не с начала игры")
+    @allure.description("Проверка, что запись можно начать только сразу после инициализации")
+    def test_recorder_requires_fresh_game(self, dungeon_generator):
+        """Проверка начала записи"""
+        controller = GameController(dungeon_generator, screen=NullRenderBuffer())
+        controller.initialize_game(3, wait_for_start=False)
+        controller.execute_action("forward")
+        with pytest.raises(ReplayError):
+            ReplayRecorder(controller)
+
+    @allure.title("Другой контент")
+    @allure.description("Проверка отказа воспроизводить повтор с другим набором данных")
+    def test_content_mismatch(self, dungeon_generator):
+        """Проверка отпечатка контента"""
+        _, replay = _record_session(dungeon_generator)
+        replay.content_hash = "0" * 64
+        with pytest.raises(ReplayError):
+            run_replay(dungeon_generator, replay)
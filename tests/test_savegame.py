@@ -0,0 +1,184 @@
+"""Тесты для сохранения и загрузки игровых сессий"""
+import struct
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.entities import Weapon, Armor, Enemy
+from src.render import NullRenderBuffer
+from src.savegame import (
+    SAVE_MAGIC,
+    SaveFormatError,
+    load_from_file,
+    load_game,
+    save_game,
+    save_to_file,
+)
+
+
+def _new_session(generator, num_rooms: int = 5, seed: int = 42) -> GameController:
+    """Создать сессию без вывода на экран"""
+    controller = GameController(generator, screen=NullRenderBuffer())
+    controller.initialize_game(num_rooms, wait_for_start=False, seed=seed)
+    return controller
+
+
+def _snapshot(controller: GameController) -> tuple:
+    """Состояние сессии в виде сравнимого кортежа"""
+    player = controller.player
+    rooms = tuple(
+        (
+            room.room_type,
+            room.description,
+            room.visited,
+            room.enemy and (room.enemy.name, room.enemy.current_health, room.enemy.defeated),
+            tuple((enemy.name, enemy.current_health, enemy.defeated) for enemy in room.pack),
+        )
+        for room in controller.dungeon
+    )
+    return (
+        player.name,
+        player.description,
+        player.current_health,
+        player.max_health,
+        controller.seed,
+        controller.turn,
+        controller.current_position,
+        controller.running,
+        rooms,
+    )
+
+
+def _play(controller: GameController, turns: int):
+    """Сделать несколько ходов простым ботом"""
+    for _ in range(turns):
+        if not controller.running:
+            return
+        names = [name for name, _ in controller.get_available_actions().values()]
+        action = next(a for a in ("attack", "forward", "exit", "back") if a in names)
+        if not controller.execute_action(action):
+            controller.running = False
+
+
+@allure.feature("Сохранения")
+@allure.story("Сохранение и загрузка")
+class TestSaveGameRoundTrip:
+    """Тесты сохранения и загрузки"""
+
+    @allure.title("Сохранение и загрузка восстанавливают состояние")
+    @allure.description("Проверка, что после загрузки состояние сессии совпадает с исходным")
+    @pytest.mark.parametrize("turns", [0, 2, 4])
+    def test_round_trip(self, dungeon_generator, turns):
+        """Проверка восстановления состояния"""
+        controller = _new_session(dungeon_generator)
+        _play(controller, turns)
+        controller.get_current_room().mark_visited()
+        with allure.step("Сохранение и загрузка"):
+            restored = load_game(dungeon_generator, save_game(controller))
+        with allure.step("Сравнение состояний"):
+            assert _snapshot(restored) == _snapshot(controller)
+
+    @allure.title("Компактность сохранения")
+    @allure.description("Проверка, что сохранение 5 комнат занимает меньше 200 байт")
+    def test_save_is_compact(self, dungeon_generator):
+        """Проверка размера сохранения"""
+        data = save_game(_new_session(dungeon_generator, num_rooms=5))
+        with allure.step(f"Размер сохранения: {len(data)} байт"):
+            assert data.startswith(SAVE_MAGIC)
+            assert len(data) < 200
+
+    @allure.title("Продолжение после загрузки детерминировано")
+    @allure.description("Проверка, что загруженная сессия продолжает игру так же, как исходная")
+    def test_continuation_is_deterministic(self, dungeon_generator):
+        """Проверка совпадения дальнейшей игры"""
+        controller = _new_session(dungeon_generator, seed=7)
+        _play(controller, 1)
+        restored = load_game(dungeon_generator, save_game(controller), NullRenderBuffer())
+        with allure.step("Одинаковые ходы в обеих сессиях"):
+            _play(controller, 10)
+            _play(restored, 10)
+        with allure.step("Сравнение состояний"):
+            assert _snapshot(restored) == _snapshot(controller)
+
+    @allure.title("Сохранение подземелья со стаями")
+    @allure.description("Проверка, что стаи врагов сохраняются, а игра со стаями продолжается одинаково")
+    def test_round_trip_with_packs(self, dungeon_generator):
+        """Проверка сохранения стай"""
+        controller = _new_session(dungeon_generator, num_rooms=8, seed=5)
+        controller.dungeon = dungeon_generator.generate_dungeon(8, rng=controller.rng, pack_probability=1.0)
+        assert any(room.pack for room in controller.dungeon)
+        _play(controller, 3)
+        restored = load_game(dungeon_generator, save_game(controller), NullRenderBuffer())
+        assert _snapshot(restored) == _snapshot(controller)
+        _play(controller, 10)
+        _play(restored, 10)
+        assert _snapshot(restored) == _snapshot(controller)
+
+    @allure.title("Сохранение прежней версии")
+    @allure.description("Проверка, что сохранения версии 1 (без стай) по-прежнему загружаются")
+    def test_version_1_still_loads(self, dungeon_generator):
+        """Проверка обратной совместимости"""
+        controller = _new_session(dungeon_generator)
+        data = save_game(controller)
+        restored = load_game(dungeon_generator, data[:4] + bytes([1]) + data[5:])
+        assert _snapshot(restored) == _snapshot(controller)
+
+    @allure.title("Сохранение в файл")
+    @allure.description("Проверка записи и чтения сохранения из файла")
+    def test_file_round_trip(self, dungeon_generator, tmp_path):
+        """Проверка файлового сохранения"""
+        controller = _new_session(dungeon_generator)
+        path = tmp_path / "session.sav"
+        save_to_file(controller, str(path))
+        restored = load_from_file(dungeon_generator, str(path))
+        assert _snapshot(restored) == _snapshot(controller)
+
+
+@allure.feature("Сохранения")
+@allure.story("Ошибки формата")
+class TestSaveGameErrors:
+    """Тесты обработки некорректных сохранений"""
+
+    @allure.title("Повреждённые данные")
+    @allure.description("Проверка отказа при неверной сигнатуре, версии, обрезанных данных, позиции вне подземелья и лишних байтах")
+    @pytest.mark.parametrize(
+        "corrupt",
+        [
+            lambda data: b"XXXX" + data[4:],
+            lambda data: data[:4] + bytes([99]) + data[5:],
+            lambda data: data[:10],
+            lambda data: data[:-3],
+            lambda data: data[:21] + struct.pack("<I", 5) + data[25:],
+            lambda data: data + b"\x00",
+        ],
+        ids=["magic", "version", "header", "rooms", "position", "trailing"],
+    )
+    def test_corrupted_save(self, dungeon_generator, corrupt):
+        """Проверка повреждённых сохранений"""
+        data = save_game(_new_session(dungeon_generator))
+        with pytest.raises(SaveFormatError):
+            load_game(dungeon_generator, corrupt(data))
+
+    @allure.title("Другой контент")
+    @allure.description("Проверка отказа при загрузке сохранения с другим набором данных")
+    def test_content_mismatch(self, dungeon_generator, data_dir):
+        """Проверка отпечатка контента"""
+        from src.dungeon import DungeonGenerator
+
+        data = save_game(_new_session(dungeon_generator))
+        other = DungeonGenerator(data_dir=data_dir)
+        other.rooms_data = dict(other.rooms_data, descriptions=["Другая комната"])
+        with pytest.raises(SaveFormatError):
+            load_game(other, data)
+
+    @allure.title("Враг вне контента")
+    @allure.description("Проверка, что врага, которого нет в enemies.json, сохранить нельзя")
+    def test_unknown_enemy(self, dungeon_generator):
+        """Проверка сохранения неизвестного врага"""
+        controller = _new_session(dungeon_generator)
+        controller.dungeon[1].enemy = Enemy(
+            "Дракон", 100, Weapon("Пламя", "Огонь", 50, 100), Armor("Чешуя", "Чешуя", 10)
+        )
+        with pytest.raises(SaveFormatError):
+            save_game(controller)
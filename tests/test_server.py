@@ -0,0 +1,185 @@
+"""Тесты для сетевого сервера игры"""
+import json
+import os
+import signal
+import socket
+import threading
+import time
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.server import MAX_LINE, PROMPT, PreforkServer, Worker
+
+
+def _read_screen(sock: socket.socket) -> str:
+    """Прочитать экран до приглашения или до закрытия соединения"""
+    data = b""
+    while not data.endswith(PROMPT.encode("utf-8")):
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode("utf-8")
+
+
+def _play(address) -> str:
+    """Сыграть партию простым клиентом и вернуть последний экран"""
+    with socket.create_connection(address, timeout=5) as sock:
+        screen = _read_screen(sock)
+        while screen.endswith(PROMPT):
+            menu = screen[screen.rindex("Вы можете:"):]
+            action = next(a for a, text in (("attack", "Атаковать"), ("exit", "Выйти"), ("forward", "Пойти дальше")) if text in menu)
+            sock.sendall(f"{action}\n".encode("utf-8"))
+            screen = _read_screen(sock)
+        return screen
+
+
+def _read_messages(sock: socket.socket, count: int) -> list:
+    """Прочитать count строк протокола JSON Lines"""
+    data = b""
+    while data.count(b"\n") < count:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return [json.loads(line) for line in data.splitlines()]
+
+
+@pytest.fixture
+def worker(request, dungeon_generator):
+    """Работник, обслуживающий клиентов в отдельном потоке (протокол — параметр фикстуры)"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    worker = Worker(listener, dungeon_generator, num_rooms=4, protocol=getattr(request, "param", "text"))
+    thread = threading.Thread(target=worker.serve, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield worker
+    worker.running = False
+    thread.join(5)
+    listener.close()
+
+
+@allure.feature("Сервер")
+@allure.story("Работник")
+class TestWorker:
+    """Тесты обслуживания сессий"""
+
+    @allure.title("Полная партия по сети")
+    @allure.description("Проверка, что клиент доигрывает партию до финального экрана")
+    def test_full_game(self, worker):
+        """Проверка партии"""
+        final = _play(worker.listener.getsockname())
+        assert "Поздравляем" in final or "Игра окончена" in final
+        assert worker.sessions_started == 1
+
+    @allure.title("Несколько клиентов одновременно")
+    @allure.description("Проверка, что один работник ведёт несколько сессий параллельно")
+    def test_concurrent_sessions(self, worker):
+        """Проверка параллельных сессий"""
+        address = worker.listener.getsockname()
+        clients = [socket.create_connection(address, timeout=5) for _ in range(3)]
+        try:
+            screens = [_read_screen(client) for client in clients]
+            assert all("Добро пожаловать" in screen for screen in screens)
+            assert len(worker) == 3
+            clients[1].sendall(b"42\n")
+            assert "Неверный выбор" in _read_screen(clients[1])
+        finally:
+            for client in clients:
+                client.close()
+
+
+    @allure.title("Ошибка одной сессии не затрагивает другие")
+    @allure.description("Проверка, что исключение в игре закрывает только его соединение, а работник продолжает обслуживать остальных")
+    def test_session_error_isolated(self, worker, monkeypatch):
+        """Проверка изоляции ошибок сессий"""
+        resolve = GameController._resolve_choice
+
+        def failing_resolve(controller, choice, actions):
+            if choice == "boom":
+                raise RuntimeError("session bug")
+            return resolve(controller, choice, actions)
+
+        monkeypatch.setattr(GameController, "_resolve_choice", failing_resolve)
+        address = worker.listener.getsockname()
+        with socket.create_connection(address, timeout=5) as bad, socket.create_connection(address, timeout=5) as good:
+            _read_screen(bad)
+            _read_screen(good)
+            bad.sendall(b"boom\n")
+            assert "Внутренняя ошибка игры" in _read_screen(bad)
+            assert bad.recv(1) == b""
+            good.sendall(b"forward\n")
+            assert "Комната 2 из 4" in _read_screen(good)
+        assert worker.running and worker.sessions_failed == 1
+
+    @allure.title("Протокол JSON Lines с пакетами ходов")
+    @allure.description("Проверка, что запросы, пришедшие одним пакетом, выполняются подряд и получают ответы")
+    @pytest.mark.parametrize("worker", ["ndjson"], indirect=True)
+    def test_ndjson_pipelining(self, worker):
+        """Проверка протокола для ботов"""
+        with socket.create_connection(worker.listener.getsockname(), timeout=5) as sock:
+            (greeting,) = _read_messages(sock, 1)
+            assert greeting["state"]["room"] == 0 and greeting["actions"][0]["action"] == "forward"
+            sock.sendall(b'{"id": 1, "action": "forward"}\n{"id": 2, "actions": ["back", "forward"]}\n')
+            first, second = _read_messages(sock, 2)
+            assert first["id"] == 1 and first["state"]["room"] == 1
+            assert second["id"] == 2 and [r["ok"] for r in second["results"]] == [True, True]
+            assert second["state"]["room"] == 1
+            sock.sendall(b'{"action": "quit"}\n')
+            (last,) = _read_messages(sock, 1)
+            assert last["done"] is True
+            assert sock.recv(1) == b""
+
+    @allure.title("Длинный пакет ходов")
+    @allure.description("Проверка, что пакет из сотен ходов выполняется, а слишком длинная строка получает ошибку после готовых ответов")
+    @pytest.mark.parametrize("worker", ["ndjson"], indirect=True)
+    def test_ndjson_long_batch(self, worker):
+        """Проверка длинных запросов"""
+        with socket.create_connection(worker.listener.getsockname(), timeout=5) as sock:
+            _read_messages(sock, 1)
+            batch = json.dumps({"actions": ["forward", "back"] * 100}).encode("utf-8")
+            assert len(batch) > 1024
+            sock.sendall(batch + b"\n")
+            (message,) = _read_messages(sock, 1)
+            assert len(message["results"]) == 200 and all(result["ok"] for result in message["results"])
+            oversized = b'{"actions": ["' + b"x" * MAX_LINE["ndjson"] + b'"]}\n'
+            sock.sendall(b'{"id": 7, "action": "forward"}\n' + oversized)
+            answered, error = _read_messages(sock, 2)
+            assert answered["id"] == 7 and answered["results"][0]["ok"]
+            assert error == {"error": "request too long", "done": True}
+            assert sock.recv(1) == b""
+
+    @allure.title("Неизвестный протокол")
+    @allure.description("Проверка, что работник не создаётся с неизвестным протоколом")
+    def test_unknown_protocol(self, dungeon_generator):
+        """Проверка имени протокола"""
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            with pytest.raises(ValueError):
+                Worker(listener, dungeon_generator, protocol="xml")
+
+
+@allure.feature("Сервер")
+@allure.story("Пре-форк")
+class TestPreforkServer:
+    """Тесты родительского процесса"""
+
+    @allure.title("Работники обслуживают клиентов и перезапускаются")
+    @allure.description("Проверка, что упавший работник перезапускается, а сервер продолжает работать")
+    def test_workers_restarted(self, data_dir):
+        """Проверка перезапуска работника"""
+        server = PreforkServer(data_dir=data_dir, workers=2, num_rooms=3)
+        server.start()
+        try:
+            assert len(server.pids) == 2
+            assert _play(server.address)
+            os.kill(server.pids[0], signal.SIGKILL)
+            deadline = time.monotonic() + 5
+            while server.check_workers() == 0:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            assert server.restarts == 1 and len(server.pids) == 2
+            assert _play(server.address)
+        finally:
+            server.stop()
+        assert server.pids == []
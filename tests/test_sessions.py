@@ -0,0 +1,96 @@
+"""Тесты для менеджера сессий с вытеснением на диск"""
+import pytest
+import allure
+
+from src.controller import GameController
+from src.render import NullRenderBuffer
+from src.savegame import save_game
+from src.sessions import SessionManager, SessionNotFound
+
+
+class FakeClock:
+    """Управляемые часы для проверки простоя"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def manager(dungeon_generator, tmp_path, clock) -> SessionManager:
+    """Менеджер, держащий в памяти не больше двух сессий"""
+    return SessionManager(dungeon_generator, str(tmp_path), max_resident=2, idle_timeout=60, clock=clock)
+
+
+@allure.feature("Сессии")
+@allure.story("Вытеснение и загрузка")
+class TestSessionManager:
+    """Тесты менеджера сессий"""
+
+    @allure.title("Вытеснение по бюджету в порядке LRU")
+    @allure.description("Проверка, что сверх бюджета на диск уходит давно не использованная сессия")
+    def test_lru_eviction(self, manager, tmp_path):
+        """Проверка порядка вытеснения"""
+        first = manager.create(seed=1)
+        second = manager.create(seed=2)
+        manager.get(first)
+        third = manager.create(seed=3)
+        assert manager.resident == 2 and len(manager) == 3
+        assert (tmp_path / f"{second}.sav").exists()
+        assert not (tmp_path / f"{first}.sav").exists()
+        assert manager.evictions == 1 and third in manager
+
+    @allure.title("Прозрачная загрузка сессии")
+    @allure.description("Проверка, что вытесненная сессия продолжается так же, как невытесненная")
+    def test_rehydration_is_transparent(self, manager, dungeon_generator):
+        """Проверка совпадения состояния после загрузки"""
+        session = manager.create(seed=7)
+        reference = GameController(dungeon_generator, screen=NullRenderBuffer())
+        reference.initialize_game(5, wait_for_start=False, seed=7)
+        for action in ("attack", "forward"):
+            manager.execute(session, action)
+            reference.execute_action(action)
+        manager.create(seed=8)
+        manager.create(seed=9)
+        assert manager.resident == 2 and manager.stats()["evicted"] == 1
+
+        manager.execute(session, "attack")
+        reference.execute_action("attack")
+        assert save_game(manager.get(session)) == save_game(reference)
+        stats = manager.stats()
+        assert stats["rehydrations"] == 1 and stats["evictions"] == 2
+        assert stats["rehydrate_time_max"] > 0
+
+    @allure.title("Вытеснение простаивающих сессий")
+    @allure.description("Проверка, что evict_idle уносит на диск только сессии, простаивающие дольше таймаута")
+    def test_evict_idle(self, manager, clock):
+        """Проверка таймаута простоя"""
+        idle = manager.create(seed=1)
+        clock.now = 50
+        active = manager.create(seed=2)
+        clock.now = 100
+        assert manager.evict_idle() == 1
+        assert manager.resident == 1
+        assert manager.get(idle).seed == 1
+        assert manager.rehydrations == 1 and active in manager
+
+    @allure.title("Закрытие и неизвестные сессии")
+    @allure.description("Проверка, что закрытая сессия удаляется и с диска, а неизвестная вызывает SessionNotFound")
+    def test_close(self, manager, tmp_path):
+        """Проверка удаления сессии"""
+        session = manager.create(seed=1)
+        manager.create(seed=2)
+        manager.create(seed=3)
+        manager.close(session)
+        assert not (tmp_path / f"{session}.sav").exists()
+        with pytest.raises(SessionNotFound):
+            manager.get(session)
+        with pytest.raises(ValueError):
+            SessionManager(None, str(tmp_path), max_resident=0)
@@ -0,0 +1,116 @@
+"""Тесты для точных распределений боя и оптимальной политики"""
+import random
+
+import pytest
+import allure
+
+from src.combat import CombatSystem
+from src.entities import Armor, Enemy, Player, Room, Weapon
+from src.solver import DungeonSolver, fight_outcome, fight_outcome_for
+
+
+def _player(health: int = 10) -> Player:
+    """Игрок со стандартным снаряжением"""
+    return Player("Степан Дубина", health, Weapon("Дубина", "", 5, 75), Armor("Доспех", "", 2))
+
+
+def _enemy(health: int = 10, damage: int = 5, hit_chance: int = 50, defense: int = 1) -> Enemy:
+    """Враг с заданными характеристиками"""
+    return Enemy("Зомби", health, Weapon("Кость", "", damage, hit_chance), Armor("Лохмотья", "", defense))
+
+
+@allure.feature("Решатель")
+@allure.story("Распределение исходов боя")
+class TestFightOutcome:
+    """Тесты распределения исходов боя"""
+
+    @allure.title("Вероятности в сумме дают единицу")
+    @allure.description("Проверка нормировки распределения исходов")
+    @pytest.mark.parametrize("health", [1, 5, 10])
+    def test_probabilities_sum_to_one(self, health):
+        """Проверка нормировки"""
+        outcome = fight_outcome_for(_player(health), _enemy())
+        assert outcome.win_probability + outcome.loss == pytest.approx(1.0)
+
+    @allure.title("Детерминированный бой")
+    @allure.description("Проверка исхода при 100% попаданиях")
+    def test_deterministic_fight(self):
+        """Проверка боя без случайности"""
+        with allure.step("Игрок убивает врага за два удара, враг успевает ударить один раз"):
+            outcome = fight_outcome(10, 5, 100, 0, 10, 3, 100, 0)
+        assert outcome.win == ((7, 1.0),)
+        assert outcome.loss == 0.0
+
+    @allure.title("Ничья по времени")
+    @allure.description("Проверка правила ничьей: при равном здоровье проигрывает игрок")
+    def test_timeout_rules(self):
+        """Проверка правила ничьей"""
+        assert fight_outcome(10, 0, 100, 0, 10, 0, 100, 0).loss == 1.0
+        assert fight_outcome(10, 0, 100, 0, 9, 0, 100, 0).win == ((10, 1.0),)
+
+    @allure.title("Совпадение с автобоем")
+    @allure.description("Проверка, что точная вероятность победы совпадает с частотой побед в автобое")
+    def test_matches_auto_battle(self, dungeon_generator):
+        """Сравнение с методом Монте-Карло"""
+        combat = CombatSystem(dungeon_generator, random.Random(0))
+        combat.log_enabled = False
+        runs = 4000
+        wins = sum(combat.auto_battle(_player(), _enemy()) for _ in range(runs))
+        expected = fight_outcome_for(_player(), _enemy()).win_probability
+        assert wins / runs == pytest.approx(expected, abs=0.03)
+
+
+@allure.feature("Решатель")
+@allure.story("Оптимальная политика")
+class TestDungeonSolver:
+    """Тесты решателя подземелья"""
+
+    @allure.title("Пустое подземелье")
+    @allure.description("Проверка, что без врагов выход гарантирован")
+    def test_empty_dungeon(self):
+        """Проверка подземелья без врагов"""
+        dungeon = [Room("St", ""), Room("Rm", ""), Room("Ex", "")]
+        solver = DungeonSolver(dungeon, _player())
+        assert solver.win_probability() == 1.0
+        assert [action for action, _ in solver.policy()] == ["forward", "forward", "exit"]
+
+    @allure.title("Вероятность — произведение по боям")
+    @allure.description("Проверка ценности для подземелья с одним врагом")
+    def test_single_enemy(self):
+        """Проверка одного боя"""
+        enemy = _enemy()
+        dungeon = [Room("St", ""), Room("Rm", "", enemy), Room("Ex", "")]
+        solver = DungeonSolver(dungeon, _player())
+        expected = fight_outcome_for(_player(), enemy).win_probability
+        assert solver.win_probability() == pytest.approx(expected)
+        assert solver.best_action(1) == "attack"
+
+    @allure.title("Безнадёжный бой")
+    @allure.description("Проверка, что при нулевом шансе решатель отступает")
+    def test_hopeless_fight_retreats(self):
+        """Проверка отступления"""
+        dungeon = [Room("St", ""), Room("Rm", "", _enemy(health=100, damage=50, hit_chance=100, defense=10)), Room("Ex", "")]
+        solver = DungeonSolver(dungeon, _player())
+        assert solver.win_probability() == 0.0
+        assert solver.best_action(1) == "back"
+
+    @allure.title("Учёт побеждённых врагов")
+    @allure.description("Проверка, что после победы в комнате решатель предлагает идти дальше")
+    def test_defeated_enemy(self):
+        """Проверка комнаты с побеждённым врагом"""
+        enemy = _enemy()
+        dungeon = [Room("St", ""), Room("Rm", "", enemy), Room("Ex", "")]
+        solver = DungeonSolver(dungeon, _player())
+        enemy.defeat()
+        assert solver.best_action(1, 3) == "forward"
+        assert solver.win_probability(1, 3) == 1.0
+
+    @allure.title("Большое подземелье")
+    @allure.description("Проверка решения подземелья из 1000 комнат")
+    def test_large_dungeon(self, dungeon_generator):
+        """Проверка 1000 комнат"""
+        rng = random.Random(1)
+        dungeon = dungeon_generator.generate_dungeon(1000, enemy_probability=0.01, rng=rng)
+        solver = DungeonSolver(dungeon, dungeon_generator.create_player(rng))
+        assert 0.0 <= solver.win_probability() <= 1.0
+        assert len(solver.policy()) == 1000
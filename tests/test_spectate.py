@@ -0,0 +1,161 @@
+"""Тесты для трансляции сессии зрителям"""
+import socket
+import time
+
+import pytest
+import allure
+
+from src.controller import GameController
+from src.spectate import BroadcastRenderBuffer, Channel, SpectatorServer
+
+
+def _receive(sock: socket.socket, marker: bytes, timeout: float = 5.0) -> bytes:
+    """Читать из сокета, пока не придёт marker"""
+    sock.settimeout(timeout)
+    data = b""
+    deadline = time.monotonic() + timeout
+    while marker not in data and time.monotonic() < deadline:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+@allure.feature("Трансляция")
+@allure.story("Канал кадров")
+class TestChannel:
+    """Тесты канала и подписок"""
+
+    @allure.title("Кадр кодируется один раз")
+    @allure.description("Проверка, что все подписчики получают один и тот же объект bytes без перекодирования")
+    def test_fan_out_shares_frame(self):
+        """Проверка раздачи одного кадра"""
+        channel = Channel(capacity=8)
+        subscriptions = [channel.subscribe() for _ in range(3)]
+        frame = "Комната 1 из 5\n".encode("utf-8")
+        channel.publish(frame)
+        received = [subscription.poll() for subscription in subscriptions]
+        assert all(data is frame for data in received)
+        assert all(subscription.poll() == b"" for subscription in subscriptions)
+
+    @allure.title("Накопленные кадры приходят одним куском")
+    @allure.description("Проверка, что poll() склеивает все новые кадры подписчика")
+    def test_poll_coalesces(self):
+        """Проверка склейки кадров"""
+        channel = Channel(capacity=8)
+        subscription = channel.subscribe()
+        for i in range(3):
+            channel.publish(f"{i}\n".encode())
+        assert subscription.lag == 3
+        assert subscription.poll() == b"0\n1\n2\n"
+        assert subscription.delivered == 3
+        assert subscription.lag == 0
+
+    @allure.title("Медленный зритель теряет старые кадры")
+    @allure.description("Проверка, что отставание ограничено кольцом, а потери учитываются в dropped")
+    def test_slow_subscriber_drops(self):
+        """Проверка потери кадров"""
+        channel = Channel(capacity=4)
+        slow, fast = channel.subscribe(), channel.subscribe()
+        for i in range(10):
+            channel.publish(f"{i}\n".encode())
+            fast.poll()
+        assert slow.poll() == b"6\n7\n8\n9\n"
+        assert slow.dropped == 6
+        assert fast.dropped == 0 and fast.delivered == 10
+
+    @allure.title("Новый зритель видит текущий экран")
+    @allure.description("Проверка, что подписка начинается с последних backlog кадров")
+    def test_subscribe_backlog(self):
+        """Проверка начальных кадров"""
+        channel = Channel(capacity=4)
+        assert channel.subscribe().poll() == b""
+        for i in range(6):
+            channel.publish(f"{i}\n".encode())
+        assert channel.subscribe().poll() == b"5\n"
+        assert channel.subscribe(backlog=10).poll() == b"2\n3\n4\n5\n"
+
+    @allure.title("Ёмкость канала")
+    @allure.description("Проверка, что канал без места под кадры не создаётся")
+    def test_invalid_capacity(self):
+        """Проверка ёмкости"""
+        with pytest.raises(ValueError):
+            Channel(capacity=0)
+
+
+@allure.feature("Трансляция")
+@allure.story("Буфер экрана с трансляцией")
+class TestBroadcastRenderBuffer:
+    """Тесты буфера экрана, публикующего кадры"""
+
+    @allure.title("Экран выводится и публикуется")
+    @allure.description("Проверка, что игрок и зрители получают одни и те же байты экрана")
+    def test_flush_publishes(self, counting_stream):
+        """Проверка публикации экрана"""
+        channel = Channel()
+        subscription = channel.subscribe()
+        screen = BroadcastRenderBuffer(channel, counting_stream)
+        screen.separator()
+        screen.line("Комната 1 из 5")
+        written = screen.flush()
+        frame = subscription.poll()
+        assert frame == counting_stream.buffer.getvalue()
+        assert frame.decode("utf-8").endswith("Комната 1 из 5\n")
+        assert written == len(frame)
+        assert screen.flush() == 0 and channel.published == 1
+
+    @allure.title("Только трансляция")
+    @allure.description("Проверка, что с echo=False экран не выводится, но публикуется")
+    def test_no_echo(self, counting_stream):
+        """Проверка режима без вывода"""
+        channel = Channel()
+        screen = BroadcastRenderBuffer(channel, counting_stream, echo=False)
+        screen.line("бой")
+        screen.flush()
+        assert counting_stream.buffer.getvalue() == b""
+        assert channel.subscribe().poll() == "бой\n".encode("utf-8")
+
+    @allure.title("Экраны игры попадают в канал")
+    @allure.description("Проверка, что комната и лог боя контроллера публикуются кадрами")
+    def test_controller_frames(self, dungeon_generator, counting_stream):
+        """Проверка экранов контроллера"""
+        channel = Channel(capacity=256)
+        subscription = channel.subscribe()
+        controller = GameController(dungeon_generator, screen=BroadcastRenderBuffer(channel, counting_stream))
+        controller.initialize_game(num_rooms=3, wait_for_start=False)
+        controller.display_room()
+        assert channel.published >= 2
+        text = subscription.poll().decode("utf-8")
+        assert "Комната 1 из 3" in text
+        assert text.encode("utf-8") == counting_stream.buffer.getvalue()
+
+
+@allure.feature("Трансляция")
+@allure.story("Сервер зрителей")
+class TestSpectatorServer:
+    """Тесты раздачи кадров по TCP"""
+
+    @allure.title("Зрители получают кадры")
+    @allure.description("Проверка, что несколько зрителей получают опубликованные экраны по сети")
+    def test_viewers_receive_frames(self):
+        """Проверка раздачи по сети"""
+        channel = Channel()
+        server = SpectatorServer(channel, interval=0.01).start()
+        try:
+            viewers = [socket.create_connection(server.address) for _ in range(2)]
+            deadline = time.monotonic() + 5
+            while len(server) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(server) == 2
+            channel.publish("Комната 1 из 5\n".encode("utf-8"))
+            channel.publish(b"END\n")
+            for viewer in viewers:
+                assert _receive(viewer, b"END\n") == "Комната 1 из 5\nEND\n".encode("utf-8")
+                viewer.close()
+            deadline = time.monotonic() + 5
+            while len(server) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(server) == 0
+        finally:
+            server.stop()
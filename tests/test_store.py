@@ -0,0 +1,125 @@
+"""Тесты для хранилища сессий и партий на SQLite"""
+import sqlite3
+import threading
+
+import pytest
+import allure
+
+from src.sessions import SessionManager, SessionNotFound
+from src.store import GameStore, StoreClosed
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GameStore(str(tmp_path / "game.db"), readers=2, batch_size=100)
+    yield store
+    store.close()
+
+
+@allure.feature("Хранилище")
+@allure.story("Сессии")
+class TestSessionStore:
+    """Тесты контрольных точек сессий"""
+
+    @allure.title("Чтение сразу после записи")
+    @allure.description("Проверка, что контрольная точка видна до и после записи на диск")
+    def test_read_your_writes(self, store):
+        """Проверка видимости записи"""
+        store.checkpoint("a", b"first")
+        store.checkpoint("a", b"second")
+        assert store.load_session("a") == b"second"
+        store.flush()
+        assert store.load_session("a") == b"second"
+        store.delete_session("a")
+        assert store.load_session("a") is None
+        store.flush()
+        assert store.load_session("a") is None
+
+    @allure.title("Пачки и схлопывание")
+    @allure.description("Проверка, что записи идут пачками не больше batch_size и переживают переоткрытие")
+    def test_batched_writes_persist(self, store, tmp_path):
+        """Проверка пакетной записи"""
+        threads = [
+            threading.Thread(target=lambda n=n: [store.checkpoint(f"s{n}-{i}", bytes([i])) for i in range(250)])
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.flush(timeout=10)
+        stats = store.stats()
+        assert stats["checkpoints"] == 1000 and stats["pending"] == 0
+        assert 0 < stats["batch_max"] <= 100
+        store.close()
+
+        with sqlite3.connect(str(tmp_path / "game.db")) as connection:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1000
+        with pytest.raises(StoreClosed):
+            store.checkpoint("late", b"")
+
+    @allure.title("Вытеснение сессий в хранилище")
+    @allure.description("Проверка, что SessionManager вытесняет сессии в GameStore и загружает их обратно")
+    def test_session_manager_store(self, store, dungeon_generator):
+        """Проверка интеграции с менеджером сессий"""
+        manager = SessionManager(dungeon_generator, max_resident=1, store=store)
+        first = manager.create(seed=11)
+        manager.create(seed=12)
+        assert store.load_session(first) is not None
+        assert manager.get(first).seed == 11
+        manager.close(first)
+        assert store.load_session(first) is None
+
+    @allure.title("Сохранение сессии пропало из хранилища")
+    @allure.description("Проверка, что вытесненная сессия без записи в хранилище даёт SessionNotFound, а не ошибку разбора")
+    def test_session_missing_in_store(self, store, dungeon_generator):
+        """Проверка пропавшей сессии"""
+        manager = SessionManager(dungeon_generator, max_resident=1, store=store)
+        first = manager.create(seed=11)
+        manager.create(seed=12)
+        store.delete_session(first)
+        with pytest.raises(SessionNotFound):
+            manager.get(first)
+        assert first not in manager
+
+
+@allure.feature("Хранилище")
+@allure.story("Партии")
+class TestRunStore:
+    """Тесты записи итогов партий"""
+
+    @allure.title("Запись итогов партий")
+    @allure.description("Проверка, что итоги партий записываются и читаются в обратном порядке")
+    def test_record_runs(self, store):
+        """Проверка записи партий"""
+        for i in range(3):
+            store.record_run(f"player{i}", "exit", rooms_cleared=5, health=i, fights=2, turns=9, seed=i)
+        store.flush()
+        assert store.count_runs() == 3
+        runs = store.recent_runs(2)
+        assert [run["player"] for run in runs] == ["player2", "player1"]
+        assert runs[0]["outcome"] == "exit" and runs[0]["health"] == 2
+
+    @allure.title("64-битные зёрна")
+    @allure.description("Проверка, что зёрна от 2**63 (половина случайных зёрен) записываются и читаются без потерь")
+    @pytest.mark.parametrize("seed", [2**63 + 5, 2**64 - 1, 2**63 - 1])
+    def test_large_seed(self, store, seed):
+        """Проверка 64-битного зерна"""
+        store.record_run("player", "exit", rooms_cleared=5, health=10, fights=2, turns=9, seed=seed)
+        store.flush()
+        assert store.recent_runs(1)[0]["seed"] == seed
+        with pytest.raises(ValueError):
+            store.record_run("player", "exit", rooms_cleared=5, health=10, fights=2, turns=9, seed=2**64)
+
+    @allure.title("Ошибка писателя")
+    @allure.description("Проверка, что после падения потока-писателя запись сразу завершается ошибкой")
+    def test_writer_failure(self, store):
+        """Проверка отказа после ошибки писателя"""
+        store.record_run(None, "exit", rooms_cleared=5, health=10, fights=2, turns=9)
+        with pytest.raises(sqlite3.IntegrityError):
+            store.flush(timeout=5)
+        with pytest.raises(StoreClosed):
+            store.checkpoint("s1", b"data")
+        with pytest.raises(StoreClosed):
+            store.record_run("player", "exit", rooms_cleared=5, health=10, fights=2, turns=9)
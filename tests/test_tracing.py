@@ -0,0 +1,86 @@
+"""Тесты для трассировки"""
+import json
+
+import pytest
+import allure
+
+from src import tracing
+from src.combat import CombatSystem
+from src.controller import GameController
+from src.dungeon import DungeonGenerator
+from src.render import NullRenderBuffer
+
+
+@pytest.fixture
+def tracer():
+    """Трассировщик, выключаемый после теста"""
+    yield tracing.enable()
+    tracing.disable()
+
+
+@allure.feature("Трассировка")
+@allure.story("Интервалы и экспорт")
+class TestTracing:
+    """Тесты трассировки"""
+
+    @allure.title("Без трассировки методы не подменены")
+    @allure.description("Проверка, что в выключенном состоянии обёрток нет")
+    def test_disabled_is_unwrapped(self):
+        """Проверка отсутствия обёрток"""
+        original = CombatSystem.__dict__["auto_battle"]
+        tracing.enable()
+        assert CombatSystem.__dict__["auto_battle"] is not original
+        tracing.disable()
+        assert CombatSystem.__dict__["auto_battle"] is original
+        assert isinstance(GameController.__dict__["get_user_input"], staticmethod)
+        assert tracing.active is None
+
+    @allure.title("Интервалы игровых фаз")
+    @allure.description("Проверка, что загрузка, генерация, бой, раунды и вывод попадают в трассу")
+    def test_game_phases_traced(self, tracer, data_dir):
+        """Проверка интервалов"""
+        generator = DungeonGenerator(data_dir=data_dir)
+        controller = GameController(generator, screen=NullRenderBuffer())
+        controller.initialize_game(5, wait_for_start=False, seed=3)
+        for room in controller.dungeon:
+            room.enemy = None
+        controller.dungeon[1].enemy = generator.build_enemy(0)
+        controller.display_room()
+        controller.execute_action("forward")
+        controller.execute_action("attack")
+
+        names = {event["name"] for event in tracer.events}
+        assert {"load_json", "create_player", "generate_dungeon", "display_room", "auto_battle", "round"} <= names
+        rounds = [event for event in tracer.events if event["name"] == "round"]
+        assert [event["args"]["round"] for event in rounds] == list(range(1, len(rounds) + 1))
+        assert all(event["dur"] >= 0 and event["ph"] == "X" for event in tracer.events)
+
+    @allure.title("Ожидание ввода")
+    @allure.description("Проверка, что ожидание ввода игрока замеряется")
+    def test_input_wait(self, tracer, monkeypatch):
+        """Проверка интервала ввода"""
+        monkeypatch.setattr("builtins.input", lambda prompt="": "1")
+        assert GameController.get_user_input({1: ("forward", "Пойти дальше")}) == "forward"
+        assert [event["name"] for event in tracer.events] == ["input_wait"]
+
+    @allure.title("Экспорт в Chrome trace-event")
+    @allure.description("Проверка формата экспортируемого файла")
+    def test_export(self, tmp_path):
+        """Проверка экспорта"""
+        path = tmp_path / "trace.json"
+        with tracing.tracing(str(path)):
+            with tracing.span("custom", "test", value=1):
+                pass
+        data = json.loads(path.read_text(encoding="utf-8"))
+        event = data["traceEvents"][0]
+        assert event["name"] == "custom" and event["cat"] == "test"
+        assert event["args"] == {"value": 1}
+        assert {"ts", "dur", "pid", "tid"} <= set(event)
+
+    @allure.title("span без трассировки")
+    @allure.description("Проверка, что span в выключенном состоянии ничего не делает")
+    def test_span_disabled(self):
+        """Проверка пустого span"""
+        with tracing.span("nothing"):
+            value = 1
+        assert value == 1 and tracing.active is None